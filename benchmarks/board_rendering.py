@@ -0,0 +1,93 @@
+"""
+Frame time benchmark of the StockPy board renderers.
+
+Compares the board made of 64 square widgets (ChessBoard) with the single
+painted widget (PaintedChessBoard) at several window sizes:
+
+    python3 benchmarks/board_rendering.py
+    python3 benchmarks/board_rendering.py --sizes 800 1600 2400 --frames 50
+
+A resize frame resizes the board and repaints all of it. A move frame plays
+a move (or takes it back) and processes the resulting repaints, which only
+cover the changed squares.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import chess
+from PyQt6.QtWidgets import QApplication
+from gui.board import ChessBoard
+from gui.paintedBoard import PaintedChessBoard
+
+# Moves played back and forth during the move frames
+MOVES = [chess.Move.from_uci(uci) for uci in ('e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5', 'a7a6')]
+
+
+def measure(board_class, size: int, frames: int, app: QApplication) -> tuple:
+    """
+    Measure the frame times of a board renderer.
+
+    Args:
+        board_class: ChessBoard or PaintedChessBoard
+        size (int): Board size in pixels
+        frames (int): Number of frames to measure of each kind
+        app (QApplication): The application
+
+    Returns:
+        tuple: (median resize frame time, median move frame time), in milliseconds
+    """
+    board = board_class(stockfish_path=None, resource_getters={})
+    board.resize(size, size)
+    board.show()
+    app.processEvents()
+
+    # Resize frames: alternate between two sizes so every frame rescales
+    resize_times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        board.resize(size - frame % 2 * 8, size - frame % 2 * 8)
+        app.processEvents()
+        board.repaint()
+        resize_times.append(time.perf_counter() - start)
+
+    # Move frames: play the moves, then take them back
+    move_times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        if board.history.at_end and len(board.history) < len(MOVES):
+            board.history.push(MOVES[len(board.history)])
+        elif not board.history.back():
+            board.history.load(chess.Board(), [])
+        board.update_display()
+        app.processEvents()
+        move_times.append(time.perf_counter() - start)
+
+    board.close()
+    board.deleteLater()
+    app.processEvents()
+    return statistics.median(resize_times) * 1000, statistics.median(move_times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the frame times of the StockPy board renderers.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[800, 1200, 1600, 2400],
+                        help="board sizes in pixels (default: 800 1200 1600 2400)")
+    parser.add_argument('--frames', type=int, default=30, help="frames to measure per size (default: 30)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    print(f"{'size':>6} {'renderer':<18} {'resize frame':>14} {'move frame':>12}")
+    for size in args.sizes:
+        for board_class in (ChessBoard, PaintedChessBoard):
+            resize_ms, move_ms = measure(board_class, size, args.frames, app)
+            print(f"{size:>6} {board_class.__name__:<18} {resize_ms:>11.2f} ms {move_ms:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
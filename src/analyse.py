@@ -0,0 +1,85 @@
+"""
+StockPy - A multi-platform Python3 frontend for Stockfish.
+
+This module is the entry point for headless batch analysis of PGN files:
+
+    python3 src/analyse.py games.pgn -o games.jsonl
+
+and for measuring the fastest engine layouts of the machine:
+
+    python3 src/analyse.py --calibrate
+"""
+
+import argparse
+import sys
+import chess.engine
+from core.batch import BatchAnalyser
+from core.pool import EngineLayout, load_layout, calibrate, best_layouts, save_layouts, layout_config_path
+from core.stockfish import DEFAULT_STOCKFISH_PATH
+
+def run_calibration(stockfish_path: str, seconds: float):
+    """Measure candidate engine layouts and save the fastest ones."""
+    print("Measuring engine layouts...", file=sys.stderr)
+    results = calibrate(stockfish_path, seconds=seconds)
+    for result in results:
+        print(f"{str(result.layout):<32} {result.total_nps / 1000:>10.0f} knps total "
+              f"{result.engine_nps / 1000:>10.0f} knps per engine")
+    layouts = best_layouts(results)
+    save_layouts(layouts)
+    for workload, layout in layouts.items():
+        print(f"Fastest {workload} layout: {layout}")
+    print(f"Saved to {layout_config_path()}")
+
+def main():
+    """
+    Main entry point of the batch analyser.
+    
+    Parses the command line, analyses every position of every game in the
+    PGN file and reports the analysis speed.
+    """
+    parser = argparse.ArgumentParser(description="Analyse every position of a PGN database with Stockfish.")
+    parser.add_argument('pgn', nargs='?', help="PGN file to analyse (may contain many games)")
+    parser.add_argument('-o', '--output', help="output file: annotated PGN if it ends with .pgn, JSONL otherwise "
+                                               "(default: <pgn>.analysis.jsonl)")
+    parser.add_argument('--engine', default=DEFAULT_STOCKFISH_PATH, help="path to the Stockfish executable")
+    parser.add_argument('-j', '--processes', type=int, help="number of engine processes (default: from the batch layout)")
+    parser.add_argument('--threads', type=int, help="Threads of each engine (default: from the batch layout)")
+    parser.add_argument('--hash', type=int, help="Hash of each engine in MB (default: from the batch layout)")
+    parser.add_argument('-t', '--time', type=float, default=1.0, help="time to think per position in seconds")
+    parser.add_argument('-d', '--depth', type=int, help="stop each search at this depth")
+    parser.add_argument('--restart', action='store_true', help="overwrite the output instead of resuming")
+    parser.add_argument('--calibrate', action='store_true',
+                        help="measure the speed of engine layouts and save the fastest ones")
+    parser.add_argument('--calibration-time', type=float, default=3.0, help="search time per calibrated layout")
+    args = parser.parse_args()
+
+    if args.calibrate:
+        run_calibration(args.engine, args.calibration_time)
+        return
+    if args.pgn is None:
+        parser.error("a PGN file is required unless --calibrate is given")
+
+    # Batch layout, with any command line overrides
+    layout = load_layout('batch')
+    layout = EngineLayout(
+        engines=args.processes or layout.engines,
+        threads=args.threads or layout.threads,
+        hash_mb=args.hash or layout.hash_mb,
+    )
+
+    output_path = args.output or args.pgn + '.analysis.jsonl'
+    analyser = BatchAnalyser(args.engine, layout, args.time, args.depth)
+    try:
+        analyser.run(args.pgn, output_path, resume=not args.restart)
+    except (FileNotFoundError, PermissionError, chess.engine.EngineError) as e:
+        print(f"Error starting engine: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("Interrupted, run again to resume", file=sys.stderr)
+
+    rate = analyser.positions / analyser.elapsed if analyser.elapsed else 0.0
+    print(f"Analysed {analyser.games} games ({analyser.positions} positions) "
+          f"with {analyser.layout}: {rate:.1f} positions/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
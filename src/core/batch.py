@@ -0,0 +1,241 @@
+"""
+Headless batch analysis of PGN databases for StockPy.
+
+Games are streamed from a (possibly multi-game) PGN file, their positions
+are fanned out across a pool of engine processes, and each game is written
+to the output as soon as all of its positions are analysed.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import chess
+import chess.engine
+import chess.pgn
+from core.stockfish import StockfishEngine
+from core.pool import EngineLayout, load_layout
+
+# Engine of each pool process, started by _start_worker_engine
+_worker_engine = None
+_worker_limits = None
+
+
+def _start_worker_engine(stockfish_path: str, options: dict, time_limit: float, depth: int) -> None:
+    """Start the engine of a pool process."""
+    global _worker_engine, _worker_limits
+    _worker_engine = StockfishEngine(stockfish_path, options=options)
+    _worker_engine.start()
+    _worker_limits = (time_limit, depth)
+
+
+def _analyse_task(task: tuple) -> tuple:
+    """
+    Analyse one position in a pool process.
+
+    Args:
+        task (tuple): (game index, ply, FEN)
+
+    Returns:
+        tuple: (game index, ply, result dict)
+    """
+    game_index, ply, fen = task
+    time_limit, depth = _worker_limits
+    analysis = _worker_engine.analyse_position(chess.Board(fen), time_limit, depth)
+    result = {'ply': ply, 'fen': fen}
+    if analysis is not None:
+        if analysis.score is not None:
+            if analysis.score.is_mate():
+                result['mate'] = analysis.score.mate()
+            else:
+                result['cp'] = analysis.score.score()
+        result['best'] = analysis.best_move.uci() if analysis.best_move else None
+        result['depth'] = analysis.depth
+        result['nodes'] = analysis.nodes
+        result['pv'] = [move.uci() for move in analysis.pv]
+    return game_index, ply, result
+
+
+def count_completed_games(output_path: str) -> int:
+    """
+    Count the games already written to an output file, to resume after an interruption.
+
+    A trailing partial JSONL record is removed.
+
+    Args:
+        output_path (str): JSONL or PGN output file
+
+    Returns:
+        int: Number of complete games in the file
+    """
+    if not os.path.exists(output_path):
+        return 0
+
+    if output_path.endswith('.pgn'):
+        count = 0
+        with open(output_path, 'r') as output_file:
+            while chess.pgn.read_headers(output_file) is not None:
+                count += 1
+        return count
+
+    with open(output_path, 'rb+') as output_file:
+        data = output_file.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            output_file.truncate(complete)
+    return data[:complete].count(b'\n')
+
+
+def annotate_game(game: chess.pgn.Game, results: list[dict]) -> chess.pgn.Game:
+    """
+    Add engine evaluations and best moves to a game as PGN comments.
+
+    Args:
+        game (chess.pgn.Game): The analysed game
+        results (list[dict]): Analysis of each mainline position, by ply
+
+    Returns:
+        chess.pgn.Game: The same game, annotated
+    """
+    node = game
+    for result in results:
+        if 'mate' in result:
+            node.set_eval(chess.engine.PovScore(chess.engine.Mate(result['mate']), chess.WHITE), result.get('depth'))
+        elif 'cp' in result:
+            node.set_eval(chess.engine.PovScore(chess.engine.Cp(result['cp']), chess.WHITE), result.get('depth'))
+        if result.get('best'):
+            node.comment = (node.comment + f" best {result['best']}").strip()
+        node = node.next()
+        if node is None:
+            break
+    return game
+
+
+class BatchAnalyser:
+    """Analyse every mainline position of every game of a PGN file with a pool of engines."""
+
+    def __init__(self, stockfish_path: str, layout: EngineLayout = None, time_limit: float = 1.0,
+                 depth: int = None, progress_interval: float = 5.0):
+        """
+        Initialize the analyser.
+
+        Args:
+            stockfish_path (str): Path to the Stockfish executable
+            layout (EngineLayout): Number and configuration of the engine
+                processes (default: the calibrated or automatic batch layout)
+            time_limit (float): Time to think per position in seconds
+            depth (int): Optional depth at which to end each search early
+            progress_interval (float): Seconds between two progress reports
+        """
+        self.stockfish_path = stockfish_path
+        self.layout = layout or load_layout('batch')
+        self.processes = self.layout.engines
+        self.time_limit = time_limit
+        self.depth = depth
+        self.progress_interval = progress_interval
+
+        # Statistics
+        self.games = 0
+        self.positions = 0
+        self.elapsed = 0.0
+
+    def _tasks(self, pgn_file, skip: int, in_flight: threading.Semaphore, games: dict):
+        """
+        Stream the positions of the games to analyse.
+
+        Reading stays at most a bounded number of positions ahead of the
+        analysis, so arbitrarily large files are never loaded in full.
+        """
+        for _ in range(skip):
+            if not chess.pgn.skip_game(pgn_file):
+                return
+        game_index = skip
+        while True:
+            game = chess.pgn.read_game(pgn_file)
+            if game is None:
+                return
+            board = game.board()
+            fens = [board.fen()]
+            for move in game.mainline_moves():
+                board.push(move)
+                fens.append(board.fen())
+            games[game_index] = (game, [None] * len(fens))
+            for ply, fen in enumerate(fens):
+                in_flight.acquire()
+                yield game_index, ply, fen
+            game_index += 1
+
+    def _write_game(self, output_file, output_format: str, game_index: int,
+                    game: chess.pgn.Game, results: list[dict]) -> None:
+        """Append an analysed game to the output."""
+        if output_format == 'pgn':
+            exporter = chess.pgn.StringExporter(headers=True, variations=True, comments=True)
+            output_file.write(annotate_game(game, results).accept(exporter) + '\n\n')
+        else:
+            record = {'game': game_index, 'headers': dict(game.headers), 'positions': results}
+            output_file.write(json.dumps(record) + '\n')
+        output_file.flush()
+
+    def run(self, pgn_path: str, output_path: str, resume: bool = True) -> None:
+        """
+        Analyse a PGN file, writing each game to the output as soon as it is done.
+
+        Args:
+            pgn_path (str): Input PGN file (may contain many games)
+            output_path (str): Output file, annotated PGN if it ends with .pgn, JSONL otherwise
+            resume (bool): Skip the games already present in the output file
+
+        Raises:
+            FileNotFoundError, PermissionError, chess.engine.EngineError: If
+                the engine cannot be started
+        """
+        # Start an engine once before the pool: an engine that cannot start
+        # would only make the pool replace its dying processes forever
+        engine = StockfishEngine(self.stockfish_path, options=self.layout.options())
+        engine.start()
+        engine.quit()
+
+        output_format = 'pgn' if output_path.endswith('.pgn') else 'jsonl'
+        skip = count_completed_games(output_path) if resume else 0
+        if skip:
+            print(f"Resuming after {skip} analysed games", file=sys.stderr)
+
+        games = {}                  # Game index -> (game, results by ply)
+        remaining = {}              # Game index -> positions not analysed yet
+        next_to_write = skip
+        in_flight = threading.Semaphore(self.processes * 4)
+
+        start = time.monotonic()
+        last_report = start
+        try:
+            with open(pgn_path, 'r') as pgn_file, \
+                 open(output_path, 'a' if resume else 'w') as output_file, \
+                 multiprocessing.Pool(self.processes, _start_worker_engine,
+                                      (self.stockfish_path, self.layout.options(),
+                                       self.time_limit, self.depth)) as pool:
+                tasks = self._tasks(pgn_file, skip, in_flight, games)
+                for game_index, ply, result in pool.imap_unordered(_analyse_task, tasks):
+                    in_flight.release()
+                    self.positions += 1
+                    _, results = games[game_index]
+                    results[ply] = result
+                    remaining[game_index] = remaining.get(game_index, len(results)) - 1
+
+                    # Write finished games in order
+                    while next_to_write in remaining and remaining[next_to_write] == 0:
+                        game, results = games.pop(next_to_write)
+                        del remaining[next_to_write]
+                        self._write_game(output_file, output_format, next_to_write, game, results)
+                        self.games += 1
+                        next_to_write += 1
+
+                    now = time.monotonic()
+                    if now - last_report >= self.progress_interval:
+                        last_report = now
+                        print(f"{self.games} games, {self.positions} positions, "
+                              f"{self.positions / (now - start):.1f} positions/s", file=sys.stderr)
+        finally:
+            # Also when interrupted, so the rate of the work done can be reported
+            self.elapsed = time.monotonic() - start
@@ -0,0 +1,62 @@
+"""
+Opening book for StockPy.
+
+A Polyglot book (.bin) holds weighted moves for positions keyed by their
+Zobrist hash, sorted by hash. The file is memory-mapped by python-chess, so
+probing a position is a binary search that takes microseconds: book moves
+can be shown as soon as a position is displayed, before the engine has
+searched anything.
+"""
+
+from dataclasses import dataclass
+import chess
+import chess.polyglot
+from core.trace import tracer
+
+
+@dataclass
+class BookMove:
+    """A book move, with its weight and its share of the weights of the position."""
+
+    move: chess.Move
+    weight: int
+    share: float            # Between 0 and 1
+
+
+class OpeningBook:
+    """Polyglot opening book, memory-mapped for the lifetime of the object."""
+
+    def __init__(self, path: str):
+        """
+        Open a Polyglot book.
+
+        Args:
+            path (str): Path to the .bin book
+
+        Raises:
+            OSError: If the book cannot be opened
+        """
+        self.path = path
+        self.reader = chess.polyglot.open_reader(path)
+
+    def moves(self, board: chess.Board) -> list[BookMove]:
+        """
+        Get the book moves of a position, by decreasing weight.
+
+        Args:
+            board (chess.Board): The position
+
+        Returns:
+            list[BookMove]: The moves (empty if the position is out of book)
+        """
+        with tracer.span('book.probe'):
+            entries = list(self.reader.find_all(board))
+        tracer.count('book.hit' if entries else 'book.miss')
+        total = sum(entry.weight for entry in entries)
+        moves = [BookMove(entry.move, entry.weight, entry.weight / total if total else 0.0) for entry in entries]
+        moves.sort(key=lambda book_move: book_move.weight, reverse=True)
+        return moves
+
+    def close(self) -> None:
+        """Unmap the book."""
+        self.reader.close()
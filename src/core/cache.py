@@ -0,0 +1,83 @@
+"""
+In-memory analysis cache for StockPy.
+"""
+
+import threading
+from collections import OrderedDict
+import chess
+import chess.polyglot
+from core.stockfish import PositionAnalysis
+from core.trace import tracer
+
+
+class AnalysisCache:
+    """
+    Least-recently-used cache of engine analyses, keyed by Zobrist hash.
+
+    Only the deepest analysis of each position is kept. The cache is safe to
+    use from several threads.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of positions to remember
+        """
+        self.max_entries = max_entries
+        self.entries: OrderedDict[int, PositionAnalysis] = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, board: chess.Board) -> PositionAnalysis:
+        """
+        Look up the analysis of a position.
+
+        Args:
+            board (chess.Board): The position to look up
+
+        Returns:
+            PositionAnalysis: The deepest cached analysis, or None
+        """
+        key = chess.polyglot.zobrist_hash(board)
+        with self.lock:
+            analysis = self.entries.get(key)
+            if analysis is None:
+                self.misses += 1
+                tracer.count('cache.miss')
+                return None
+            self.hits += 1
+            tracer.count('cache.hit')
+            self.entries.move_to_end(key)
+            return analysis
+
+    def put(self, board: chess.Board, analysis: PositionAnalysis) -> None:
+        """
+        Store the analysis of a position, unless a deeper one is already cached.
+
+        Args:
+            board (chess.Board): The analysed position
+            analysis (PositionAnalysis): The analysis to store
+        """
+        key = chess.polyglot.zobrist_hash(board)
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is None or analysis.depth >= cached.depth:
+                self.entries[key] = analysis
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all cached analyses and reset the statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,229 @@
+"""
+PGN databases for StockPy.
+
+A database is a (possibly huge) multi-game PGN file. It is scanned once to
+build an index of the byte offset and main headers of every game, which is
+saved next to the file (or in the user cache directory if that is not
+writable) and reused as long as the file does not change. Games are then
+read on demand from a memory map of the file, so opening a database never
+parses its moves.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import chess.pgn
+from core.trace import tracer
+
+# Headers kept in the index, in display order
+INDEX_HEADERS = ('White', 'Black', 'Result', 'Date', 'Event', 'ECO')
+
+# A block of consecutive tag pair lines at the start of the file (after an
+# optional UTF-8 BOM) or after a blank line starts a game. Other lines
+# starting with a bracket (e.g. a wrapped [%clk ...] comment) do not.
+TAG_LINE = rb'\[[A-Za-z0-9][A-Za-z0-9_+#=:-]*[ \t]+"[^\r\n]*"\][ \t\r]*'
+HEADER_BLOCK = re.compile(rb'(?:\A(?:\xef\xbb\xbf)?|\n[ \t\r]*\n)(' + TAG_LINE + rb'(?:\n' + TAG_LINE + rb')*)')
+TAG_PAIR = re.compile(rb'^(?:\xef\xbb\xbf)?\[([A-Za-z0-9][A-Za-z0-9_+#=:-]*)\s+"([^\r\n]*)"\]', re.MULTILINE)
+
+# Version of the index format (an index of another version is rebuilt)
+INDEX_VERSION = 2
+
+
+def default_index_path(pgn_path: str, suffix: str = '.stockpy-index') -> str:
+    """
+    Get the location of an index of a PGN file.
+
+    The index is kept next to the file, or in the user cache directory if
+    the directory of the file is not writable.
+
+    Args:
+        pgn_path (str): Path to the PGN file
+        suffix (str): Suffix identifying the kind of index
+
+    Returns:
+        str: Path to the index
+    """
+    pgn_path = os.path.abspath(pgn_path)
+    if os.access(os.path.dirname(pgn_path), os.W_OK):
+        return pgn_path + suffix
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    name = hashlib.sha1(pgn_path.encode()).hexdigest() + suffix
+    return os.path.join(cache_dir, 'stockpy', 'indexes', name)
+
+
+def scan_games(data, progress=None):
+    """
+    Find the games of PGN data without parsing their moves.
+
+    Args:
+        data (bytes | mmap.mmap): Contents of the PGN file
+        progress (Callable[[int], None]): Optional callback with the number of bytes scanned
+
+    Yields:
+        tuple: (byte offset of the game, dict of its index headers)
+    """
+    for number, match in enumerate(HEADER_BLOCK.finditer(data)):
+        headers = {}
+        for tag in TAG_PAIR.finditer(match.group(1)):
+            name = tag.group(1).decode('ascii')
+            if name in INDEX_HEADERS:
+                value = tag.group(2).decode('utf-8', errors='replace')
+                headers[name] = value.replace('\\"', '"').replace('\\\\', '\\')
+        yield match.start(1), headers
+        if progress is not None and number % 10_000 == 0:
+            progress(match.start(1))
+
+
+class PGNDatabase:
+    """Multi-game PGN file with a persistent index, read game by game on demand."""
+
+    def __init__(self, path: str, index_path: str = None, progress=None, cancelled: threading.Event = None):
+        """
+        Open a PGN database, building its index if missing or out of date.
+
+        Args:
+            path (str): Path to the PGN file
+            index_path (str): Path to the index (default: default_index_path(path))
+            progress (Callable[[int, int], None]): Optional callback with
+                (bytes scanned, file size) while the index is built
+            cancelled (threading.Event): Optional event to abort building the index
+
+        Raises:
+            InterruptedError: If building the index was cancelled
+        """
+        self.path = path
+        self.index_path = index_path or default_index_path(path)
+
+        # Memory map the file (an empty file cannot be mapped)
+        self.file = open(path, 'rb')
+        stat = os.fstat(self.file.fileno())
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self.signature = f'{INDEX_VERSION}:{stat.st_size}:{stat.st_mtime_ns}'
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        self.connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        try:
+            if not self._index_is_current():
+                with tracer.span('database.index', path=path):
+                    self._build_index(progress, cancelled)
+            with self.lock:
+                self.count = self.connection.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _index_is_current(self) -> bool:
+        """Whether the index exists and was built from the current contents of the file."""
+        with self.lock:
+            try:
+                row = self.connection.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+            except sqlite3.Error:
+                return False
+        return row is not None and row[0] == self.signature
+
+    def _build_index(self, progress, cancelled: threading.Event) -> None:
+        """Scan the file and save the offset and headers of every game."""
+        columns = ', '.join(f'{header.lower()} TEXT' for header in INDEX_HEADERS)
+        placeholders = ', '.join('?' for _ in range(len(INDEX_HEADERS) + 2))
+        size = len(self.data)
+        with self.lock, self.connection:
+            self.connection.execute('DROP TABLE IF EXISTS games')
+            self.connection.execute('DROP TABLE IF EXISTS meta')
+            self.connection.execute(f'CREATE TABLE games (id INTEGER PRIMARY KEY, offset INTEGER NOT NULL, {columns})')
+            self.connection.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+
+            batch = []
+            report = (lambda done: progress(done, size)) if progress is not None else None
+            for game_index, (offset, headers) in enumerate(scan_games(self.data, report)):
+                batch.append((game_index, offset) + tuple(headers.get(header) for header in INDEX_HEADERS))
+                if len(batch) >= 10_000:
+                    if cancelled is not None and cancelled.is_set():
+                        raise InterruptedError("Indexing cancelled")
+                    self.connection.executemany(f'INSERT INTO games VALUES ({placeholders})', batch)
+                    batch = []
+            self.connection.executemany(f'INSERT INTO games VALUES ({placeholders})', batch)
+
+            # Written last, so an interrupted build is never mistaken for a complete one
+            self.connection.execute("INSERT INTO meta VALUES ('signature', ?)", (self.signature,))
+        if progress is not None:
+            progress(size, size)
+
+    def headers(self, start: int, count: int) -> list[tuple]:
+        """
+        Get the index headers of consecutive games.
+
+        Args:
+            start (int): Index of the first game (0-based)
+            count (int): Maximum number of games
+
+        Returns:
+            list[tuple]: Values of INDEX_HEADERS for each game (None for missing headers)
+        """
+        columns = ', '.join(header.lower() for header in INDEX_HEADERS)
+        with self.lock:
+            return self.connection.execute(
+                f'SELECT {columns} FROM games WHERE id >= ? ORDER BY id LIMIT ?',
+                (start, count)
+            ).fetchall()
+
+    def headers_of(self, indices: list[int]) -> list[tuple]:
+        """
+        Get the index headers of chosen games.
+
+        Args:
+            indices (list[int]): Indices of the games (0-based)
+
+        Returns:
+            list[tuple]: Values of INDEX_HEADERS for each game found, in the order of the indices
+        """
+        columns = ', '.join(header.lower() for header in INDEX_HEADERS)
+        placeholders = ', '.join('?' for _ in indices)
+        with self.lock:
+            rows = self.connection.execute(
+                f'SELECT id, {columns} FROM games WHERE id IN ({placeholders})', tuple(indices)
+            ).fetchall()
+        by_id = {row[0]: row[1:] for row in rows}
+        return [by_id[index] for index in indices if index in by_id]
+
+    def offsets(self) -> list[int]:
+        """Byte offset of every game in the file, in order."""
+        with self.lock:
+            return [row[0] for row in self.connection.execute('SELECT offset FROM games ORDER BY id')]
+
+    def game(self, index: int) -> chess.pgn.Game:
+        """
+        Read a game from the file.
+
+        Args:
+            index (int): Index of the game (0-based)
+
+        Returns:
+            chess.pgn.Game: The game, or None if there is no such game
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT offset FROM games WHERE id >= ? ORDER BY id LIMIT 2', (index,)
+            ).fetchall()
+        if not rows or index >= self.count:
+            return None
+        start = rows[0][0]
+        end = rows[1][0] if len(rows) > 1 else len(self.data)
+        with tracer.span('pgn.read_game', game=index):
+            text = self.data[start:end].decode('utf-8', errors='replace')
+            return chess.pgn.read_game(io.StringIO(text))
+
+    def close(self) -> None:
+        """Close the index and the file."""
+        with self.lock:
+            self.connection.close()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
@@ -0,0 +1,298 @@
+"""
+Opening explorer for StockPy.
+
+The opening tree of a PGN database holds, for each position of the first
+EXPLORER_PLIES plies of its games, the moves played from it with the number
+of games won by White, drawn and won by Black after each of them. It is
+stored as fixed-size (Zobrist hash, move, results) records sorted by hash
+and move, so the continuations of a position are a binary search in a
+memory map of the file.
+
+The tree is built in parallel: each process aggregates the results of a
+chunk of games into a sorted run file, and the runs are then merged into the
+tree, adding up the results of the records they share.
+"""
+
+import bisect
+import heapq
+import io
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+import chess
+import chess.pgn
+import chess.polyglot
+from core.database import PGNDatabase, default_index_path
+from core.trace import tracer
+
+# Tree file: a header, then records sorted by hash and move (big-endian, so
+# sorting the packed records sorts them by key)
+HEADER = struct.Struct('>8sI52s')       # Magic, version, database signature
+RECORD = struct.Struct('>QHIII')        # Zobrist hash, move, White wins, draws, Black wins
+KEY_SIZE = 10                           # Hash and move
+HASH = struct.Struct('>Q')
+MAGIC = b'STOCKPYE'
+
+# Version of the tree format (a tree of another version is rebuilt)
+EXPLORER_VERSION = 1
+
+# Number of plies of each game recorded in the tree
+EXPLORER_PLIES = 40
+
+# Maximum number of games aggregated by a process at a time
+CHUNK_GAMES = 1000
+
+# Index in the results of each game result (unfinished games are not recorded)
+RESULT_INDEX = {'1-0': 0, '1/2-1/2': 1, '0-1': 2}
+
+
+@dataclass
+class ExplorerMove:
+    """A move played from a position, with the results of the games that followed it."""
+
+    move: chess.Move
+    white_wins: int
+    draws: int
+    black_wins: int
+
+    @property
+    def games(self) -> int:
+        """Number of games in which the move was played."""
+        return self.white_wins + self.draws + self.black_wins
+
+
+def encode_move(move: chess.Move) -> int:
+    """Pack a move in 15 bits (from square, to square and promotion piece type)."""
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def decode_move(code: int) -> chess.Move:
+    """Unpack a move packed by encode_move."""
+    return chess.Move(code & 63, code >> 6 & 63, code >> 12 or None)
+
+
+class _OpeningMoves(chess.pgn.BaseVisitor):
+    """PGN visitor collecting the result of a game and the hash and move of its first mainline positions."""
+
+    def begin_game(self) -> None:
+        self.game_result = None
+        self.moves = []
+        self.errors = []
+
+    def visit_header(self, tagname: str, tagvalue: str) -> None:
+        if tagname == 'Result':
+            self.game_result = tagvalue
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def begin_parse_san(self, board: chess.Board, san: str):
+        # Moves past the opening are not even parsed
+        if len(self.moves) >= EXPLORER_PLIES:
+            return chess.pgn.SKIP
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        self.moves.append((chess.polyglot.zobrist_hash(board), encode_move(move)))
+
+    def handle_error(self, error: Exception) -> None:
+        # Like GameBuilder, keep the moves before the error (the parser skips the rest of the game)
+        self.errors.append(error)
+
+    def result(self) -> tuple:
+        return self.game_result, self.moves
+
+
+def _aggregate_games(task: tuple) -> int:
+    """
+    Add up the results of the opening moves of a chunk of games in a pool process.
+
+    Args:
+        task (tuple): (PGN path, byte offsets of the games followed by the
+            end of the last one, path of the run file)
+
+    Returns:
+        int: Number of games read
+    """
+    path, offsets, run_path = task
+    results: dict[tuple[int, int], list[int]] = {}
+    with open(path, 'rb') as pgn_file, mmap.mmap(pgn_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for number in range(len(offsets) - 1):
+            text = data[offsets[number]:offsets[number + 1]].decode('utf-8', errors='replace')
+            result, moves = chess.pgn.read_game(io.StringIO(text), Visitor=_OpeningMoves) or (None, ())
+            if result not in RESULT_INDEX:
+                continue
+            for key in moves:
+                counts = results.get(key)
+                if counts is None:
+                    counts = results[key] = [0, 0, 0]
+                counts[RESULT_INDEX[result]] += 1
+    with open(run_path, 'wb') as run_file:
+        run_file.write(b''.join(RECORD.pack(*key, *results[key]) for key in sorted(results)))
+    return len(offsets) - 1
+
+
+def _read_records(path: str):
+    """Stream the packed records of a run file."""
+    with open(path, 'rb') as run_file:
+        while True:
+            block = run_file.read(RECORD.size * 4096)
+            if not block:
+                return
+            for start in range(0, len(block), RECORD.size):
+                yield block[start:start + RECORD.size]
+
+
+def _merge_records(runs):
+    """Merge sorted runs of packed records, adding up the results of equal keys."""
+    pending = None
+    for record in heapq.merge(*runs):
+        if pending is not None and record[:KEY_SIZE] == pending[:KEY_SIZE]:
+            zobrist, code, *counts = RECORD.unpack(pending)
+            counts = [total + count for total, count in zip(counts, RECORD.unpack(record)[2:])]
+            pending = RECORD.pack(zobrist, code, *counts)
+            continue
+        if pending is not None:
+            yield pending
+        pending = record
+    if pending is not None:
+        yield pending
+
+
+class _RecordHashes:
+    """Read-only sequence of the hashes of the records of a tree, for bisect."""
+
+    def __init__(self, data, count: int):
+        self.data = data
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        return HASH.unpack_from(self.data, HEADER.size + index * RECORD.size)[0]
+
+
+class OpeningTree:
+    """Moves played from the opening positions of a PGN database, with their results."""
+
+    def __init__(self, database: PGNDatabase, tree_path: str = None, progress=None,
+                 cancelled: threading.Event = None, processes: int = None):
+        """
+        Open the opening tree of a database, building it if missing or out of date.
+
+        Args:
+            database (PGNDatabase): The database
+            tree_path (str): Path to the tree (default: next to the database index)
+            progress (Callable[[int, int], None]): Optional callback with
+                (games read, number of games) while the tree is built
+            cancelled (threading.Event): Optional event to abort building the tree
+            processes (int): Number of processes building the tree (default: one per core)
+
+        Raises:
+            InterruptedError: If building the tree was cancelled
+        """
+        self.tree_path = tree_path or default_index_path(database.path, '.stockpy-explorer')
+        self.file = None
+        self.data = None
+        self.count = 0
+        signature = database.signature.encode()
+        if not self._open(signature):
+            with tracer.span('explorer.build', path=database.path):
+                self._build(database, signature, progress, cancelled, processes or os.cpu_count() or 1)
+            if not self._open(signature):
+                raise ValueError(f"Invalid opening tree: {self.tree_path}")
+
+    def __len__(self) -> int:
+        """Number of (position, move) records in the tree."""
+        return self.count
+
+    def _open(self, signature: bytes) -> bool:
+        """Map the tree if it exists and was built from the current database."""
+        try:
+            tree_file = open(self.tree_path, 'rb')
+        except FileNotFoundError:
+            return False
+        header = tree_file.read(HEADER.size)
+        size = os.fstat(tree_file.fileno()).st_size
+        current = len(header) == HEADER.size and (size - HEADER.size) % RECORD.size == 0
+        if current:
+            magic, version, built_from = HEADER.unpack(header)
+            current = (magic, version, built_from.rstrip(b'\0')) == (MAGIC, EXPLORER_VERSION, signature)
+        if not current:
+            tree_file.close()
+            return False
+        self.file = tree_file
+        self.data = mmap.mmap(tree_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = (size - HEADER.size) // RECORD.size
+        self.hashes = _RecordHashes(self.data, self.count)
+        return True
+
+    def _build(self, database: PGNDatabase, signature: bytes, progress,
+               cancelled: threading.Event, processes: int) -> None:
+        """Aggregate the games in run files, in parallel, then merge them."""
+        offsets = database.offsets() + [len(database.data)]
+        games = len(offsets) - 1
+        chunk = max(1, min(CHUNK_GAMES, -(-games // (processes * 4))))
+        directory = os.path.dirname(self.tree_path)
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix='stockpy-explorer-', dir=directory) as run_directory:
+            tasks = [
+                (database.path, offsets[first:first + chunk + 1], os.path.join(run_directory, f'{first}.run'))
+                for first in range(0, games, chunk)
+            ]
+
+            # Processes are spawned rather than forked, the GUI process being multithreaded
+            done = 0
+            with multiprocessing.get_context('spawn').Pool(min(processes, max(len(tasks), 1))) as pool:
+                for read in pool.imap_unordered(_aggregate_games, tasks):
+                    if cancelled is not None and cancelled.is_set():
+                        raise InterruptedError("Building the opening tree cancelled")
+                    done += read
+                    if progress is not None:
+                        progress(done, games)
+
+            # Written under another name first, so an interrupted build is never mistaken for a complete one
+            partial_path = self.tree_path + '.partial'
+            with open(partial_path, 'wb') as tree_file:
+                tree_file.write(HEADER.pack(MAGIC, EXPLORER_VERSION, signature))
+                tree_file.writelines(_merge_records(_read_records(task[2]) for task in tasks))
+            os.replace(partial_path, self.tree_path)
+
+    def moves(self, board: chess.Board) -> list[ExplorerMove]:
+        """
+        Get the moves played from a position.
+
+        Args:
+            board (chess.Board): The position
+
+        Returns:
+            list[ExplorerMove]: The legal moves played from the position, most played first
+        """
+        key = chess.polyglot.zobrist_hash(board)
+        index = bisect.bisect_left(self.hashes, key)
+        moves = []
+        while index < self.count:
+            zobrist, code, white_wins, draws, black_wins = RECORD.unpack_from(
+                self.data, HEADER.size + index * RECORD.size)
+            if zobrist != key:
+                break
+            move = decode_move(code)
+            if board.is_legal(move):
+                moves.append(ExplorerMove(move, white_wins, draws, black_wins))
+            index += 1
+        moves.sort(key=lambda explorer_move: explorer_move.games, reverse=True)
+        return moves
+
+    def close(self) -> None:
+        """Close the tree."""
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
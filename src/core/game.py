@@ -0,0 +1,171 @@
+"""
+Game navigation model for StockPy.
+"""
+
+import chess
+import chess.pgn
+
+
+class GameHistory:
+    """
+    Game tree (mainline and variations), and the position currently displayed.
+
+    The tree is a chess.pgn.Game, so it can be imported from and exported to
+    PGN with its variations and comments. Navigation follows the current
+    line: the path from the root to the node chosen in each variation,
+    continued along the main continuation of the last chosen node. `moves`
+    holds the moves of the current line.
+
+    Navigating never discards moves: stepping and jumping update the board
+    incrementally with push/pop, starting from the nearest board snapshot
+    (taken every CHECKPOINT_INTERVAL plies) when that is closer, so the cost
+    of a jump does not grow with the length of the game. Playing a new move
+    in the middle of the game starts a variation instead of replacing the
+    moves that followed.
+    """
+
+    CHECKPOINT_INTERVAL = 32
+
+    def __init__(self, board: chess.Board = None):
+        """
+        Initialize an empty history.
+
+        Args:
+            board (chess.Board): Initial position (default: standard starting position)
+        """
+        self.load(board or chess.Board(), [])
+
+    def load(self, board: chess.Board, moves: list[chess.Move]) -> None:
+        """
+        Replace the history with a new game without variations, positioned at its end.
+
+        Args:
+            board (chess.Board): Initial position of the game
+            moves (list[chess.Move]): Moves of the game
+        """
+        game = chess.pgn.Game()
+        game.setup(board)
+        node = game
+        for move in moves:
+            node = node.add_variation(move)
+        self.load_game(game)
+        self.go_to(len(self.moves))
+
+    def load_game(self, game: chess.pgn.Game) -> None:
+        """
+        Replace the history with a game tree, positioned at its initial position.
+
+        Args:
+            game (chess.pgn.Game): The game, with its variations
+        """
+        self.game = game
+        self.start = game.board()
+        self.checkpoints: dict[int, chess.Board] = {0: self.start.copy()}
+        self.board = self.start.copy()
+        self.ply = 0
+        self.nodes: list[chess.pgn.GameNode] = [game]
+        self._follow(0, game.next())
+
+    def __len__(self) -> int:
+        """Number of moves in the current line."""
+        return len(self.moves)
+
+    @property
+    def at_end(self) -> bool:
+        """Whether the displayed position is the last one of the current line."""
+        return self.ply == len(self.moves)
+
+    @property
+    def node(self) -> chess.pgn.GameNode:
+        """Node of the displayed position."""
+        return self.nodes[self.ply]
+
+    def push(self, move: chess.Move) -> None:
+        """
+        Play a move from the displayed position.
+
+        If the move was already played from this position (in any
+        variation), that variation is followed; otherwise a new variation is
+        added (the mainline if the position had no continuation yet).
+
+        Args:
+            move (chess.Move): A legal move in the displayed position
+        """
+        node = self.node
+        child = node.variation(move) if node.has_variation(move) else node.add_variation(move)
+        if self.at_end or self.nodes[self.ply + 1] is not child:
+            self._follow(self.ply, child)
+        self._step_forward()
+
+    def switch_variation(self, offset: int) -> bool:
+        """
+        Replace the move leading to the displayed position with another variation.
+
+        Args:
+            offset (int): -1 for the previous variation, 1 for the next one
+
+        Returns:
+            bool: Whether the displayed position changed
+        """
+        if self.ply == 0:
+            return False
+        siblings = self.nodes[self.ply - 1].variations
+        index = siblings.index(self.node) + offset
+        if not 0 <= index < len(siblings):
+            return False
+        self.board.pop()
+        self.ply -= 1
+        self._follow(self.ply, siblings[index])
+        self._step_forward()
+        return True
+
+    def go_to(self, ply: int) -> bool:
+        """
+        Display the position after a number of moves of the current line.
+
+        Args:
+            ply (int): Number of moves played (0 = initial position), clamped to the line
+
+        Returns:
+            bool: Whether the displayed position changed
+        """
+        ply = max(0, min(ply, len(self.moves)))
+        if ply == self.ply:
+            return False
+
+        # Start from the closest checkpoint at or before the target if that beats stepping
+        checkpoint = max(checkpoint for checkpoint in self.checkpoints if checkpoint <= ply)
+        if ply - checkpoint < abs(ply - self.ply):
+            self.board = self.checkpoints[checkpoint].copy()
+            self.ply = checkpoint
+
+        while self.ply > ply:
+            self.board.pop()
+            self.ply -= 1
+        while self.ply < ply:
+            self._step_forward()
+        return True
+
+    def forward(self) -> bool:
+        """Display the next position. Returns whether the position changed."""
+        return self.go_to(self.ply + 1)
+
+    def back(self) -> bool:
+        """Display the previous position. Returns whether the position changed."""
+        return self.go_to(self.ply - 1)
+
+    def _follow(self, ply: int, node: chess.pgn.GameNode) -> None:
+        """Make the current line continue with a node (and its main continuation) after a ply."""
+        del self.nodes[ply + 1:]
+        if node is not None:
+            self.nodes.append(node)
+            self.nodes.extend(node.mainline())
+        self.moves = [child.move for child in self.nodes[1:]]
+        self.checkpoints = {checkpoint: board for checkpoint, board in self.checkpoints.items() if checkpoint <= ply}
+
+    def _step_forward(self) -> None:
+        """Play the next move of the current line, taking a checkpoint when due."""
+        self.board.push(self.moves[self.ply])
+        self.ply += 1
+        if self.ply % self.CHECKPOINT_INTERVAL == 0 and self.ply not in self.checkpoints:
+            self.checkpoints[self.ply] = self.board.copy()
@@ -0,0 +1,279 @@
+"""
+Engine pool and engine layout tuning for StockPy.
+
+A layout describes how the machine is split between engine processes
+(number of engines, and Threads/Hash/MultiPV of each). Layouts are sized
+automatically from the CPU count and memory, or chosen by measuring the
+speed of candidate layouts on this machine (calibration).
+"""
+
+import json
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+import chess
+from core.stockfish import StockfishEngine, PositionAnalysis
+
+# Position searched during calibration (a busy middlegame)
+CALIBRATION_FEN = 'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 9'
+
+
+@dataclass
+class EngineLayout:
+    """
+    How many engine processes to run, and how to configure each of them.
+
+    Layouts are tuned per workload: 'interactive' (one search at a time, as
+    fast as possible) or 'batch' (as many searches per second as possible).
+    """
+
+    engines: int = 1
+    threads: int = 1
+    hash_mb: int = 16
+    multipv: int = 1
+
+    def options(self) -> dict:
+        """UCI options of each engine."""
+        return {'Threads': self.threads, 'Hash': self.hash_mb, 'MultiPV': self.multipv}
+
+    def __str__(self) -> str:
+        return f"{self.engines}x{self.threads} threads, {self.hash_mb} MB hash"
+
+
+def total_memory_mb() -> int:
+    """Physical memory of the machine in MB (assume 4 GB if it cannot be determined)."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+def auto_layout(workload: str, cpu_count: int = None, memory_mb: int = None) -> EngineLayout:
+    """
+    Size a layout from the CPU count and memory of the machine.
+
+    Interactive analysis gets one engine using all cores but one (kept free
+    for the GUI) and up to 1/8 of the memory as hash. Batch analysis gets one
+    single-threaded engine per core, sharing up to 1/4 of the memory.
+
+    Args:
+        workload (str): 'interactive' or 'batch'
+        cpu_count (int): Number of cores (default: detected)
+        memory_mb (int): Physical memory in MB (default: detected)
+
+    Returns:
+        EngineLayout: The layout
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    memory_mb = memory_mb or total_memory_mb()
+    if workload == 'interactive':
+        return EngineLayout(
+            engines=1,
+            threads=max(1, cpu_count - 1),
+            hash_mb=max(16, min(memory_mb // 8, 2048)),
+        )
+    return EngineLayout(
+        engines=cpu_count,
+        threads=1,
+        hash_mb=max(16, min(memory_mb // 4 // cpu_count, 512)),
+    )
+
+
+def layout_config_path() -> str:
+    """Get the location of the calibrated layouts (in the user config directory)."""
+    config_dir = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(config_dir, 'stockpy', 'engine.json')
+
+
+def load_layout(workload: str) -> EngineLayout:
+    """
+    Get the layout for a workload: the calibrated one if any, otherwise an automatic one.
+
+    Args:
+        workload (str): 'interactive' or 'batch'
+
+    Returns:
+        EngineLayout: The layout
+    """
+    try:
+        with open(layout_config_path(), 'r') as config_file:
+            return EngineLayout(**json.load(config_file)[workload])
+    except (OSError, ValueError, KeyError, TypeError):
+        return auto_layout(workload)
+
+
+def save_layouts(layouts: dict[str, EngineLayout]) -> None:
+    """
+    Save calibrated layouts, by workload.
+
+    Args:
+        layouts (dict[str, EngineLayout]): Layout of each workload
+    """
+    path = layout_config_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as config_file:
+        json.dump({workload: asdict(layout) for workload, layout in layouts.items()}, config_file, indent=4)
+
+
+class EnginePool:
+    """
+    Pool of Stockfish processes configured from a layout.
+
+    Engines are checked out one search at a time, so up to `layout.engines`
+    positions are analysed in parallel.
+    """
+
+    def __init__(self, stockfish_path: str, layout: EngineLayout, store=None):
+        """
+        Initialize the pool.
+
+        Args:
+            stockfish_path (str): Path to the Stockfish executable
+            layout (EngineLayout): Number and configuration of the engines
+            store (AnalysisStore): Optional persistent store shared by the engines
+        """
+        self.stockfish_path = stockfish_path
+        self.layout = layout
+        self.store = store
+        self.engines: list[StockfishEngine] = []
+        self.idle = queue.Queue()
+
+    def start(self) -> None:
+        """Start all engines of the pool in parallel."""
+        self.engines = [
+            StockfishEngine(self.stockfish_path, store=self.store, options=self.layout.options())
+            for _ in range(self.layout.engines)
+        ]
+        with ThreadPoolExecutor(len(self.engines)) as executor:
+            list(executor.map(StockfishEngine.start, self.engines))
+        for engine in self.engines:
+            self.idle.put(engine)
+
+    @contextmanager
+    def engine(self):
+        """Check out an idle engine for the duration of a `with` block."""
+        engine = self.idle.get()
+        try:
+            yield engine
+        finally:
+            self.idle.put(engine)
+
+    def analyse(self, board: chess.Board, time_limit: float = 1.0, depth: int = None) -> PositionAnalysis:
+        """
+        Search a position on the next idle engine.
+
+        Args:
+            board (chess.Board): The position to analyse
+            time_limit (float): Time to think in seconds
+            depth (int): Optional depth at which to end the search early
+
+        Returns:
+            PositionAnalysis: The analysis
+        """
+        with self.engine() as engine:
+            return engine.analyse_position(board, time_limit, depth)
+
+    def analyse_many(self, boards: list[chess.Board], time_limit: float = 1.0,
+                     depth: int = None) -> list[PositionAnalysis]:
+        """
+        Search several positions, in parallel across the engines of the pool.
+
+        Args:
+            boards (list[chess.Board]): The positions to analyse
+            time_limit (float): Time to think per position in seconds
+            depth (int): Optional depth at which to end each search early
+
+        Returns:
+            list[PositionAnalysis]: The analyses, in the order of the positions
+        """
+        with ThreadPoolExecutor(len(self.engines)) as executor:
+            return list(executor.map(lambda board: self.analyse(board, time_limit, depth), boards))
+
+    def quit(self) -> None:
+        """Quit all engines of the pool."""
+        for engine in self.engines:
+            engine.quit()
+        self.engines = []
+        self.idle = queue.Queue()
+
+
+@dataclass
+class CalibrationResult:
+    """Measured speed of a layout."""
+
+    layout: EngineLayout
+    total_nps: float        # Nodes per second of all engines together (batch throughput)
+    engine_nps: float       # Nodes per second of a single engine (interactive speed)
+
+
+def candidate_layouts(cpu_count: int = None, memory_mb: int = None) -> list[EngineLayout]:
+    """
+    List the layouts worth calibrating: every way to split the cores evenly into engines.
+
+    Args:
+        cpu_count (int): Number of cores (default: detected)
+        memory_mb (int): Physical memory in MB (default: detected)
+
+    Returns:
+        list[EngineLayout]: From one engine using all cores to one engine per core
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    memory_mb = memory_mb or total_memory_mb()
+    hash_budget = max(16, min(memory_mb // 4, 4096))
+    return [
+        EngineLayout(engines=engines, threads=cpu_count // engines,
+                     hash_mb=max(16, hash_budget // engines))
+        for engines in range(1, cpu_count + 1)
+        if cpu_count % engines == 0
+    ]
+
+
+def calibrate(stockfish_path: str, layouts: list[EngineLayout] = None,
+              seconds: float = 3.0) -> list[CalibrationResult]:
+    """
+    Measure the speed of candidate layouts on this machine.
+
+    Every engine of a layout searches the same position at once for the
+    given time, so the layout is measured under full load.
+
+    Args:
+        stockfish_path (str): Path to the Stockfish executable
+        layouts (list[EngineLayout]): Layouts to measure (default: candidate_layouts())
+        seconds (float): Search time per layout
+
+    Returns:
+        list[CalibrationResult]: Measured speed of each layout
+    """
+    results = []
+    board = chess.Board(CALIBRATION_FEN)
+    for layout in layouts or candidate_layouts():
+        pool = EnginePool(stockfish_path, layout)
+        pool.start()
+        try:
+            start = time.monotonic()
+            analyses = pool.analyse_many([board] * layout.engines, seconds)
+            elapsed = max(time.monotonic() - start, 1e-6)
+        finally:
+            pool.quit()
+        total_nps = sum(analysis.nodes for analysis in analyses if analysis) / elapsed
+        results.append(CalibrationResult(layout, total_nps, total_nps / layout.engines))
+    return results
+
+
+def best_layouts(results: list[CalibrationResult]) -> dict[str, EngineLayout]:
+    """
+    Pick the fastest measured layout for each workload.
+
+    Args:
+        results (list[CalibrationResult]): Calibration measurements
+
+    Returns:
+        dict[str, EngineLayout]: Layout of each workload
+    """
+    return {
+        'interactive': max(results, key=lambda result: result.engine_nps).layout,
+        'batch': max(results, key=lambda result: result.total_nps).layout,
+    }
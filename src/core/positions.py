@@ -0,0 +1,235 @@
+"""
+Position search in PGN databases for StockPy.
+
+Every mainline position of every game of a database is recorded as a
+fixed-size (Zobrist hash, game, ply) record. The records are sorted by hash
+and saved in a file next to the database index, so finding the games that
+reach a position is a binary search in a memory map of that file.
+
+The index is built in parallel: each process parses a chunk of games and
+writes its sorted records to a run file, and the runs are then merged into
+the index.
+"""
+
+import bisect
+import heapq
+import io
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+import chess
+import chess.pgn
+import chess.polyglot
+from core.database import PGNDatabase, default_index_path
+from core.trace import tracer
+
+# Index file: a header, then records sorted by hash (big-endian, so sorting
+# the packed records sorts them by hash, game and ply)
+HEADER = struct.Struct('>8sI52s')       # Magic, version, database signature
+RECORD = struct.Struct('>QIH')          # Zobrist hash, game index, ply
+HASH = struct.Struct('>Q')
+MAGIC = b'STOCKPYP'
+
+# Version of the index format (an index of another version is rebuilt)
+POSITIONS_VERSION = 1
+
+# Maximum number of games parsed by a process at a time
+CHUNK_GAMES = 1000
+
+
+class _MainlineHashes(chess.pgn.BaseVisitor):
+    """PGN visitor collecting the Zobrist hash of each mainline position of a game."""
+
+    def begin_game(self) -> None:
+        self.hashes = []
+        self.errors = []
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def visit_board(self, board: chess.Board) -> None:
+        self.hashes.append(chess.polyglot.zobrist_hash(board))
+
+    def handle_error(self, error: Exception) -> None:
+        # Like GameBuilder, keep the positions before the error (the parser skips the rest of the game)
+        self.errors.append(error)
+
+    def result(self) -> list[int]:
+        return self.hashes
+
+
+def _index_games(task: tuple) -> int:
+    """
+    Record the positions of a chunk of games in a pool process.
+
+    Args:
+        task (tuple): (PGN path, index of the first game, byte offsets of the
+            games followed by the end of the last one, path of the run file)
+
+    Returns:
+        int: Number of games indexed
+    """
+    path, first_game, offsets, run_path = task
+    records = []
+    with open(path, 'rb') as pgn_file, mmap.mmap(pgn_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for number in range(len(offsets) - 1):
+            text = data[offsets[number]:offsets[number + 1]].decode('utf-8', errors='replace')
+            hashes = chess.pgn.read_game(io.StringIO(text), Visitor=_MainlineHashes)
+            game = first_game + number
+            for ply, zobrist in enumerate(hashes or ()):
+                if ply > 0xFFFF:
+                    break
+                records.append(RECORD.pack(zobrist, game, ply))
+    records.sort()
+    with open(run_path, 'wb') as run_file:
+        run_file.write(b''.join(records))
+    return len(offsets) - 1
+
+
+def _read_records(path: str):
+    """Stream the packed records of a run file."""
+    with open(path, 'rb') as run_file:
+        while True:
+            block = run_file.read(RECORD.size * 4096)
+            if not block:
+                return
+            for start in range(0, len(block), RECORD.size):
+                yield block[start:start + RECORD.size]
+
+
+class _RecordHashes:
+    """Read-only sequence of the hashes of the records of an index, for bisect."""
+
+    def __init__(self, data, count: int):
+        self.data = data
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        return HASH.unpack_from(self.data, HEADER.size + index * RECORD.size)[0]
+
+
+class PositionIndex:
+    """Mainline positions of the games of a PGN database, searchable by Zobrist hash."""
+
+    def __init__(self, database: PGNDatabase, index_path: str = None, progress=None,
+                 cancelled: threading.Event = None, processes: int = None):
+        """
+        Open the position index of a database, building it if missing or out of date.
+
+        Args:
+            database (PGNDatabase): The database
+            index_path (str): Path to the index (default: next to the database index)
+            progress (Callable[[int, int], None]): Optional callback with
+                (games indexed, number of games) while the index is built
+            cancelled (threading.Event): Optional event to abort building the index
+            processes (int): Number of processes building the index (default: one per core)
+
+        Raises:
+            InterruptedError: If building the index was cancelled
+        """
+        self.index_path = index_path or default_index_path(database.path, '.stockpy-positions')
+        self.file = None
+        self.data = None
+        self.count = 0
+        signature = database.signature.encode()
+        if not self._open(signature):
+            with tracer.span('positions.build', path=database.path):
+                self._build(database, signature, progress, cancelled, processes or os.cpu_count() or 1)
+            if not self._open(signature):
+                raise ValueError(f"Invalid position index: {self.index_path}")
+
+    def __len__(self) -> int:
+        """Number of positions in the index."""
+        return self.count
+
+    def _open(self, signature: bytes) -> bool:
+        """Map the index if it exists and was built from the current database."""
+        try:
+            index_file = open(self.index_path, 'rb')
+        except FileNotFoundError:
+            return False
+        header = index_file.read(HEADER.size)
+        size = os.fstat(index_file.fileno()).st_size
+        current = len(header) == HEADER.size and (size - HEADER.size) % RECORD.size == 0
+        if current:
+            magic, version, built_from = HEADER.unpack(header)
+            current = (magic, version, built_from.rstrip(b'\0')) == (MAGIC, POSITIONS_VERSION, signature)
+        if not current:
+            index_file.close()
+            return False
+        self.file = index_file
+        self.data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = (size - HEADER.size) // RECORD.size
+        self.hashes = _RecordHashes(self.data, self.count)
+        return True
+
+    def _build(self, database: PGNDatabase, signature: bytes, progress,
+               cancelled: threading.Event, processes: int) -> None:
+        """Record the positions of every game in run files, in parallel, then merge them."""
+        offsets = database.offsets() + [len(database.data)]
+        games = len(offsets) - 1
+        chunk = max(1, min(CHUNK_GAMES, -(-games // (processes * 4))))
+        directory = os.path.dirname(self.index_path)
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix='stockpy-positions-', dir=directory) as run_directory:
+            tasks = [
+                (database.path, first, offsets[first:first + chunk + 1],
+                 os.path.join(run_directory, f'{first}.run'))
+                for first in range(0, games, chunk)
+            ]
+
+            # Processes are spawned rather than forked, the GUI process being multithreaded
+            done = 0
+            with multiprocessing.get_context('spawn').Pool(min(processes, max(len(tasks), 1))) as pool:
+                for indexed in pool.imap_unordered(_index_games, tasks):
+                    if cancelled is not None and cancelled.is_set():
+                        raise InterruptedError("Indexing cancelled")
+                    done += indexed
+                    if progress is not None:
+                        progress(done, games)
+
+            # Written under another name first, so an interrupted build is never mistaken for a complete one
+            partial_path = self.index_path + '.partial'
+            with open(partial_path, 'wb') as index_file:
+                index_file.write(HEADER.pack(MAGIC, POSITIONS_VERSION, signature))
+                index_file.writelines(heapq.merge(*(_read_records(task[3]) for task in tasks)))
+            os.replace(partial_path, self.index_path)
+
+    def find(self, board: chess.Board) -> list[tuple[int, int]]:
+        """
+        Find the games reaching a position.
+
+        Args:
+            board (chess.Board): The position
+
+        Returns:
+            list[tuple[int, int]]: (game index, ply) of each game reaching the
+                position, in game order, with the first ply at which it does
+        """
+        key = chess.polyglot.zobrist_hash(board)
+        index = bisect.bisect_left(self.hashes, key)
+        matches = []
+        while index < self.count:
+            zobrist, game, ply = RECORD.unpack_from(self.data, HEADER.size + index * RECORD.size)
+            if zobrist != key:
+                break
+            if not matches or matches[-1][0] != game:
+                matches.append((game, ply))
+            index += 1
+        return matches
+
+    def close(self) -> None:
+        """Close the index."""
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,164 @@
+"""
+Background game review for StockPy.
+
+A review analyses every mainline position of a game on a dedicated engine
+process and classifies each move from the evaluation swing it causes.
+"""
+
+import threading
+import chess
+import chess.engine
+from PyQt6.QtCore import QThread, pyqtSignal
+from core.stockfish import StockfishEngine, PositionAnalysis
+from core.cache import AnalysisCache
+from core.store import AnalysisStore
+from core.tablebase import Tablebase
+
+# Evaluation loss (in pawns, from the mover's point of view) for each move
+# classification, from the most to the least severe
+CLASSIFICATIONS = [
+    (2.0, 'blunder'),
+    (1.0, 'mistake'),
+    (0.5, 'inaccuracy'),
+]
+
+# Evaluations are clamped to this range (in pawns) before comparing them, so
+# that mate scores do not dwarf every other swing
+SWING_CLAMP = 10.0
+
+
+def classify_move(before: float, after: float, color: chess.Color) -> str:
+    """
+    Classify a move from the evaluations before and after it.
+
+    Args:
+        before (float): Evaluation before the move (pawns, White's point of view)
+        after (float): Evaluation after the move (pawns, White's point of view)
+        color (chess.Color): Side that played the move
+
+    Returns:
+        str: 'blunder', 'mistake' or 'inaccuracy', or None for a good move
+    """
+    before = max(min(before, SWING_CLAMP), -SWING_CLAMP)
+    after = max(min(after, SWING_CLAMP), -SWING_CLAMP)
+    loss = before - after if color == chess.WHITE else after - before
+    for threshold, classification in CLASSIFICATIONS:
+        if loss >= threshold:
+            return classification
+    return None
+
+
+class GameReviewer(QThread):
+    """
+    Thread that analyses every mainline position of a game.
+
+    The final position is analysed first, then positions outward from the
+    focused ply (usually the one displayed), so the part of the game the user
+    is looking at fills in first. Positions already in the cache or store at
+    the review depth are not searched again.
+    """
+
+    positionAnalysed = pyqtSignal(int, object)    # Ply (0 = initial position), PositionAnalysis
+
+    def __init__(self, stockfish_path: str, positions: list[chess.Board], parent=None,
+                 cache: AnalysisCache = None, store: AnalysisStore = None,
+                 depth: int = 18, time_limit: float = 2.0, tablebase: Tablebase = None):
+        """
+        Initialize the reviewer.
+
+        Args:
+            stockfish_path (str): Path to the Stockfish executable
+            positions (list[chess.Board]): Mainline positions, starting with the initial one
+            parent (QObject): Parent object
+            cache (AnalysisCache): Optional in-memory cache to read and fill
+            store (AnalysisStore): Optional persistent store to read and fill
+            depth (int): Depth to analyse each position to
+            time_limit (float): Maximum time to think per position in seconds
+            tablebase (Tablebase): Optional endgame tablebases probed before searching
+        """
+        super().__init__(parent)
+        self.stockfish_path = stockfish_path
+        self.positions = positions
+        self.cache = cache
+        self.store = store
+        self.depth = depth
+        self.time_limit = time_limit
+        self.tablebase = tablebase
+        self.engine = None
+
+        self.lock = threading.Lock()
+        self.focus = len(positions) - 1
+        self.analysed = set()
+        self.cancelled = False
+
+    def set_focus(self, ply: int) -> None:
+        """
+        Analyse positions around a ply next.
+
+        Args:
+            ply (int): Ply to focus on (0 = initial position)
+        """
+        with self.lock:
+            self.focus = max(0, min(ply, len(self.positions) - 1))
+
+    def cancel(self) -> None:
+        """Stop reviewing as soon as possible."""
+        with self.lock:
+            self.cancelled = True
+        engine = self.engine
+        if engine is not None:
+            engine.stop()
+
+    def _next_ply(self) -> int:
+        """Get the next ply to analyse, or None when done or cancelled."""
+        with self.lock:
+            if self.cancelled:
+                return None
+            last = len(self.positions) - 1
+            if last not in self.analysed:
+                return last
+            for distance in range(len(self.positions)):
+                for ply in (self.focus - distance, self.focus + distance):
+                    if 0 <= ply <= last and ply not in self.analysed:
+                        return ply
+            return None
+
+    def _remembered(self, board: chess.Board) -> PositionAnalysis:
+        """Get the deepest cached or stored analysis of a position, if any."""
+        analysis = self.cache.get(board) if self.cache is not None else None
+        if analysis is None or analysis.depth < self.depth:
+            stored = self.engine.lookup(board)
+            if stored is not None and (analysis is None or stored.depth > analysis.depth):
+                analysis = stored
+        return analysis
+
+    def run(self) -> None:
+        """Analyse positions until all are done or the review is cancelled."""
+        try:
+            self.engine = StockfishEngine(self.stockfish_path, store=self.store, tablebase=self.tablebase)
+            self.engine.start()
+        except (FileNotFoundError, PermissionError, chess.engine.EngineError) as e:
+            self.engine = None
+            print(f"Error starting engine for game review: {e}")
+            return
+
+        try:
+            while True:
+                ply = self._next_ply()
+                if ply is None:
+                    break
+                board = self.positions[ply]
+                analysis = self._remembered(board)
+                if analysis is None or analysis.depth < self.depth:
+                    analysis = self.engine.analyse_position(board, self.time_limit, self.depth) or analysis
+                with self.lock:
+                    self.analysed.add(ply)
+                if analysis is None:
+                    continue
+
+                if self.cache is not None:
+                    self.cache.put(board, analysis)
+                self.positionAnalysed.emit(ply, analysis)
+        finally:
+            engine, self.engine = self.engine, None
+            engine.quit()
@@ -1,16 +1,234 @@
 import chess.engine
+import copy
 import os
+import threading
+from dataclasses import dataclass, field
+
+# Options that only affect search speed (tablebases only make the results
+# exact sooner), and therefore do not distinguish the results of one engine
+# configuration from another
+PERFORMANCE_OPTIONS = {'Threads', 'Hash', 'MultiPV', 'SyzygyPath'}
+
+# Environment variable overriding the location of the engine (e.g. to use
+# another build, or the fake engine of the tests)
+STOCKFISH_PATH_VARIABLE = 'STOCKPY_STOCKFISH'
+
+# Location of the Stockfish executable downloaded by the installation script
+DEFAULT_STOCKFISH_PATH = os.environ.get(STOCKFISH_PATH_VARIABLE) or os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "stockfish", "stockfish-ubuntu-x86-64-avx2"
+))
+
+
+@dataclass
+class AnalysisLine:
+    """One line (principal variation) of a MultiPV search."""
+
+    score: chess.engine.Score = None        # From White's point of view
+    depth: int = 0
+    pv: list[chess.Move] = field(default_factory=list)
+
+
+@dataclass
+class PositionAnalysis:
+    """Result of a single engine search of a position."""
+
+    score: chess.engine.Score = None        # From White's point of view
+    best_move: chess.Move = None
+    depth: int = 0
+    nodes: int = 0
+    nps: int = 0
+    pv: list[chess.Move] = field(default_factory=list)
+    lines: list[AnalysisLine] = field(default_factory=list)    # MultiPV lines, best first
+    wdl: int = None                         # Tablebase win/draw/loss (-2 to 2) for the side to move, if probed
+    dtz: int = None                         # Tablebase distance to zeroing for the side to move, if probed
+
+    def update(self, info: dict) -> None:
+        """
+        Merge an engine info line into the analysis.
+        
+        Every MultiPV line is kept in `lines`; the main line also sets the
+        score, best move and principal variation of the analysis.
+        
+        Args:
+            info (dict): Info line reported by chess.engine
+        """
+        number = info.get('multipv', 1)
+        if 'score' in info or info.get('pv'):
+            # Replace the line rather than modifying it, so that earlier
+            # copies of the analysis (handed to other threads) never change
+            lines = list(self.lines)
+            while len(lines) < number:
+                lines.append(AnalysisLine())
+            previous = lines[number - 1]
+            lines[number - 1] = AnalysisLine(
+                score=info['score'].white() if 'score' in info else previous.score,
+                depth=info.get('depth', previous.depth),
+                pv=info.get('pv') or previous.pv,
+            )
+            self.lines = lines
+        if number > 1:
+            return
+        if 'score' in info:
+            self.score = info['score'].white()
+        if 'depth' in info:
+            self.depth = info['depth']
+        if 'nodes' in info:
+            self.nodes = info['nodes']
+        if 'nps' in info:
+            self.nps = info['nps']
+        if info.get('pv'):
+            self.pv = info['pv']
+            self.best_move = self.pv[0]
+
+    @property
+    def evaluation(self) -> float:
+        """Evaluation in pawns (positive = white advantage)."""
+        if self.score is None:
+            return 0.0
+        # Convert mate scores (and tablebase wins) to high numerical values
+        if self.score.is_mate() or self.wdl in (-2, 2):
+            # Use ±100 for mate scores, with sign indicating which side has mate
+            return 100.0 if self.score > chess.engine.Cp(0) else -100.0
+        # Convert centipawns to pawns
+        return float(self.score.score()) / 100.0
+
 
 class StockfishEngine:
-    def __init__(self, stockfish_path):
-        """Initialize the Stockfish engine."""
+    def __init__(self, stockfish_path, store=None, options=None, tablebase=None):
+        """
+        Initialize the Stockfish engine.
+        
+        Args:
+            stockfish_path (str): Path to the Stockfish executable
+            store (AnalysisStore): Optional persistent store consulted with
+                lookup() and filled with the result of every search
+            options (dict): UCI options to configure on start (e.g. Threads, Hash)
+            tablebase (Tablebase): Optional endgame tablebases probed before
+                searching, and given to the engine as its SyzygyPath
+        """
         self.stockfish_path = stockfish_path
         self.engine = None
+        self.store = store
+        self.options = dict(options or {})
+
+        # Search in progress, and whether it was asked to stop. Guarded by a
+        # lock so that stop() can be called from any thread.
+        self.analysis = None
+        self.stop_requested = False
+        self.lock = threading.Lock()
+
+        # Tablebases, and whether the running engine must be given their path
+        self.tablebase = None
+        self.reconfigure = False
+        if tablebase is not None:
+            self.set_tablebase(tablebase)
 
     def start(self):
         """Start the Stockfish engine."""
         self.engine = chess.engine.SimpleEngine.popen_uci(self.stockfish_path)
 
+        # Only keep the options this engine supports. MultiPV is managed by
+        # python-chess and is passed with each search instead of configured.
+        self.options = {
+            name: value for name, value in self.options.items()
+            if name in self.engine.options
+        }
+        self.engine.configure({
+            name: value for name, value in self.options.items()
+            if not self.engine.options[name].is_managed()
+        })
+
+    @property
+    def identity(self) -> str:
+        """Name and result-affecting options of the running engine, used to key stored analyses."""
+        name = self.engine.id.get('name', os.path.basename(self.stockfish_path))
+        options = ' '.join(
+            f"{option}={value}" for option, value in sorted(self.options.items())
+            if option not in PERFORMANCE_OPTIONS
+        )
+        return f"{name} {options}".strip()
+
+    def lookup(self, board) -> PositionAnalysis:
+        """
+        Look up a previous analysis of a position in the persistent store.
+        
+        Args:
+            board (chess.Board): The current board position
+            
+        Returns:
+            PositionAnalysis: The stored analysis, or None
+        """
+        if self.store is None:
+            return None
+        return self.store.get(board, self.identity)
+
+    def analyse_position(self, board, time_limit=1.0, depth=None) -> PositionAnalysis:
+        """
+        Search the current board position once.
+        
+        The search runs for the whole time limit (or until stopped), and the
+        result combines the score, best move and principal variation of the
+        deepest completed iteration.
+        
+        Args:
+            board (chess.Board): The current board position
+            time_limit (float): Time to think in seconds, or None to search
+                until stopped
+            depth (int): Optional depth at which to end the search early
+            
+        Returns:
+            PositionAnalysis: The analysis, or None if the search was stopped
+            before it started
+        """
+        result = None
+        for result in self.stream_position(board, time_limit, depth):
+            pass
+        return result
+
+    def stream_position(self, board, time_limit=None, depth=None):
+        """
+        Search the current board position, yielding the analysis as it deepens.
+        
+        With no time limit this is an infinite analysis that keeps searching
+        until stop() is called.
+        
+        Args:
+            board (chess.Board): The current board position
+            time_limit (float): Time to think in seconds, or None to search
+                until stopped
+            depth (int): Optional depth at which to end the search early
+            
+        Yields:
+            PositionAnalysis: A snapshot of the analysis after each info line
+            carrying a score (or only the exact analysis of a position in
+            the tablebases, without searching)
+        """
+        if self.tablebase is not None:
+            probed = self.tablebase.probe(board)
+            if probed is not None:
+                yield probed
+                return
+
+        if time_limit is None and depth is None:
+            limit = None
+        else:
+            limit = chess.engine.Limit(time=time_limit, depth=depth)
+        analysis = self._begin_search(board, limit)
+        if analysis is None:
+            return
+        result = PositionAnalysis()
+        try:
+            for info in analysis:
+                result.update(info)
+                if 'score' in info:
+                    yield copy.copy(result)
+        finally:
+            self._end_search(analysis)
+
+        # Remember the result (also when the search was stopped early)
+        if self.store is not None and result.depth > 0:
+            self.store.put(board, self.identity, result)
+
     def get_best_move(self, board, time_limit=1.0) -> chess.Move:
         """
         Get the best move for the current board position.
@@ -22,11 +240,8 @@ class StockfishEngine:
         Returns:
             chess.Move: The best move suggested by Stockfish
         """
-        with self.engine.analysis(board, chess.engine.Limit(time=time_limit)) as analysis:
-            for info in analysis:
-                if "pv" in info:
-                    return info["pv"][0]
-        return None
+        analysis = self.analyse_position(board, time_limit)
+        return analysis.best_move if analysis else None
     
     def get_evaluation(self, board, time_limit=1.0) -> float:
         """
@@ -40,19 +255,76 @@ class StockfishEngine:
             float: Evaluation in pawns (positive = white advantage)
         """
         try:
-            info = self.engine.analyse(board, chess.engine.Limit(time=time_limit))
-            if 'score' in info:
-                score = info['score'].white()
-                # Convert mate scores to high numerical values
-                if score.is_mate():
-                    # Use ±100 for mate scores, with sign indicating which side has mate
-                    return 100.0 if score.mate() > 0 else -100.0
-                # Convert centipawns to pawns
-                return float(score.score()) / 100.0
+            analysis = self.analyse_position(board, time_limit)
+            if analysis:
+                return analysis.evaluation
         except Exception as e:
             print(f"Error getting evaluation: {e}")
         return 0.0
 
+    def stop(self):
+        """
+        Stop the search in progress, or the next one if it has not started yet.
+        
+        Safe to call from any thread. The stopped search returns the best
+        result found so far.
+        """
+        with self.lock:
+            self.stop_requested = True
+            if self.analysis is not None:
+                self.analysis.stop()
+
+    def set_multipv(self, lines: int) -> None:
+        """
+        Set the number of lines of the next searches.
+
+        Ignored if the engine does not support MultiPV.
+
+        Args:
+            lines (int): Number of best lines to search
+        """
+        if self.engine is None or 'MultiPV' in self.engine.options:
+            self.options['MultiPV'] = lines
+
+    def set_tablebase(self, tablebase) -> None:
+        """
+        Probe endgame tablebases before searching, and give their directory
+        to the engine (as SyzygyPath, if supported) before its next search.
+
+        Args:
+            tablebase (Tablebase): The tablebases
+        """
+        with self.lock:
+            self.tablebase = tablebase
+            if self.engine is None:
+                self.options['SyzygyPath'] = tablebase.directory
+            elif 'SyzygyPath' in self.engine.options:
+                self.options['SyzygyPath'] = tablebase.directory
+                self.reconfigure = True
+
+    def clear_stop(self):
+        """Allow searches to run again after a call to stop()."""
+        with self.lock:
+            self.stop_requested = False
+
+    def _begin_search(self, board, limit):
+        """Start a search unless a stop was requested, and track it."""
+        with self.lock:
+            if self.stop_requested:
+                return None
+            if self.reconfigure:
+                self.engine.configure({'SyzygyPath': self.options['SyzygyPath']})
+                self.reconfigure = False
+            self.analysis = self.engine.analysis(board, limit, multipv=self.options.get('MultiPV'))
+            return self.analysis
+
+    def _end_search(self, analysis):
+        """Stop tracking a finished search."""
+        with self.lock:
+            self.analysis = None
+        analysis.stop()
+        analysis.wait()
+
     def quit(self):
         """Quit the Stockfish engine."""
         if self.engine:
@@ -0,0 +1,297 @@
+"""
+Persistent analysis store for StockPy.
+
+Engine analyses are kept in a local SQLite database so that positions
+analysed in a previous session do not have to be searched again.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+import chess
+import chess.engine
+import chess.pgn
+import chess.polyglot
+from core.stockfish import StockfishEngine, PositionAnalysis
+from core.trace import tracer
+
+
+def default_store_path() -> str:
+    """Get the default location of the analysis store (in the user cache directory)."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_dir, 'stockpy', 'analysis.sqlite3')
+
+
+def position_key(board: chess.Board) -> int:
+    """Get the Zobrist hash of a position as a signed 64-bit SQLite integer."""
+    key = chess.polyglot.zobrist_hash(board)
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+class AnalysisStore:
+    """
+    SQLite-backed store of engine analyses.
+
+    Analyses are keyed by position hash and engine identity, so results from
+    different engines or engine options are never mixed. Writes are batched
+    and committed by a background thread; when the store grows beyond its
+    size limit, the least recently used analyses are evicted. A failed
+    commit is counted (store.error) and kept in `error`.
+    """
+
+    def __init__(self, path: str, max_entries: int = 500_000, batch_interval: float = 1.0):
+        """
+        Open (or create) an analysis store.
+
+        Args:
+            path (str): Path to the SQLite database file
+            max_entries (int): Maximum number of analyses to keep
+            batch_interval (float): Maximum seconds between two batched commits
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_interval = batch_interval
+        self.error = None                   # Last error of the background writer
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS analysis (
+                    position INTEGER NOT NULL,
+                    engine TEXT NOT NULL,
+                    depth INTEGER NOT NULL,
+                    nodes INTEGER NOT NULL,
+                    score_cp INTEGER,
+                    score_mate INTEGER,
+                    pv TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (position, engine)
+                )
+            """)
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS analysis_last_used ON analysis (last_used)'
+            )
+            self.connection.commit()
+            # Kept up to date by the writes, so that batches need not count the rows
+            self.entries = self.connection.execute('SELECT COUNT(*) FROM analysis').fetchone()[0]
+
+        # Background writer
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name='AnalysisStoreWriter', daemon=True)
+        self.writer.start()
+
+    def get(self, board: chess.Board, engine: str) -> PositionAnalysis:
+        """
+        Look up the analysis of a position.
+
+        Args:
+            board (chess.Board): The position to look up
+            engine (str): Identity of the engine that analysed it
+
+        Returns:
+            PositionAnalysis: The stored analysis, or None
+        """
+        key = position_key(board)
+        with tracer.span('store.lookup'), self.lock:
+            row = self.connection.execute(
+                'SELECT depth, nodes, score_cp, score_mate, pv FROM analysis '
+                'WHERE position = ? AND engine = ?',
+                (key, engine)
+            ).fetchone()
+        tracer.count('store.hit' if row is not None else 'store.miss')
+        if row is None:
+            return None
+
+        # Mark as recently used (batched with the writes)
+        self.writes.put(('touch', key, engine))
+
+        depth, nodes, score_cp, score_mate, pv = row
+        if score_mate is not None:
+            score = chess.engine.Mate(score_mate)
+        elif score_cp is not None:
+            score = chess.engine.Cp(score_cp)
+        else:
+            score = None
+        moves = [chess.Move.from_uci(uci) for uci in pv.split()]
+        return PositionAnalysis(
+            score=score,
+            best_move=moves[0] if moves else None,
+            depth=depth,
+            nodes=nodes,
+            pv=moves,
+        )
+
+    def put(self, board: chess.Board, engine: str, analysis: PositionAnalysis) -> None:
+        """
+        Queue the analysis of a position for storage.
+
+        A stored analysis is only replaced by a deeper one.
+
+        Args:
+            board (chess.Board): The analysed position
+            engine (str): Identity of the engine that analysed it
+            analysis (PositionAnalysis): The analysis to store
+        """
+        score_cp = score_mate = None
+        if analysis.score is not None:
+            if analysis.score.is_mate():
+                score_mate = analysis.score.mate()
+            else:
+                score_cp = analysis.score.score()
+        pv = ' '.join(move.uci() for move in analysis.pv)
+        self.writes.put(('put', position_key(board), engine,
+                         analysis.depth, analysis.nodes, score_cp, score_mate, pv))
+
+    def flush(self) -> None:
+        """Block until all queued writes are committed."""
+        self.writes.join()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        self.writes.put(None)
+        self.writer.join()
+        with self.lock:
+            self.connection.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.entries
+
+    def _write_loop(self) -> None:
+        """Commit queued writes in batches until closed."""
+        running = True
+        while running:
+            # Wait for a first write, then gather everything queued in the batch interval
+            batch = [self.writes.get()]
+            deadline = time.monotonic() + self.batch_interval
+            while batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.writes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+
+            try:
+                self._commit([write for write in batch if write is not None])
+            except sqlite3.Error as e:
+                self.error = e
+                tracer.count('store.error')
+            finally:
+                for _ in batch:
+                    self.writes.task_done()
+
+    def _commit(self, batch: list) -> None:
+        """Apply a batch of writes in one transaction, evicting if over the size limit."""
+        if not batch:
+            return
+        now = time.time()
+        puts = [write[1:] + (now,) for write in batch if write[0] == 'put']
+        touches = [(now,) + write[1:] for write in batch if write[0] == 'touch']
+        updates = [put[2:] + put[:2] + (put[2],) for put in puts]
+        with self.lock:
+            with self.connection:
+                self.connection.executemany(
+                    'UPDATE analysis SET last_used = ? WHERE position = ? AND engine = ?',
+                    touches
+                )
+                # Insert the new positions (counting them), then deepen the known ones
+                count = self.entries + self.connection.executemany("""
+                    INSERT INTO analysis (position, engine, depth, nodes, score_cp, score_mate, pv, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (position, engine) DO NOTHING
+                """, puts).rowcount
+                self.connection.executemany("""
+                    UPDATE analysis SET depth = ?, nodes = ?, score_cp = ?, score_mate = ?, pv = ?, last_used = ?
+                    WHERE position = ? AND engine = ? AND depth <= ?
+                """, updates)
+                if count > self.max_entries:
+                    count -= self.connection.execute(
+                        'DELETE FROM analysis WHERE rowid IN '
+                        '(SELECT rowid FROM analysis ORDER BY last_used LIMIT ?)',
+                        (count - self.max_entries,)
+                    ).rowcount
+            # Only once the transaction is committed
+            self.entries = count
+
+
+class StoreWarmer(threading.Thread):
+    """
+    Background thread that fills an analysis store from the games of a PGN file.
+
+    It runs its own engine process, so it does not compete with interactive
+    analysis for the engine, and skips positions already stored deep enough.
+    An engine that cannot start is counted (store.warm_error) and kept in
+    `error`.
+    """
+
+    def __init__(self, store: AnalysisStore, stockfish_path: str, pgn_path: str,
+                 depth: int = 20, time_limit: float = 2.0):
+        """
+        Initialize the warmer.
+
+        Args:
+            store (AnalysisStore): Store to fill
+            stockfish_path (str): Path to the Stockfish executable
+            pgn_path (str): PGN file whose mainline positions to analyse
+            depth (int): Stored depth considered good enough to skip a position
+            time_limit (float): Time to think per position in seconds
+        """
+        super().__init__(name='StoreWarmer', daemon=True)
+        self.store = store
+        self.stockfish_path = stockfish_path
+        self.pgn_path = pgn_path
+        self.depth = depth
+        self.time_limit = time_limit
+        self.engine = None
+        self.cancelled = threading.Event()
+        self.analysed = 0
+        self.error = None
+
+    def cancel(self) -> None:
+        """Stop warming as soon as possible."""
+        self.cancelled.set()
+        engine = self.engine
+        if engine is not None:
+            engine.stop()
+
+    def run(self) -> None:
+        """Analyse every mainline position of every game in the PGN file."""
+        try:
+            self.engine = StockfishEngine(self.stockfish_path, store=self.store)
+            self.engine.start()
+        except (FileNotFoundError, PermissionError, chess.engine.EngineError) as e:
+            self.engine = None
+            self.error = e
+            tracer.count('store.warm_error')
+            return
+
+        try:
+            with open(self.pgn_path, 'r') as pgn_file:
+                while not self.cancelled.is_set():
+                    game = chess.pgn.read_game(pgn_file)
+                    if game is None:
+                        break
+                    board = game.board()
+                    for move in [None] + list(game.mainline_moves()):
+                        if move is not None:
+                            board.push(move)
+                        if self.cancelled.is_set():
+                            break
+                        stored = self.engine.lookup(board)
+                        if stored is None or stored.depth < self.depth:
+                            self.engine.analyse_position(board, self.time_limit)
+                            self.analysed += 1
+        finally:
+            engine, self.engine = self.engine, None
+            engine.quit()
@@ -0,0 +1,111 @@
+"""
+Endgame tablebases for StockPy.
+
+Syzygy tablebases hold the exact result of every position with few pieces:
+WDL tables its win/draw/loss value, and DTZ tables its distance to the next
+zeroing move (capture or pawn move) with best play. Probing them takes a
+few table reads, so positions within the piece limit of the available
+tables are answered without searching.
+
+The tables of a directory are opened lazily by python-chess when first
+probed and kept open, so one Tablebase is shared by everything that probes
+(the directory is also given to the engine as its SyzygyPath).
+"""
+
+import threading
+import chess
+import chess.engine
+import chess.syzygy
+from core.stockfish import PositionAnalysis
+from core.trace import tracer
+
+# Score of a tablebase win in centipawns, less the DTZ of the position (as
+# Stockfish reports them), so faster wins score higher
+TABLEBASE_WIN_SCORE = 20000
+
+
+class Tablebase:
+    """Syzygy tablebases of a directory, probed for exact endgame analyses."""
+
+    def __init__(self, directory: str):
+        """
+        Open the tablebases of a directory.
+
+        Args:
+            directory (str): Directory with the .rtbw and .rtbz files
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        self.directory = directory
+        self.tables = chess.syzygy.open_tablebase(directory)
+        # Table names list the pieces of both sides, e.g. KRPvKR
+        self.max_pieces = max((len(name) - 1 for name in self.tables.wdl), default=0)
+        self.lock = threading.Lock()
+
+    def probe(self, board: chess.Board) -> PositionAnalysis:
+        """
+        Get the exact analysis of a position from the tables.
+
+        The analysis has the WDL and DTZ of the position, and as best move
+        the one that keeps the best result with the best DTZ (the fastest
+        zeroing move when winning, the slowest when losing).
+
+        Args:
+            board (chess.Board): The position
+
+        Returns:
+            PositionAnalysis: The analysis, or None if the position is not
+            in the tables (too many pieces, castling rights, missing table)
+        """
+        if chess.popcount(board.occupied) > self.max_pieces or board.castling_rights or board.is_game_over():
+            return None
+        with tracer.span('tablebase.probe'), self.lock:
+            try:
+                wdl = self.tables.probe_wdl(board)
+                dtz = self.tables.probe_dtz(board)
+                best_move = self._best_move(board)
+            except KeyError:
+                tracer.count('tablebase.miss')
+                return None
+        tracer.count('tablebase.hit')
+
+        if wdl == 2:
+            score = chess.engine.Cp(TABLEBASE_WIN_SCORE - abs(dtz))
+        elif wdl == -2:
+            score = chess.engine.Cp(-TABLEBASE_WIN_SCORE + abs(dtz))
+        else:
+            # Draws, and wins or losses drawn by the 50-move rule
+            score = chess.engine.Cp(0)
+        return PositionAnalysis(
+            score=chess.engine.PovScore(score, board.turn).white(),
+            best_move=best_move,
+            pv=[best_move],
+            wdl=wdl,
+            dtz=dtz,
+        )
+
+    def _best_move(self, board: chess.Board) -> chess.Move:
+        """Find the move that minmaxes the WDL and then the DTZ of the resulting positions."""
+        board = board.copy(stack=False)
+        best_move, best_key = None, None
+        for move in list(board.legal_moves):
+            zeroing = board.is_zeroing(move)
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    return move
+                wdl = -self.tables.probe_wdl(board)
+                # Plies until the next zeroing move if this one is played
+                plies = 1 if zeroing else abs(self.tables.probe_dtz(board)) + 1
+            finally:
+                board.pop()
+            key = (wdl, -plies if wdl > 0 else plies)
+            if best_key is None or key > best_key:
+                best_move, best_key = move, key
+        return best_move
+
+    def close(self) -> None:
+        """Close the open tables."""
+        with self.lock:
+            self.tables.close()
@@ -0,0 +1,199 @@
+"""
+Lightweight instrumentation for StockPy.
+
+Spans time a block of code, counters count events and gauges sample a value
+(e.g. the engine speed). Nothing is recorded unless tracing is enabled: a
+disabled span is a shared no-op context manager and a disabled counter or
+gauge a single attribute check, so the instrumentation stays in the hot
+paths at almost no cost.
+
+When enabled, the tracer keeps a short summary per name (for the stats
+overlay), and optionally every event, to be exported as JSON lines or as a
+Chrome trace file (chrome://tracing, Perfetto):
+
+    from core.trace import tracer
+
+    with tracer.span('board.update_display'):
+        ...
+    tracer.count('cache.hit')
+    tracer.gauge('engine.nps', analysis.nps)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Number of recent durations kept per span name for the summary
+RECENT_SPANS = 64
+
+
+class _NullSpan:
+    """Span used while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Span timing a block of code while tracing is enabled."""
+
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    """Records spans, counters and gauges while enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = None                                  # Recorded events, if kept for export
+        self.recent: dict[str, deque] = {}                  # Span name -> recent durations (ns)
+        self.spans: dict[str, int] = {}                     # Span name -> number of spans
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.origin = time.perf_counter_ns()
+        self.lock = threading.Lock()
+
+    def enable(self, keep_events: bool = False) -> None:
+        """
+        Start recording.
+
+        Args:
+            keep_events (bool): Keep every event for export (otherwise only the summary)
+        """
+        with self.lock:
+            if keep_events and self.events is None:
+                self.events = []
+            self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording (what was recorded is kept)."""
+        self.enabled = False
+
+    def span(self, name: str, **args):
+        """
+        Time a block of code (use as a context manager).
+
+        Args:
+            name (str): Name of the span, e.g. 'board.update_display'
+            **args: Details of this span, kept with the event
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name: str, start: int, end: int, args: dict = None) -> None:
+        """
+        Record a span measured elsewhere (e.g. across threads or events).
+
+        Args:
+            name (str): Name of the span
+            start (int): time.perf_counter_ns() at the start
+            end (int): time.perf_counter_ns() at the end
+            args (dict): Optional details of this span
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            recent = self.recent.get(name)
+            if recent is None:
+                recent = self.recent[name] = deque(maxlen=RECENT_SPANS)
+            recent.append(end - start)
+            self.spans[name] = self.spans.get(name, 0) + 1
+            if self.events is not None:
+                self.events.append(('span', name, start, end - start, threading.get_ident(), args or None))
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        with self.lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+            if self.events is not None:
+                self.events.append(('counter', name, time.perf_counter_ns(), total, threading.get_ident(), None))
+
+    def gauge(self, name: str, value: float) -> None:
+        """Sample the current value of a quantity."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[name] = value
+            if self.events is not None:
+                self.events.append(('gauge', name, time.perf_counter_ns(), value, threading.get_ident(), None))
+
+    def mean_duration(self, name: str) -> float:
+        """Mean duration of the recent spans of a name in milliseconds (None if there are none)."""
+        with self.lock:
+            recent = self.recent.get(name)
+            if not recent:
+                return None
+            return sum(recent) / len(recent) / 1e6
+
+    def export(self, path: str) -> None:
+        """
+        Write the recorded events to a file.
+
+        Args:
+            path (str): Output file, a Chrome trace if it ends with .json, JSON lines otherwise
+        """
+        if path.endswith('.json'):
+            self.export_chrome(path)
+        else:
+            self.export_jsonl(path)
+
+    def export_jsonl(self, path: str) -> None:
+        """Write the recorded events as JSON lines (times in microseconds since the tracer was created)."""
+        with self.lock:
+            events = list(self.events or ())
+        with open(path, 'w') as output_file:
+            for kind, name, start, value, thread, args in events:
+                record = {'type': kind, 'name': name, 'time': (start - self.origin) / 1000, 'thread': thread}
+                if kind == 'span':
+                    record['duration'] = value / 1000
+                else:
+                    record['value'] = value
+                if args:
+                    record['args'] = args
+                output_file.write(json.dumps(record, default=str) + '\n')
+
+    def export_chrome(self, path: str) -> None:
+        """Write the recorded events in the Chrome trace event format."""
+        with self.lock:
+            events = list(self.events or ())
+        pid = os.getpid()
+        trace_events = []
+        for kind, name, start, value, thread, args in events:
+            event = {'name': name, 'pid': pid, 'tid': thread, 'ts': (start - self.origin) / 1000}
+            if kind == 'span':
+                event.update(ph='X', dur=value / 1000)
+                if args:
+                    event['args'] = args
+            else:
+                event.update(ph='C', args={'value': value})
+            trace_events.append(event)
+        with open(path, 'w') as output_file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, output_file, default=str)
+
+
+# Tracer of the application
+tracer = Tracer()
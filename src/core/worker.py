@@ -0,0 +1,270 @@
+"""
+Background engine worker for StockPy.
+
+The worker owns the Stockfish process and runs every search on its own
+thread, so the GUI thread never blocks on the engine.
+"""
+
+import threading
+import time
+import chess
+import chess.engine
+from PyQt6.QtCore import QThread, pyqtSignal
+from core.stockfish import StockfishEngine, PositionAnalysis
+from core.cache import AnalysisCache
+from core.store import AnalysisStore
+from core.tablebase import Tablebase
+from core.trace import tracer
+
+# Precomputed analysis of the starting position, shown while the engine is
+# still starting up. It is shallower than the default target depth, so it
+# is replaced by a real search as soon as the engine is ready.
+STARTING_POSITION_ANALYSIS = PositionAnalysis(
+    score=chess.engine.Cp(30),
+    best_move=chess.Move.from_uci('e2e4'),
+    depth=20,
+    pv=[chess.Move.from_uci(uci) for uci in ('e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5')],
+)
+
+
+class EngineWorker(QThread):
+    """
+    Thread that owns a Stockfish engine and serves position requests.
+
+    Requests are scheduled so that only the latest position is ever analysed:
+    a request for a new position replaces the pending request and stops the
+    search in progress, and bursts of requests (e.g. clicking quickly through
+    the move list) are debounced before searching.
+
+    While a search runs, the deepening analysis is kept as a single latest
+    snapshot that the GUI polls with take_update() at its own refresh rate,
+    so a fast info stream never causes more than one repaint per frame.
+
+    Positions in the optional endgame tablebases are answered exactly by
+    probing them, without searching. Other results are remembered in an
+    analysis cache, backed by an optional persistent store. A remembered
+    analysis at least `target_depth` deep (and with as many lines as the
+    MultiPV setting asks for) is served without searching; another one is
+    shown immediately while a new search runs. The cache starts with a
+    precomputed analysis of the starting position, so a new game shows an
+    analysis before the engine has even started.
+    """
+
+    # Signals emitted with the FEN of the analysed position, so that
+    # receivers can discard results for positions no longer displayed
+    analysisReady = pyqtSignal(str, object)     # FEN, final PositionAnalysis
+    engineReady = pyqtSignal()                  # The engine started and accepts searches
+    engineFailed = pyqtSignal(str)              # Error message
+
+    def __init__(self, stockfish_path: str, parent=None, debounce: float = 0.1,
+                 target_depth: int = 24, store: AnalysisStore = None, options: dict = None,
+                 tablebase: Tablebase = None):
+        """
+        Initialize the engine worker.
+
+        Args:
+            stockfish_path (str): Path to the Stockfish executable
+            parent (QObject): Parent object
+            debounce (float): Seconds without new requests to wait before searching
+            target_depth (int): Depth at which a remembered analysis is final
+            store (AnalysisStore): Optional persistent analysis store
+            options (dict): UCI options of the engine (e.g. Threads, Hash)
+            tablebase (Tablebase): Optional endgame tablebases probed before searching
+        """
+        super().__init__(parent)
+        self.stockfish_path = stockfish_path
+        self.store = store
+        self.options = dict(options or {})
+        self.multipv = self.options.get('MultiPV', 1)
+        self.debounce = debounce
+        self.target_depth = target_depth
+        self.tablebase = tablebase
+        self.engine = None
+        self.ready_time = None          # time.perf_counter() when the engine became ready
+        self.cache = AnalysisCache()
+        self.cache.put(chess.Board(), STARTING_POSITION_ANALYSIS)
+
+        # Scheduler state, guarded by the condition
+        self.condition = threading.Condition()
+        self.pending = None             # (board, time_limit, seed_depth) to search next
+        self.current_fen = None         # Position being searched, if any
+        self.update = None              # (FEN, PositionAnalysis) not yet taken
+        self.last_request_time = 0.0
+        self.stopping = False
+
+    def request_analysis(self, board: chess.Board, time_limit: float) -> None:
+        """
+        Schedule a search of a position, replacing any previous request.
+
+        Args:
+            board (chess.Board): The position to analyse (copied)
+            time_limit (float): Time to think in seconds, or None for an
+                infinite analysis that runs until the next request
+        """
+        tracer.count('engine.requests')
+        fen = board.fen()
+        probed = self.tablebase.probe(board) if self.tablebase is not None else None
+        cached = self.cache.get(board) if probed is None else None
+        with self.condition:
+            # Show an exact or cached analysis right away, and only search if it is not final
+            if probed is not None:
+                self.update = (fen, probed)
+                self.pending = None
+            elif cached is not None and self._is_final(cached):
+                self.update = (fen, cached)
+                self.pending = None
+            else:
+                self.update = (fen, cached) if cached is not None else None
+                seed_depth = cached.depth if cached is not None and self._has_lines(cached) else 0
+                self.pending = (board.copy(), time_limit, seed_depth)
+            self.last_request_time = time.monotonic()
+
+            # The search in progress is obsolete if it is for another position
+            if self.current_fen is not None and self.current_fen != fen and self.engine is not None:
+                self.engine.stop()
+            self.condition.notify()
+
+    def set_multipv(self, lines: int) -> None:
+        """
+        Set the number of lines searched, stopping the search in progress.
+
+        The position must be requested again to search it with the new setting.
+
+        Args:
+            lines (int): Number of best lines to search
+        """
+        with self.condition:
+            self.multipv = lines
+            self.options['MultiPV'] = lines
+            if self.engine is not None:
+                self.engine.set_multipv(lines)
+                self.engine.stop()
+
+    def set_tablebase(self, tablebase: Tablebase) -> None:
+        """
+        Probe endgame tablebases before searching (the engine is also given
+        their directory before its next search).
+
+        Args:
+            tablebase (Tablebase): The tablebases
+        """
+        with self.condition:
+            self.tablebase = tablebase
+            if self.engine is not None:
+                self.engine.set_tablebase(tablebase)
+
+    def _has_lines(self, analysis: PositionAnalysis) -> bool:
+        """Whether an analysis has as many lines as searches currently produce."""
+        return self.multipv <= 1 or len(analysis.lines) >= self.multipv
+
+    def _is_final(self, analysis: PositionAnalysis) -> bool:
+        """Whether a remembered analysis can be served without searching."""
+        return analysis.depth >= self.target_depth and self._has_lines(analysis)
+
+    def take_update(self):
+        """
+        Take the latest intermediate analysis, if any arrived since the last call.
+
+        Returns:
+            tuple: (FEN, PositionAnalysis), or None if there is nothing new
+        """
+        with self.condition:
+            update, self.update = self.update, None
+            return update
+
+    def shutdown(self) -> None:
+        """Stop serving requests, quit the engine and wait for the thread."""
+        with self.condition:
+            self.stopping = True
+            self.pending = None
+            if self.engine is not None:
+                self.engine.stop()
+            self.condition.notify()
+        self.wait()
+
+    def _next_request(self):
+        """
+        Wait for the next request to serve.
+
+        Returns:
+            tuple: (board, time_limit, seed_depth), or None when shutting down
+        """
+        with self.condition:
+            self.current_fen = None
+            while True:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if self.stopping:
+                    return None
+
+                # Debounce bursts of requests
+                remaining = self.last_request_time + self.debounce - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+
+                request, self.pending = self.pending, None
+                self.current_fen = request[0].fen()
+                self.engine.clear_stop()
+                return request
+
+    def _is_current(self, fen: str) -> bool:
+        """Whether no request for a different position arrived since this one."""
+        with self.condition:
+            return self.current_fen == fen and not self.engine.stop_requested
+
+    def run(self) -> None:
+        """Start the engine and serve requests until shut down."""
+        try:
+            with self.condition:
+                self.engine = StockfishEngine(self.stockfish_path, store=self.store, options=self.options,
+                                              tablebase=self.tablebase)
+            self.engine.start()
+        except (FileNotFoundError, PermissionError, chess.engine.EngineError) as e:
+            self.engine = None
+            self.engineFailed.emit(str(e))
+            return
+        self.ready_time = time.perf_counter()
+        self.engineReady.emit()
+
+        try:
+            while True:
+                request = self._next_request()
+                if request is None:
+                    break
+                board, time_limit, seed_depth = request
+                fen = board.fen()
+
+                # Check the persistent store before searching
+                stored = self.engine.lookup(board)
+                if stored is not None and stored.depth > seed_depth and self._has_lines(stored):
+                    self.cache.put(board, stored)
+                    seed_depth = stored.depth
+                    with self.condition:
+                        if self.current_fen == fen and not self.engine.stop_requested:
+                            self.update = (fen, stored)
+                    if self._is_final(stored):
+                        if self._is_current(fen):
+                            self.analysisReady.emit(fen, stored)
+                        continue
+
+                analysis = None
+                with tracer.span('engine.search', fen=fen):
+                    for analysis in self.engine.stream_position(board, time_limit):
+                        # Keep showing the cached analysis until the search is deeper
+                        if analysis.depth < seed_depth:
+                            continue
+                        with self.condition:
+                            if self.current_fen == fen and not self.engine.stop_requested:
+                                self.update = (fen, analysis)
+                if analysis is None:
+                    continue
+
+                # Remember the result even if the search was preempted
+                self.cache.put(board, analysis)
+                if analysis.depth >= seed_depth and self._is_current(fen):
+                    self.analysisReady.emit(fen, analysis)
+        finally:
+            with self.condition:
+                engine, self.engine = self.engine, None
+            engine.quit()
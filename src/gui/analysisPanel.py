@@ -0,0 +1,267 @@
+"""
+Engine analysis panel for StockPy.
+"""
+
+import chess
+import chess.engine
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListView, QLabel, QSpinBox, QAbstractItemView
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractListModel, QModelIndex
+from core.stockfish import AnalysisLine, PositionAnalysis
+from core.book import BookMove
+
+# Maximum number of lines the panel can show
+MAX_LINES = 5
+
+
+def format_score(score: chess.engine.Score) -> str:
+    """Format a score from White's point of view (e.g. +0.35, #3, #-2)."""
+    if score is None:
+        return '-'
+    if score.is_mate():
+        return f"#{score.mate()}"
+    return f"{score.score() / 100:+.2f}"
+
+
+class SanCache:
+    """
+    SAN text of principal variations from a position, converted lazily and cached per PV.
+
+    The PVs of a deepening search mostly share their first moves, so the SAN
+    of each move is cached by the PV prefix ending with it, and the text of
+    each PV by the PV itself: showing an unchanged line again costs one
+    lookup, and a line that changed only converts its new moves.
+    """
+
+    def __init__(self, board: chess.Board):
+        self.board = board.copy(stack=False)
+        self.moves: dict[tuple, str] = {}   # PV prefix -> SAN of its last move
+        self.texts: dict[tuple, str] = {}   # PV -> numbered SAN text
+
+    def text(self, pv: list[chess.Move]) -> str:
+        """Get the numbered SAN text of a PV (e.g. '12... Nf6 13. e5')."""
+        key = tuple(pv)
+        text = self.texts.get(key)
+        if text is None:
+            text = self.texts[key] = self._format(key)
+        return text
+
+    def _format(self, pv: tuple) -> str:
+        """Convert a PV to numbered SAN, reusing the SAN of its cached prefixes."""
+        board = None
+        turn = self.board.turn
+        number = self.board.fullmove_number
+        parts = []
+        for index, move in enumerate(pv):
+            prefix = pv[:index + 1]
+            san = self.moves.get(prefix)
+            if san is None:
+                # Replay the cached part of the PV once, then follow along
+                if board is None:
+                    board = self.board.copy(stack=False)
+                    for previous in pv[:index]:
+                        board.push(previous)
+                if not board.is_legal(move):
+                    break
+                san = self.moves[prefix] = board.san(move)
+            if board is not None:
+                board.push(move)
+
+            if turn == chess.WHITE:
+                parts.append(f"{number}. {san}")
+            else:
+                parts.append(san if index else f"{number}... {san}")
+                number += 1
+            turn = not turn
+        return ' '.join(parts)
+
+
+class AnalysisLinesModel(QAbstractListModel):
+    """
+    Lines of the engine analysis of the displayed position, one row per line.
+
+    Updates only signal the rows that changed, and the text of a row (with
+    the SAN of its PV) is only built when the view paints it.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lines: list[AnalysisLine] = []
+        self.san = SanCache(chess.Board())
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.lines)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        line = self.lines[index.row()]
+        return f"{format_score(line.score):>6}  d{line.depth:<2}  {self.san.text(line.pv)}"
+
+    def set_position(self, board: chess.Board) -> None:
+        """Clear the lines for a new position."""
+        self.beginResetModel()
+        self.lines = []
+        self.san = SanCache(board)
+        self.endResetModel()
+
+    def set_lines(self, lines: list[AnalysisLine]) -> None:
+        """Show the latest lines of the analysis of the position."""
+        lines = lines[:MAX_LINES]
+        old_count, new_count = len(self.lines), len(lines)
+        changed = [
+            row for row in range(min(old_count, new_count))
+            if (lines[row].score, lines[row].depth, lines[row].pv)
+            != (self.lines[row].score, self.lines[row].depth, self.lines[row].pv)
+        ]
+
+        if new_count < old_count:
+            self.beginRemoveRows(QModelIndex(), new_count, old_count - 1)
+            self.lines = lines
+            self.endRemoveRows()
+        elif new_count > old_count:
+            self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+            self.lines = lines
+            self.endInsertRows()
+        else:
+            self.lines = lines
+        if changed:
+            self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+
+
+class AnalysisPanel(QWidget):
+    """
+    Widget that shows the best lines of the engine analysis, with scores and
+    SAN principal variations, and the opening book moves of the position.
+    """
+
+    # Signal emitted when the number of lines to search changes
+    linesChanged = pyqtSignal(int)
+
+    def __init__(self, parent=None, dark_theme=True, lines: int = 1):
+        """
+        Initialize the analysis panel.
+
+        Args:
+            parent: Parent widget
+            dark_theme (bool): Use the dark colors
+            lines (int): Initial number of lines
+        """
+        super().__init__(parent)
+        text_color = "white" if dark_theme else "black"
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(5)
+
+        # Add title, with the number of lines
+        header = QHBoxLayout()
+        title = QLabel("Engine Lines")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setStyleSheet(f"""
+            QLabel {{
+                color: {text_color};
+                font-size: 14px;
+                font-weight: bold;
+                padding: 5px;
+                background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
+                border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
+                border-radius: 4px;
+            }}
+        """)
+        header.addWidget(title, stretch=1)
+        self.lines_box = QSpinBox()
+        self.lines_box.setRange(1, MAX_LINES)
+        self.lines_box.setValue(max(1, min(lines, MAX_LINES)))
+        self.lines_box.setPrefix("Lines: ")
+        self.lines_box.valueChanged.connect(self.linesChanged)
+        header.addWidget(self.lines_box)
+        layout.addLayout(header)
+
+        # Add the book moves of the position (hidden when out of book)
+        self.book_label = QLabel()
+        self.book_label.setWordWrap(True)
+        self.book_label.setStyleSheet(f"QLabel {{ color: {text_color}; font-size: 13px; padding: 2px 5px; }}")
+        self.book_label.hide()
+        layout.addWidget(self.book_label)
+
+        # Add the exact result of the position, when found in the tablebases
+        self.tablebase_label = QLabel()
+        self.tablebase_label.setStyleSheet(self.book_label.styleSheet())
+        self.tablebase_label.hide()
+        layout.addWidget(self.tablebase_label)
+
+        # Create the list of lines (one text row each, cut at the width of the panel)
+        self.model = AnalysisLinesModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setWordWrap(False)
+        self.list_view.setTextElideMode(Qt.TextElideMode.ElideRight)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.setStyleSheet(f"""
+            QListView {{
+                color: {text_color};
+                background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
+                font-family: monospace;
+                font-size: 13px;
+                border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
+                border-radius: 4px;
+            }}
+        """)
+        self.list_view.ensurePolished()
+        row_height = self.list_view.fontMetrics().height() + 4
+        self.list_view.setFixedHeight(row_height * MAX_LINES + 8)
+        layout.addWidget(self.list_view)
+
+        self.setMinimumWidth(200)
+
+    def set_position(self, board: chess.Board) -> None:
+        """Clear the lines for a new position."""
+        self.model.set_position(board)
+        self.tablebase_label.hide()
+
+    def set_book_moves(self, moves: list[BookMove]) -> None:
+        """Show the book moves of the displayed position, with their share of the weights."""
+        if not moves:
+            self.book_label.hide()
+            return
+        board = self.model.san.board
+        self.book_label.setText("Book: " + ", ".join(
+            f"{board.san(book_move.move)} {book_move.share:.0%}" for book_move in moves[:MAX_LINES]
+        ))
+        self.book_label.show()
+
+    def set_analysis(self, analysis: PositionAnalysis) -> None:
+        """Show the lines of an analysis of the displayed position."""
+        if analysis.wdl is not None:
+            self._show_tablebase_result(analysis)
+            return
+        lines = analysis.lines
+        if not lines and analysis.pv:
+            # Remembered analyses only keep their main line
+            lines = [AnalysisLine(analysis.score, analysis.depth, analysis.pv)]
+        self.model.set_lines(lines)
+
+    def _show_tablebase_result(self, analysis: PositionAnalysis) -> None:
+        """Show the exact result of a position found in the tablebases instead of engine lines."""
+        board = self.model.san.board
+        side = "White" if board.turn == chess.WHITE else "Black"
+        if analysis.wdl == 2:
+            result = f"{side} wins"
+        elif analysis.wdl == -2:
+            result = f"{side} loses"
+        elif analysis.wdl == 1:
+            result = f"{side} wins, drawn by the 50-move rule"
+        elif analysis.wdl == -1:
+            result = f"{side} loses, drawn by the 50-move rule"
+        else:
+            result = "Draw"
+        text = f"Tablebase: {result}"
+        if analysis.dtz:
+            text += f" (DTZ {abs(analysis.dtz)})"
+        if analysis.best_move is not None:
+            text += f", best {board.san(analysis.best_move)}"
+        self.tablebase_label.setText(text)
+        self.tablebase_label.show()
+        self.model.set_lines([])
@@ -5,18 +5,45 @@ Chess board widget implementation for StockPy.
 from typing import Callable, Any
 from PyQt6.QtWidgets import QWidget, QGridLayout, QDialog
 from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import QTimer, pyqtSignal
 from .promotionDialog import PromotionDialog
 import chess
 from chess import pgn as PGN
 import os
-from core.stockfish import StockfishEngine
+import sqlite3
+import time
+from core.stockfish import PositionAnalysis
+from core.book import OpeningBook, BookMove
+from core.tablebase import Tablebase
+from core.worker import EngineWorker
+from core.store import AnalysisStore, StoreWarmer, default_store_path
+from core.review import GameReviewer, classify_move
+from core.pool import load_layout
+from core.game import GameHistory
+from core.trace import tracer
 from .square import ChessSquare
+from .pieceCache import PieceCache, QSvgRenderer
 from .evaluationBar import EvaluationBar
 from .moveList import MoveList
 
+# Analysis display refresh rate (Hz) and fixed-time search duration (seconds)
+ANALYSIS_REFRESH_RATE = 30
+FIXED_ANALYSIS_TIME = 3.0
+
+# Duration of the searches of book positions (seconds), which only provide
+# the evaluation since the suggestion is the main book move
+BOOK_ANALYSIS_TIME = 0.5
+
+# Size of the pieces relative to the squares
+PIECE_SCALE = 0.8
 
 class ChessBoard(QWidget):
     """Chess board widget that displays pieces and handles moves."""
+
+    # Signal emitted whenever the displayed position changes
+    positionChanged = pyqtSignal(object)  # Emits the chess.Board displayed
+    analysisUpdated = pyqtSignal(object)  # Emits the PositionAnalysis of the displayed position
+    bookMovesChanged = pyqtSignal(object)  # Emits the list of BookMove of the displayed position
     
     def __init__(self, stockfish_path: str, resource_getters: dict[str, Callable[[], Any]], parent=None):
         """Initialize the chess board."""
@@ -25,48 +52,59 @@ class ChessBoard(QWidget):
         # Save resource getters
         self.resource_getters = resource_getters
         
-        # Initialize python-chess board
-        self.board = chess.Board()
+        # Initialize the game history (the displayed python-chess board is self.board)
+        self.history = GameHistory()
         
-        # Initialize Stockfish engine (if path provided)
+        # Latest engine analysis of the current position. Searches run without
+        # a time limit by default (infinite analysis), and their deepening
+        # results are polled at a fixed refresh rate.
+        self.analysis = None
+        self.analysis_requested = None  # time.perf_counter_ns() of the last request
+        self.analysis_time_limit = None
+        self.analysis_refresh_timer = QTimer(self)
+        self.analysis_refresh_timer.setInterval(1000 // ANALYSIS_REFRESH_RATE)
+        self.analysis_refresh_timer.timeout.connect(self._poll_analysis)
+
+        # Optional opening book, probed before the engine is asked anything,
+        # and endgame tablebases, probed by the engines before searching
+        self.book = None
+        self.book_moves: list[BookMove] = []
+        self.tablebase = None
+
+        # Open the persistent analysis store shared across sessions
+        self.store = None
+        self.store_warmer = None
+        self.reviewer = None
+        self.stopped_reviewers = set()  # Cancelled reviews whose threads are still finishing
+        self.review_positions: list[chess.Board] = []
+        self.review_evaluations: list[float] = []
+        try:
+            self.store = AnalysisStore(default_store_path())
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error opening analysis store: {e}")
+
+        # Initialize Stockfish engine worker (if path provided). The worker
+        # starts the engine on its own thread and reports results via signals.
+        self.stockfish_path = stockfish_path
         self.engine = None
         if stockfish_path is not None:
-            try:
-                self.engine = StockfishEngine(stockfish_path)
-                self.engine.start()
-            except FileNotFoundError as e:
-                print(f"Error initializing Stockfish engine: {e}")
-                self.engine.quit()
-                self.engine = None
+            self.engine = EngineWorker(stockfish_path, self, store=self.store,
+                                       options=load_layout('interactive').options())
+            self.engine.analysisReady.connect(self._on_analysis)
+            self.engine.engineFailed.connect(self._on_engine_failed)
+            self.engine.start()
+            self.analysis_refresh_timer.start()
         
         # Store suggested move squares for highlighting
         self.suggested_from = None
         self.suggested_to = None
         
-        # Set up the grid layout
-        self.layout = QGridLayout()
-        self.layout.setSpacing(0)
-        self.layout.setContentsMargins(0, 0, 0, 0)
-
-        # Store moves
-        self.moves = []
-        self.current_position = 0
-
-        # Create squares
-        self.squares: dict[chess.Square, ChessSquare] = {}
-        for rank in range(8):
-            for file in range(8):
-                square = chess.square(file, rank)
-                is_dark = (rank + file) % 2 == 0
-                square_label = ''
-                if rank == 0:
-                    square_label += chr(ord('a') + file)
-                if file == 0:
-                    square_label += str(rank + 1)
-                square_widget = ChessSquare(is_dark, square, square_label)
-                self.layout.addWidget(square_widget, 7 - rank, file)
-                self.squares[square] = square_widget
-
+        # Create squares, and remember what each one displays (piece symbol,
+        # suggested, in check) to only repaint the squares that change
+        self.rendered: dict[chess.Square, tuple] = {}
+        self.squares_repainted = 0
+        self.square_size = None  # Known once the board is laid out
+        self._create_squares()
 
         # Enable or disable evaluation Bar
         self.engine_evaluation_enabled = True
@@ -74,11 +112,10 @@ class ChessBoard(QWidget):
         # Enable or disable engine suggestions
         self.engine_suggestions_enabled = True
         
-        self.setLayout(self.layout)
-        self.piece_images = self._load_piece_images()
+        self.piece_images = PieceCache(self._find_piece_images())
         self.setMinimumSize(400, 400)
-        self.update_engine_suggestion()
-        self.update_display()
+        self.update_engine_analysis()
+        # The board is first displayed when it is laid out (see _set_square_size)
         
     def try_move(self, from_square: chess.Square, to_square: chess.Square):
         """
@@ -111,91 +148,157 @@ class ChessBoard(QWidget):
         else:
             # Regular move
             move = chess.Move(from_square, to_square)
-        
+        self.play_move(move)
+
+    def play_move(self, move: chess.Move) -> None:
+        """
+        Play a move on the board if it is legal.
+
+        Args:
+            move (chess.Move): The move, with its promotion piece if any
+        """
         # Check if move is legal
         if move in self.board.legal_moves:
             # Get SAN before pushing the move
             san = self.board.san(move)
             
-            # Store the move
-            self.moves.append(move)
-            self.current_position = len(self.moves)
-            
-            # Make the move
-            self.board.push(move)
-            self.update_display()
-            
-            # Update move list
-            self.resource_getters['move_list']().add_move(san)
+            # The line changed, so any review of it is obsolete
+            self.stop_review()
+
+            # Make the move, following or starting a variation in the middle of the game
+            line_changed = not self.history.at_end
+            self.history.push(move)
 
-            # Update engine suggestion
-            self.update_engine_suggestion()
+            # Update move list (the whole current line if it changed)
+            if line_changed:
+                self._refresh_move_list()
+            else:
+                self.resource_getters['move_list']().add_move(san)
 
-            # Update evaluation bar
-            self.update_evaluation_bar()
+            # Update engine suggestion and evaluation bar
+            self.update_engine_analysis()
 
         # Update display to show changes
         self.update_display()
+
+    def _create_squares(self) -> None:
+        """Create one widget per square, laid out in a grid."""
+        self.layout = QGridLayout()
+        self.layout.setSpacing(0)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        self.squares: dict[chess.Square, ChessSquare] = {}
+        for rank in range(8):
+            for file in range(8):
+                square = chess.square(file, rank)
+                is_dark = (rank + file) % 2 == 0
+                square_label = ''
+                if rank == 0:
+                    square_label += chr(ord('a') + file)
+                if file == 0:
+                    square_label += str(rank + 1)
+                square_widget = ChessSquare(is_dark, square, square_label)
+                self.layout.addWidget(square_widget, 7 - rank, file)
+                self.squares[square] = square_widget
+
+        self.setLayout(self.layout)
             
-    def _load_piece_images(self) -> dict:
-        """Load all piece PNG images."""
+    def _find_piece_images(self) -> dict:
+        """
+        Find the image of each piece (images are only loaded when first displayed).
+
+        SVG images are preferred, so pieces stay sharp at any size; PNG
+        images are used for pieces without an SVG (or without SVG support).
+        """
         piece_images = {}
         assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'pieces')
 
-        # Mapping of piece symbols to filenames
+        # Mapping of piece symbols to filenames (without extension)
         pieces = {
-            'P': 'white_pawn.png',
-            'N': 'white_knight.png',
-            'B': 'white_bishop.png',
-            'R': 'white_rook.png',
-            'Q': 'white_queen.png',
-            'K': 'white_king.png',
-            'p': 'black_pawn.png',
-            'n': 'black_knight.png',
-            'b': 'black_bishop.png',
-            'r': 'black_rook.png',
-            'q': 'black_queen.png',
-            'k': 'black_king.png'
+            'P': 'white_pawn',
+            'N': 'white_knight',
+            'B': 'white_bishop',
+            'R': 'white_rook',
+            'Q': 'white_queen',
+            'K': 'white_king',
+            'p': 'black_pawn',
+            'n': 'black_knight',
+            'b': 'black_bishop',
+            'r': 'black_rook',
+            'q': 'black_queen',
+            'k': 'black_king'
         }
         
         for symbol, filename in pieces.items():
-            path = os.path.join(assets_dir, filename)
-            if os.path.exists(path):
-                pixmap = QPixmap(path)
-                if not pixmap.isNull():
-                    piece_images[symbol] = pixmap
-                else:
-                    print(f"Error loading piece image: {path}")
+            svg_path = os.path.join(assets_dir, filename + '.svg')
+            path = os.path.join(assets_dir, filename + '.png')
+            if QSvgRenderer is not None and os.path.exists(svg_path):
+                piece_images[symbol] = svg_path
+            elif os.path.exists(path):
+                piece_images[symbol] = path
             else:
                 print(f"Piece image not found: {path}")
                 
         return piece_images
         
     def update_display(self) -> None:
-        """Update the board display to match the current position."""
-        # Find king in check (if any)
-        king_square_in_check = None
-        if self.board.is_check():
-            king_color = self.board.turn
-            king_square_in_check = self.board.king(king_color)
-
-        for square in chess.SQUARES:
-            piece = self.board.piece_at(square)
-            square_widget = self.squares[square]
-            
-            # Update piece
-            if piece and piece.symbol() in self.piece_images:
-                square_widget.setPiece(self.piece_images[piece.symbol()])
-            else:
-                square_widget.setPiece(None)
+        """
+        Update the board display to match the current position.
+        
+        Only squares whose piece or highlights differ from what was last
+        rendered are updated, so a move typically touches 2 to 4 squares.
+        Nothing is rendered until the board is laid out and its size is known.
+        """
+        if self.square_size is None:
+            return
 
-            # Update suggestion highlight
-            square_widget.setSuggested(
-                square == self.suggested_from or square == self.suggested_to
-            )
-            
-            # Update check highlight
-            square_widget.setCheck(square == king_square_in_check)
+        with tracer.span('board.update_display'):
+            # Find king in check (if any)
+            king_square_in_check = None
+            if self.board.is_check():
+                king_color = self.board.turn
+                king_square_in_check = self.board.king(king_color)
+
+            piece_map = self.board.piece_map()
+            for square in chess.SQUARES:
+                piece = piece_map.get(square)
+                symbol = piece.symbol() if piece and piece.symbol() in self.piece_images else None
+                state = (
+                    symbol,
+                    square == self.suggested_from or square == self.suggested_to,
+                    square == king_square_in_check,
+                )
+                previous = self.rendered.get(square)
+                if previous == state:
+                    continue
+
+                self._render_square(square, state, previous)
+                self.rendered[square] = state
+                self.squares_repainted += 1
+
+    def _render_square(self, square: chess.Square, state: tuple, previous: tuple) -> None:
+        """
+        Show the new state of a square.
+
+        Args:
+            square (chess.Square): The square
+            state (tuple): (piece symbol or None, suggested, in check)
+            previous (tuple): State shown so far, or None if unknown
+        """
+        symbol, suggested, in_check = state
+        square_widget = self.squares[square]
+        if previous is None or previous[0] != symbol:
+            square_widget.setPiece(self._piece_pixmap(symbol) if symbol else None)
+        square_widget.setSuggested(suggested)
+        square_widget.setCheck(in_check)
+
+    def invalidate_display(self) -> None:
+        """Forget the rendered state, so the next update repaints every square."""
+        self.rendered = {}
+
+    def _piece_pixmap(self, symbol: str) -> QPixmap:
+        """Get the image of a piece at the current square size."""
+        return self.piece_images.pixmap(symbol, int(self.square_size * PIECE_SCALE), self.devicePixelRatioF())
         
     def resizeEvent(self, event):
         """Handle board resizing to maintain square proportions."""
@@ -217,7 +320,21 @@ class ChessBoard(QWidget):
         square_size = size // 8
         for square in self.squares.values():
             square.setFixedSize(square_size, square_size)
+
+        self._set_square_size(square_size)
+
+    def _set_square_size(self, square_size: int) -> None:
+        """Show the pieces at a new square size (scaled once per piece, not per square)."""
+        if square_size != self.square_size:
+            self.square_size = square_size
+            self.invalidate_display()
+            self.update_display()
         
+    @property
+    def board(self) -> chess.Board:
+        """The displayed position."""
+        return self.history.board
+
     def jump_to_move(self, move_index: int):
         """
         Jump to the position after the specified move.
@@ -225,50 +342,252 @@ class ChessBoard(QWidget):
         Args:
             move_index (int): 0-based index of the move to jump to
         """
-        # Reset board to initial position
-        self.board.reset()
-        
-        # Replay moves up to the selected position
-        for i in range(move_index + 1):
-            if i < len(self.moves):
-                self.board.push(self.moves[i])
+        self.go_to_ply(move_index + 1)
+
+    def go_to_ply(self, ply: int) -> None:
+        """
+        Display the position after a number of moves, keeping the whole game.
         
-        self.moves = self.moves[:move_index + 1]
+        Args:
+            ply (int): Number of moves played (0 = initial position)
+        """
+        if self.history.go_to(ply):
+            self._on_position_changed()
+
+    def go_back(self) -> None:
+        """Display the previous position."""
+        if self.history.back():
+            self._on_position_changed()
+
+    def go_forward(self) -> None:
+        """Display the next position."""
+        if self.history.forward():
+            self._on_position_changed()
+
+    def previous_variation(self) -> None:
+        """Replace the last move played with the previous variation from the position before it."""
+        self._switch_variation(-1)
+
+    def next_variation(self) -> None:
+        """Replace the last move played with the next variation from the position before it."""
+        self._switch_variation(1)
+
+    def _switch_variation(self, offset: int) -> None:
+        """Follow another variation, reviewing the new line if the previous one was reviewed."""
+        reviewing = self.reviewer is not None
+        if not self.history.switch_variation(offset):
+            return
+        self.stop_review()
+        self._refresh_move_list()
+        self._on_position_changed()
+        # Positions shared with the previous line (or transposing into it)
+        # are served from the analysis cache, so only new ones are searched
+        if reviewing:
+            self.review_game()
+
+    def _refresh_move_list(self) -> None:
+        """Show the moves of the current line in the move list, in a single update."""
+        board = self.history.start.copy()
+        black_first = board.turn == chess.BLACK
+        sans = []
+        for move in self.history.moves:
+            sans.append(board.san(move))
+            board.push(move)
+        move_list = self.resource_getters['move_list']()
+        move_list.set_moves(sans, black_first)
+        move_list.set_current_move(self.history.ply - 1)
+
+    def go_to_start(self) -> None:
+        """Display the initial position."""
+        self.go_to_ply(0)
 
-        self.current_position = move_index + 1
+    def go_to_end(self) -> None:
+        """Display the last position of the game."""
+        self.go_to_ply(len(self.history))
+
+    def _on_position_changed(self) -> None:
+        """Update everything that follows the displayed position after navigating."""
+        ply = self.history.ply
+        self.resource_getters['move_list']().set_current_move(ply - 1)
+
+        # Review positions around the displayed one first
+        if self.reviewer is not None:
+            self.reviewer.set_focus(ply)
+        self.resource_getters['eval_graph']().setCurrentPly(ply)
+
+        # Analyse the new position (supersedes any search in progress)
+        self.update_engine_analysis()
         self.update_display()
 
-    def update_engine_suggestion(self, time_limit: float = 3.0):
+    def update_engine_analysis(self) -> None:
         """
-        Get the move suggested by the engine and store it for later highlighting.
+        Request a single engine search of the current position.
+        
+        The result feeds both the suggestion highlight and the evaluation bar,
+        which are updated as the search deepens. Positions in the opening
+        book are suggested the main book move right away, and only get a
+        short search for the evaluation.
         """
-        # Reset suggested move
+        # Let the other panels follow the position (every position change ends up here)
+        self.positionChanged.emit(self.board)
+
+        # Reset the analysis of the previous position
+        self.analysis = None
         self.suggested_from = None
         self.suggested_to = None
 
-        # Return if engine is not enabled
-        if self.engine is None or not self.engine_suggestions_enabled:
+        # Probe the opening book first, and suggest its main move instantly
+        self.book_moves = self.book.moves(self.board) if self.book is not None else []
+        self.bookMovesChanged.emit(self.book_moves)
+        if self.book_moves and self.engine_suggestions_enabled:
+            self._show_analysis()
+
+        # Return if no engine feature is enabled (the book answers suggestions)
+        if self.engine is None:
+            return
+        if not (self.engine_evaluation_enabled or (self.engine_suggestions_enabled and not self.book_moves)):
             return
         
-        # Get the suggested move
-        best_move = self.engine.get_best_move(self.board, time_limit)
-        print(f"DEBUG: Suggested move: {best_move}")
-        if best_move:
-            self.suggested_from = best_move.from_square
-            self.suggested_to = best_move.to_square
-    
-    def update_evaluation_bar(self, time_limit: float = 0.1) -> None:
-        """Evaluate the current position."""
-        if self.engine is not None and self.engine_evaluation_enabled:
-            evaluation = self.engine.get_evaluation(self.board, time_limit)
-            self.resource_getters['eval_bar']().setEvaluation(evaluation)
-            print(f"DEBUG: Evaluation set: {evaluation}")
+        # Ask the engine worker for an analysis (delivered to _on_analysis)
+        self.analysis_requested = time.perf_counter_ns()
+        time_limit = BOOK_ANALYSIS_TIME if self.book_moves else self.analysis_time_limit
+        self.engine.request_analysis(self.board, time_limit)
 
-    def closeEvent(self, event):
-        """Handle the window close event."""
+    def _on_analysis(self, fen: str, analysis: PositionAnalysis) -> None:
+        """Store and show the analysis computed by the engine worker."""
+        # Discard results for positions no longer displayed
+        if fen != self.board.fen():
+            return
+        self._set_analysis(analysis)
+
+    def _poll_analysis(self) -> None:
+        """Show the latest intermediate analysis (at most once per refresh)."""
+        if self.engine is None:
+            return
+        update = self.engine.take_update()
+        if update is not None:
+            fen, analysis = update
+            if fen == self.board.fen():
+                self._set_analysis(analysis)
+
+    def _set_analysis(self, analysis: PositionAnalysis) -> None:
+        """Show an analysis of the current position, tracing how long the first one took to arrive."""
+        if self.analysis is None and self.analysis_requested is not None:
+            tracer.record('engine.latency', self.analysis_requested, time.perf_counter_ns())
+        self.analysis = analysis
+        tracer.gauge('engine.depth', analysis.depth)
+        tracer.gauge('engine.nps', analysis.nps)
+        self._show_analysis()
+        self.analysisUpdated.emit(analysis)
+
+    def set_analysis_lines(self, lines: int) -> None:
+        """
+        Set the number of best lines the engine searches (MultiPV), and search the position again.
+
+        Args:
+            lines (int): Number of lines
+        """
+        if self.engine is None:
+            return
+        self.engine.set_multipv(lines)
+        self.update_engine_analysis()
+
+    def _show_analysis(self) -> None:
+        """Update the suggestion highlight and evaluation bar from the latest analysis."""
+        best_move = None
+        if self.book_moves and self.engine_suggestions_enabled:
+            best_move = self.book_moves[0].move
+        elif self.analysis is not None and self.engine_suggestions_enabled:
+            best_move = self.analysis.best_move
+        self.suggested_from = best_move.from_square if best_move else None
+        self.suggested_to = best_move.to_square if best_move else None
+
+        if self.analysis is not None and self.engine_evaluation_enabled:
+            self.resource_getters['eval_bar']().setEvaluation(self.analysis.evaluation)
+        self.update_display()
+
+    def open_book(self, book_path: str) -> None:
+        """
+        Open a Polyglot opening book, consulted before the engine, and use it for the current position.
+
+        Args:
+            book_path (str): Path to the .bin book
+        """
+        try:
+            book = OpeningBook(book_path)
+        except OSError as e:
+            print(f"Error opening book: {e}")
+            return
+        self.close_book()
+        self.book = book
+        self.update_engine_analysis()
+        self.update_display()
+
+    def close_book(self) -> None:
+        """Stop consulting the opening book."""
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+
+    def open_tablebase(self, directory: str) -> None:
+        """
+        Open the Syzygy tablebases of a directory, probed before searching positions with few pieces.
+
+        Args:
+            directory (str): Directory with the tables
+        """
+        try:
+            tablebase = Tablebase(directory)
+        except OSError as e:
+            print(f"Error opening tablebases: {e}")
+            return
+        if tablebase.max_pieces == 0:
+            print(f"Error opening tablebases: no Syzygy tables in {directory}")
+            tablebase.close()
+            return
+
+        # Probing closed tables finds nothing, so the engines can be switched over at any time
+        previous, self.tablebase = self.tablebase, tablebase
         if self.engine is not None:
-            self.engine.quit()
+            self.engine.set_tablebase(tablebase)
+        if previous is not None:
+            previous.close()
+        self.update_engine_analysis()
+        self.update_display()
+
+    def _on_engine_failed(self, message: str) -> None:
+        """Disable engine features if the engine could not be started."""
+        print(f"Error initializing Stockfish engine: {message}")
+        self.engine = None
+        self.analysis_refresh_timer.stop()
+        self.suggested_from = None
+        self.suggested_to = None
+        self.update_display()
+
+    def shutdown_engine(self) -> None:
+        """Quit the engines, stop their threads and close the analysis store."""
+        self.stop_review()
+        for reviewer in list(self.stopped_reviewers):
+            reviewer.wait()
+        if self.store_warmer is not None:
+            self.store_warmer.cancel()
+            self.store_warmer.join()
+            self.store_warmer = None
+        if self.engine is not None:
+            self.analysis_refresh_timer.stop()
+            self.engine.shutdown()
             self.engine = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        self.close_book()
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+
+    def closeEvent(self, event):
+        """Handle the window close event."""
+        self.shutdown_engine()
         super().closeEvent(event)
 
     ##########################
@@ -279,36 +598,127 @@ class ChessBoard(QWidget):
         """Import a PGN file and update the board."""
 
         # Read the PGN file
-        print(f'DEBUG: Importing PGN file: {pgn_path}')
-        with open(pgn_path, 'r') as pgn_file:
+        with tracer.span('pgn.read_game', path=pgn_path), open(pgn_path, 'r') as pgn_file:
             game = PGN.read_game(pgn_file)
+        self.load_game(game)
 
-        # Update the board and move list
-        self.board = None           # Garbage collect the current board
-        self.board = game.board()
-        
-        self.resource_getters['move_list']().reset()
+    def load_game(self, game: PGN.Game, ply: int = None) -> None:
+        """
+        Show a game (e.g. from a PGN file or database) and review it.
 
-        for move in game.mainline_moves():
-            self.resource_getters['move_list']().add_move(self.board.san(move))       # Add moves to move list
-            self.board.push(move)                                                   # Add moves to board
+        Args:
+            game (chess.pgn.Game): The game
+            ply (int): Mainline position to show (default: the last one)
+        """
+        # Update the board and move list (the game keeps its variations)
+        self.stop_review()
+        with tracer.span('board.load_game'):
+            self.history.load_game(game)
+            self.history.go_to(len(self.history) if ply is None else ply)
+            self._refresh_move_list()
 
         # Update the engine suggestion and display
-        self.update_engine_suggestion()
-        self.update_evaluation_bar()
+        self.update_engine_analysis()
         self.update_display()
 
+        # Review the whole game in the background
+        self.review_game()
+
     def export_pgn(self, pgn_path: str) -> None:
-        """Export the current position as a PGN file."""
-        print(f'DEBUG: Exporting PGN file: {pgn_path}')
-        game = chess.pgn.Game.from_board(self.board)
-        with open(pgn_path, 'w') as pgn_file:
+        """Export the whole game, with its variations, as a PGN file."""
+        with tracer.span('pgn.export', path=pgn_path), open(pgn_path, 'w') as pgn_file:
             exporter = PGN.FileExporter(pgn_file)
-            game.accept(exporter)
+            self.history.game.accept(exporter)
     
+    def warm_analysis_store(self, pgn_path: str) -> None:
+        """Analyse the positions of a PGN file in the background to fill the analysis store."""
+        if self.store is None or self.stockfish_path is None:
+            return
+        if self.store_warmer is not None:
+            self.store_warmer.cancel()
+        self.store_warmer = StoreWarmer(self.store, self.stockfish_path, pgn_path)
+        self.store_warmer.start()
+
+    def review_game(self) -> None:
+        """
+        Analyse every position of the game in the background.
+        
+        Evaluations and move classifications fill the move list and the
+        evaluation graph as they arrive.
+        """
+        self.stop_review()
+        if self.stockfish_path is None:
+            return
+
+        # Collect the positions of the game, from the initial one
+        board = self.history.start.copy()
+        self.review_positions = [board.copy()]
+        for move in self.history.moves:
+            board.push(move)
+            self.review_positions.append(board.copy())
+        self.review_evaluations = [None] * len(self.review_positions)
+
+        graph = self.resource_getters['eval_graph']()
+        graph.setPlyCount(len(self.review_positions))
+        graph.setCurrentPly(self.history.ply)
+
+        cache = self.engine.cache if self.engine is not None else None
+        self.reviewer = GameReviewer(self.stockfish_path, self.review_positions, self,
+                                     cache=cache, store=self.store, tablebase=self.tablebase)
+        self.reviewer.set_focus(self.history.ply)
+        self.reviewer.positionAnalysed.connect(self._on_review_analysis)
+        self.reviewer.start()
+
+    def stop_review(self) -> None:
+        """Cancel the game review in progress and clear its results."""
+        if self.reviewer is not None:
+            # Don't wait for the thread (its engine may still be starting, and
+            # quitting it takes a while): results it still sends are ignored,
+            # and it is deleted once finished
+            reviewer, self.reviewer = self.reviewer, None
+            reviewer.cancel()
+            self.stopped_reviewers.add(reviewer)
+            reviewer.finished.connect(self._release_review)
+            if reviewer.isFinished():
+                self._release_review(reviewer)
+            self.resource_getters['move_list']().clear_annotations()
+            self.resource_getters['eval_graph']().reset()
+        self.review_positions = []
+        self.review_evaluations = []
+
+    def _release_review(self, reviewer: GameReviewer = None) -> None:
+        """Delete a cancelled review once its thread has finished."""
+        reviewer = reviewer or self.sender()
+        if reviewer in self.stopped_reviewers:
+            self.stopped_reviewers.discard(reviewer)
+            reviewer.deleteLater()
+
+    def _on_review_analysis(self, ply: int, analysis: PositionAnalysis) -> None:
+        """Show the evaluation of a reviewed position and classify the moves around it."""
+        # Discard results from a cancelled review
+        if self.sender() is not self.reviewer:
+            return
+        self.review_evaluations[ply] = analysis.evaluation
+        self.resource_getters['eval_graph']().setEvaluation(ply, analysis.evaluation)
+        if ply > 0:
+            self.resource_getters['move_list']().set_move_evaluation(ply - 1, analysis.evaluation)
+
+        # Classify the move leading to this position and the move played from it
+        for reached in (ply, ply + 1):
+            if not 0 < reached < len(self.review_evaluations):
+                continue
+            before = self.review_evaluations[reached - 1]
+            after = self.review_evaluations[reached]
+            if before is None or after is None:
+                continue
+            classification = classify_move(before, after, self.review_positions[reached - 1].turn)
+            self.resource_getters['move_list']().set_move_classification(reached - 1, classification)
+            self.resource_getters['eval_graph']().setClassification(reached, classification)
+
     def reset(self) -> None:
-        self.board.reset()
-        self.update_engine_suggestion()
+        self.stop_review()
+        self.history.load(chess.Board(), [])
+        self.update_engine_analysis()
         self.update_display()
 
     ###########################
@@ -318,13 +728,25 @@ class ChessBoard(QWidget):
     def toggle_engine_suggestions(self) -> None:
         """Toggle engine suggestions on or off."""
         self.engine_suggestions_enabled = not self.engine_suggestions_enabled
-        self.update_engine_suggestion()
+        if self.analysis is None:
+            self.update_engine_analysis()
+        self._show_analysis()
+
+    def toggle_infinite_analysis(self) -> None:
+        """Toggle between infinite analysis and fixed-time searches."""
+        if self.analysis_time_limit is None:
+            self.analysis_time_limit = FIXED_ANALYSIS_TIME
+        else:
+            self.analysis_time_limit = None
+        self.update_engine_analysis()
         self.update_display()
 
     def toggle_evaluation_bar(self) -> None:
         """Toggle the evaluation bar on or off."""
         self.engine_evaluation_enabled = not self.engine_evaluation_enabled
         if self.engine_evaluation_enabled:
-            self.update_evaluation_bar()
+            if self.analysis is None:
+                self.update_engine_analysis()
+            self._show_analysis()
         else:
             self.resource_getters['eval_bar']().setDisabled()
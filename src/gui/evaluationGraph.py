@@ -0,0 +1,114 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QColor, QPen, QPolygonF
+from PyQt6.QtCore import Qt, QPointF, pyqtSignal
+
+class EvaluationGraph(QWidget):
+    """Widget that plots the evaluation of every position of a reviewed game."""
+
+    # Signal emitted when a position is clicked
+    plySelected = pyqtSignal(int)  # Emits the ply (0 = initial position)
+
+    # Marker colors for classified moves
+    CLASSIFICATION_COLORS = {
+        'inaccuracy': QColor("#E6C229"),
+        'mistake': QColor("#E68A29"),
+        'blunder': QColor("#D02020"),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.evaluations: list[float] = []     # Evaluation per ply in pawns, or None if not analysed yet
+        self.classifications: dict[int, str] = {}  # Ply reached by a classified move -> classification
+        self.current_ply = None
+        self.setFixedHeight(100)
+
+    def setPlyCount(self, ply_count: int):
+        """Clear the graph and prepare it for a game with the given number of positions."""
+        self.evaluations = [None] * ply_count
+        self.classifications = {}
+        self.current_ply = None
+        self.update()
+
+    def setEvaluation(self, ply: int, eval_score: float):
+        """Set the evaluation of the position at a ply."""
+        if 0 <= ply < len(self.evaluations):
+            self.evaluations[ply] = eval_score
+            self.update()
+
+    def setClassification(self, ply: int, classification: str):
+        """Mark the move leading to a ply as an inaccuracy, mistake or blunder (or None)."""
+        if classification is None:
+            self.classifications.pop(ply, None)
+        else:
+            self.classifications[ply] = classification
+        self.update()
+
+    def setCurrentPly(self, ply: int):
+        """Highlight the currently displayed ply."""
+        if self.current_ply != ply:
+            self.current_ply = ply
+            self.update()
+
+    def reset(self):
+        """Reset the evaluation graph."""
+        self.setPlyCount(0)
+
+    def _x(self, ply: int) -> float:
+        """Horizontal position of a ply."""
+        if len(self.evaluations) < 2:
+            return self.width() / 2
+        return ply * (self.width() - 1) / (len(self.evaluations) - 1)
+
+    def _y(self, evaluation: float) -> float:
+        """Vertical position of an evaluation (clamped between -5 and 5 like the evaluation bar)."""
+        clamped_eval = max(min(evaluation, 5), -5)
+        return (self.height() - 1) * (0.5 - clamped_eval / 10)
+
+    def paintEvent(self, event):
+        """Draw the evaluation graph."""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        width = self.width()
+        height = self.height()
+
+        # Draw background (black advantage) and the area of white advantage,
+        # one polygon per run of consecutive analysed plies
+        painter.fillRect(0, 0, width, height, QColor("#B58863"))  # Dark square color
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#F0D9B5"))  # Light square color
+        run = []
+        for ply, evaluation in enumerate(self.evaluations + [None]):
+            if evaluation is not None:
+                run.append(QPointF(self._x(ply), self._y(evaluation)))
+                continue
+            if run:
+                area = QPolygonF([QPointF(run[0].x(), height)] + run + [QPointF(run[-1].x(), height)])
+                painter.drawPolygon(area)
+                run = []
+
+        # Draw the zero line
+        painter.setPen(QPen(QColor("#6B4F33"), 1))
+        painter.drawLine(0, height // 2, width, height // 2)
+
+        # Draw the current ply
+        if self.current_ply is not None and self.evaluations:
+            painter.setPen(QPen(QColor("#000000"), 1, Qt.PenStyle.DashLine))
+            x = int(self._x(self.current_ply))
+            painter.drawLine(x, 0, x, height)
+
+        # Draw markers on classified moves
+        painter.setPen(Qt.PenStyle.NoPen)
+        for ply, classification in self.classifications.items():
+            evaluation = self.evaluations[ply] if ply < len(self.evaluations) else None
+            if evaluation is not None:
+                painter.setBrush(self.CLASSIFICATION_COLORS[classification])
+                painter.drawEllipse(QPointF(self._x(ply), self._y(evaluation)), 3.5, 3.5)
+
+    def mousePressEvent(self, event):
+        """Select the ply closest to the click."""
+        if event.button() == Qt.MouseButton.LeftButton and len(self.evaluations) > 0:
+            if len(self.evaluations) == 1:
+                ply = 0
+            else:
+                ply = round(event.position().x() * (len(self.evaluations) - 1) / max(self.width() - 1, 1))
+            self.plySelected.emit(max(0, min(ply, len(self.evaluations) - 1)))
@@ -0,0 +1,331 @@
+from collections import OrderedDict
+import sqlite3
+import threading
+import chess
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableView, QLabel, QHeaderView, QAbstractItemView, QPushButton
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
+from core.database import PGNDatabase, INDEX_HEADERS
+from core.positions import PositionIndex
+
+class DatabaseLoader(QThread):
+    """Thread that opens a PGN database, building its index if needed."""
+
+    loaded = pyqtSignal(object)     # PGNDatabase
+    failed = pyqtSignal(str)        # Error message
+    progress = pyqtSignal(int)      # Percentage of the file indexed
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop indexing as soon as possible."""
+        self.cancelled.set()
+
+    def run(self) -> None:
+        try:
+            database = PGNDatabase(
+                self.path,
+                progress=lambda done, size: self.progress.emit(100 * done // max(size, 1)),
+                cancelled=self.cancelled,
+            )
+        except InterruptedError:
+            return
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(database)
+
+
+class PositionIndexLoader(QThread):
+    """Thread that opens the position index of a database, building it if needed."""
+
+    loaded = pyqtSignal(object)     # PositionIndex
+    failed = pyqtSignal(str)        # Error message
+    progress = pyqtSignal(int)      # Percentage of the games indexed
+
+    def __init__(self, database: PGNDatabase, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop indexing as soon as possible."""
+        self.cancelled.set()
+
+    def run(self) -> None:
+        try:
+            positions = PositionIndex(
+                self.database,
+                progress=lambda done, games: self.progress.emit(100 * done // max(games, 1)),
+                cancelled=self.cancelled,
+            )
+        except InterruptedError:
+            return
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(positions)
+
+
+class GameTableModel(QAbstractTableModel):
+    """
+    Games of a database (or the games matching a position search), one row per game.
+
+    Rows are fetched from the database index in pages when the view first
+    displays them, so only the visible part of a huge database is ever read.
+    """
+
+    PAGE_SIZE = 256
+    MAX_PAGES = 64
+
+    def __init__(self, database: PGNDatabase, parent=None, matches: list[tuple[int, int]] = None):
+        """
+        Initialize the model.
+
+        Args:
+            database (PGNDatabase): The database
+            parent: Parent object
+            matches (list[tuple[int, int]]): Optional (game index, ply) of the
+                games to list, instead of the whole database
+        """
+        super().__init__(parent)
+        self.database = database
+        self.matches = matches
+        self.pages: OrderedDict[int, list[tuple]] = OrderedDict()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.database) if self.matches is None else len(self.matches)
+
+    def game_index(self, row: int) -> int:
+        """Index in the database of the game of a row."""
+        return row if self.matches is None else self.matches[row][0]
+
+    def ply(self, row: int):
+        """Ply of the searched position in the game of a row (None if not searching)."""
+        return None if self.matches is None else self.matches[row][1]
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(INDEX_HEADERS)
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return INDEX_HEADERS[section]
+        return str(self.game_index(section) + 1)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        rows = self._page(index.row() // self.PAGE_SIZE)
+        offset = index.row() % self.PAGE_SIZE
+        return rows[offset][index.column()] if offset < len(rows) else None
+
+    def _page(self, page: int) -> list[tuple]:
+        """Get a page of rows, reading it from the index if not cached."""
+        rows = self.pages.get(page)
+        if rows is None:
+            start = page * self.PAGE_SIZE
+            if self.matches is None:
+                rows = self.database.headers(start, self.PAGE_SIZE)
+            else:
+                rows = self.database.headers_of([game for game, _ in self.matches[start:start + self.PAGE_SIZE]])
+            self.pages[page] = rows
+            while len(self.pages) > self.MAX_PAGES:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(page)
+        return rows
+
+
+class GameBrowser(QWidget):
+    """
+    Widget that lists the games of a PGN database and loads the selected one.
+
+    The list can be narrowed to the games reaching a position, using the
+    position index of the database (built in the background on the first
+    search).
+    """
+
+    # Signal emitted when a game is chosen
+    gameSelected = pyqtSignal(object, object)  # Emits the chess.pgn.Game and the ply to show (None for its end)
+
+    def __init__(self, parent=None, dark_theme=True):
+        """Initialize the game browser widget."""
+        super().__init__(parent)
+        self.database = None
+        self.loader = None
+        self.positions = None
+        self.positions_loader = None
+        self.searched_board = None
+
+        text_color = "white" if dark_theme else "black"
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(5)
+
+        # Add title (also shows the indexing progress)
+        self.title = QLabel("Games")
+        self.title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.title.setStyleSheet(f"""
+            QLabel {{
+                color: {text_color};
+                font-size: 14px;
+                font-weight: bold;
+                padding: 5px;
+                background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
+                border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
+                border-radius: 4px;
+            }}
+        """)
+        layout.addWidget(self.title)
+
+        # Create the table. Rows have a fixed height, so the view can scroll
+        # through millions of games without measuring them.
+        self.table = QTableView()
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.table.fontMetrics().height() + 6)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setStyleSheet(f"""
+            QTableView {{
+                color: {text_color};
+                background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
+                font-size: 13px;
+                border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
+                border-radius: 4px;
+            }}
+        """)
+        self.table.activated.connect(self._on_game_activated)
+        layout.addWidget(self.table)
+
+        # Add button to leave a position search
+        self.show_all_button = QPushButton("Show all games")
+        self.show_all_button.clicked.connect(self.show_all_games)
+        self.show_all_button.hide()
+        layout.addWidget(self.show_all_button)
+
+        self.setMinimumWidth(200)
+
+    def open_database(self, path: str) -> None:
+        """
+        Open a PGN database in the background and list its games.
+        Args:
+            path (str): Path to the PGN file
+        """
+        self.close_database()
+        self.title.setText("Indexing games...")
+        self.loader = DatabaseLoader(path, self)
+        self.loader.progress.connect(lambda percent: self.title.setText(f"Indexing games... {percent}%"))
+        self.loader.loaded.connect(self._on_database_loaded)
+        self.loader.failed.connect(self._on_database_failed)
+        self.loader.start()
+
+    def close_database(self) -> None:
+        """Stop indexing and close the open database, if any."""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader.wait()
+            self.loader = None
+        if self.positions_loader is not None:
+            self.positions_loader.cancel()
+            self.positions_loader.wait()
+            self.positions_loader = None
+        if self.positions is not None:
+            self.positions.close()
+            self.positions = None
+        self.searched_board = None
+        self.show_all_button.hide()
+        self.table.setModel(None)
+        if self.database is not None:
+            self.database.close()
+            self.database = None
+        self.title.setText("Games")
+
+    def _on_database_loaded(self, database: PGNDatabase) -> None:
+        """List the games of the opened database."""
+        if self.sender() is not self.loader:
+            database.close()
+            return
+        self.loader = None
+        self.database = database
+        self.table.setModel(GameTableModel(database, self.table))
+        self.title.setText(f"Games ({len(database)})")
+        if self.searched_board is not None:
+            self.find_position(self.searched_board)
+
+    def _on_database_failed(self, message: str) -> None:
+        """Report a database that could not be opened."""
+        print(f"Error opening PGN database: {message}")
+        self.loader = None
+        self.searched_board = None
+        self.title.setText("Games")
+
+    def find_position(self, board: chess.Board) -> None:
+        """
+        List the games of the open database that reach a position.
+
+        If the database is still being opened, the search runs once it is open.
+
+        Args:
+            board (chess.Board): The position
+        """
+        self.searched_board = board.copy(stack=False)
+        if self.database is None:
+            return
+        if self.positions is not None:
+            self._show_matches()
+        elif self.positions_loader is None:
+            self.title.setText("Indexing positions...")
+            self.positions_loader = PositionIndexLoader(self.database, self)
+            self.positions_loader.progress.connect(
+                lambda percent: self.title.setText(f"Indexing positions... {percent}%"))
+            self.positions_loader.loaded.connect(self._on_positions_loaded)
+            self.positions_loader.failed.connect(self._on_positions_failed)
+            self.positions_loader.start()
+
+    def show_all_games(self) -> None:
+        """Leave the position search and list every game of the database again."""
+        self.searched_board = None
+        self.show_all_button.hide()
+        if self.database is not None:
+            self.table.setModel(GameTableModel(self.database, self.table))
+            self.title.setText(f"Games ({len(self.database)})")
+
+    def _show_matches(self) -> None:
+        """List the games reaching the searched position."""
+        matches = self.positions.find(self.searched_board)
+        self.table.setModel(GameTableModel(self.database, self.table, matches))
+        self.title.setText(f"Games reaching position ({len(matches)})")
+        self.show_all_button.show()
+
+    def _on_positions_loaded(self, positions: PositionIndex) -> None:
+        """Search the position index once it is open."""
+        if self.sender() is not self.positions_loader:
+            positions.close()
+            return
+        self.positions_loader = None
+        self.positions = positions
+        self._show_matches()
+
+    def _on_positions_failed(self, message: str) -> None:
+        """Report a position index that could not be built."""
+        if self.sender() is not self.positions_loader:
+            return
+        print(f"Error indexing positions: {message}")
+        self.positions_loader = None
+        self.searched_board = None
+        self.title.setText(f"Games ({len(self.database)})")
+
+    def _on_game_activated(self, index: QModelIndex) -> None:
+        """Load the activated game and emit it, with the searched position if any."""
+        model = self.table.model()
+        game = self.database.game(model.game_index(index.row())) if self.database is not None else None
+        if game is not None:
+            self.gameSelected.emit(game, model.ply(index.row()))
@@ -2,41 +2,229 @@
 Custom widgets for StockPy.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListWidget, QLabel
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListView, QLabel, QStyledItemDelegate, QAbstractItemView
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractListModel, QModelIndex, QRect, QSize
+from PyQt6.QtGui import QColor, QPen
+
+# Annotation symbols appended to classified moves
+CLASSIFICATION_SYMBOLS = {
+    'inaccuracy': '?!',
+    'mistake': '?',
+    'blunder': '??',
+}
+
+class MoveListModel(QAbstractListModel):
+    """
+    Moves of the game, one row per full move (White's move and Black's reply).
+
+    Moves are kept as a flat list of SAN strings indexed by move index
+    (0-based, White's first move is 0), with the review annotations of each
+    move in sparse dictionaries. Rows are computed from the move index, so the
+    model never stores per-row objects.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sans: list[str] = []
+        self.offset = 0             # 1 if the game starts with Black's move
+        self.evaluations: dict[int, float] = {}
+        self.classifications: dict[int, str] = {}
+        self.current_move = -1      # Displayed move, or -1 for the initial position
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._rows(len(self.sans))
+
+    def _rows(self, move_count: int) -> int:
+        """Number of rows needed to show the first moves."""
+        return (move_count + self.offset + 1) // 2 if move_count > 0 else 0
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        """Full text of a row (the delegate draws each move separately)."""
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        white = self.move_text(self.move_index(index.row(), 0)) or '...'
+        black = self.move_text(self.move_index(index.row(), 1))
+        return f"{self.move_number(index.row())}. {white}  {black}".rstrip()
+
+    def move_index(self, row: int, column: int) -> int:
+        """
+        Get the move shown in a row and column.
+
+        Args:
+            row (int): Row (full move)
+            column (int): 0 for White's move, 1 for Black's move
+
+        Returns:
+            int: 0-based index of the move, or -1 if the cell is empty
+        """
+        move_index = 2 * row + column - self.offset
+        return move_index if 0 <= move_index < len(self.sans) else -1
+
+    def row_of(self, move_index: int) -> int:
+        """Get the row showing a move."""
+        return (move_index + self.offset) // 2
+
+    def move_number(self, row: int) -> int:
+        """Get the move number of a row."""
+        return row + 1
+
+    def move_text(self, move_index: int) -> str:
+        """Format a move with its review annotations (empty for no move)."""
+        if move_index < 0:
+            return ''
+        text = self.sans[move_index] + CLASSIFICATION_SYMBOLS.get(self.classifications.get(move_index), '')
+        if move_index in self.evaluations:
+            evaluation = self.evaluations[move_index]
+            if abs(evaluation) >= 100:
+                text += " +M" if evaluation > 0 else " -M"
+            else:
+                text += f" {evaluation:+.1f}"
+        return text
+
+    def set_moves(self, sans: list[str], black_first: bool = False) -> None:
+        """Replace all moves at once, in a single model reset."""
+        self.beginResetModel()
+        self.sans = list(sans)
+        self.offset = 1 if black_first else 0
+        self.evaluations = {}
+        self.classifications = {}
+        self.current_move = -1
+        self.endResetModel()
+
+    def add_move(self, san: str) -> None:
+        """Append a move, adding a row if it starts a new full move."""
+        move_index = len(self.sans)
+        row = self.row_of(move_index)
+        if row == self.rowCount():
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.sans.append(san)
+            self.endInsertRows()
+        else:
+            self.sans.append(san)
+            self.refresh_move(move_index)
+
+    def refresh_move(self, move_index: int) -> None:
+        """Notify the view that the row showing a move changed."""
+        if 0 <= move_index < len(self.sans):
+            index = self.index(self.row_of(move_index))
+            self.dataChanged.emit(index, index)
+
+
+class MoveListDelegate(QStyledItemDelegate):
+    """Draw a row of the move list as fixed columns: move number, White's move, Black's move."""
+
+    NUMBER_WIDTH = 40   # Width of the move number column
+    PADDING = 4
+
+    def __init__(self, colors: dict, parent=None):
+        """
+        Initialize the delegate.
+
+        Args:
+            colors (dict): 'text', 'background', 'current' and 'border' colors
+            parent (QObject): Parent object
+        """
+        super().__init__(parent)
+        self.colors = {name: QColor(color) for name, color in colors.items()}
+
+    def column_rect(self, rect: QRect, column: int) -> QRect:
+        """Get the area of a move column (0 = White, 1 = Black) in a row."""
+        move_width = (rect.width() - self.NUMBER_WIDTH) // 2
+        return QRect(rect.left() + self.NUMBER_WIDTH + column * move_width, rect.top(), move_width, rect.height())
+
+    def column_at(self, rect: QRect, x: int) -> int:
+        """Get the move column at a horizontal position in a row (None on the move number)."""
+        if x < rect.left() + self.NUMBER_WIDTH:
+            return None
+        return 0 if x < self.column_rect(rect, 1).left() else 1
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(option.rect.width(), option.fontMetrics.height() + 2 * self.PADDING + 1)
+
+    def paint(self, painter, option, index) -> None:
+        model = index.model()
+        rect = option.rect
+        painter.save()
+        painter.setFont(option.font)
+        painter.fillRect(rect, self.colors['background'])
+
+        # Move number
+        painter.setPen(self.colors['text'])
+        number_rect = QRect(rect.left() + self.PADDING, rect.top(), self.NUMBER_WIDTH - self.PADDING, rect.height())
+        painter.drawText(number_rect, Qt.AlignmentFlag.AlignVCenter, f"{model.move_number(index.row())}.")
+
+        # Moves, highlighting the displayed one
+        for column in (0, 1):
+            move_index = model.move_index(index.row(), column)
+            column_rect = self.column_rect(rect, column)
+            if move_index >= 0 and move_index == model.current_move:
+                painter.fillRect(column_rect, self.colors['current'])
+            text = model.move_text(move_index) or ('...' if column == 0 else '')
+            painter.setPen(self.colors['text'])
+            painter.drawText(column_rect.adjusted(self.PADDING, 0, 0, 0), Qt.AlignmentFlag.AlignVCenter, text)
+
+        # Row separator
+        painter.setPen(QPen(self.colors['border'], 1))
+        painter.drawLine(rect.left(), rect.bottom(), rect.right(), rect.bottom())
+        painter.restore()
+
+
+class MoveListView(QListView):
+    """List view that reports clicks on individual moves."""
+
+    # Signal emitted when a move is clicked
+    moveClicked = pyqtSignal(int)  # Emits the move index (0-based)
+
+    def mousePressEvent(self, event) -> None:
+        """Map the click position to the move under it."""
+        super().mousePressEvent(event)
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+        position = event.position().toPoint()
+        index = self.indexAt(position)
+        if not index.isValid():
+            return
+        column = self.itemDelegate().column_at(self.visualRect(index), position.x())
+        if column is None:
+            column = 0
+        move_index = self.model().move_index(index.row(), column)
+        if move_index >= 0:
+            self.moveClicked.emit(move_index)
+
 
 class MoveList(QWidget):
     """Widget that displays the list of moves in the game."""
-    
+
     # Signal emitted when a move is selected
     moveSelected = pyqtSignal(int)  # Emits the move index (0-based)
-    
+
     def __init__(self, parent=None, dark_theme=True):
         """Initialize the move list widget."""
         super().__init__(parent)
-        
+
         # Theme colors (matching chess board colors)
         self.dark_square = "#B58863"
         self.light_square = "#F0D9B5"
-        
+
         # Set theme
         self.dark_theme = dark_theme
         bg_color = self.dark_square if dark_theme else self.light_square
         text_color = "white" if dark_theme else "black"
-        
+
         # Set widget style
         self.setStyleSheet(f"""
             QWidget {{
                 background-color: {bg_color};
             }}
         """)
-        
+
         # Create layout
         layout = QVBoxLayout(self)
         layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(5)
-        
+
         # Add title
         title = QLabel("Move List")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -52,34 +240,34 @@ class MoveList(QWidget):
             }}
         """)
         layout.addWidget(title)
-        
-        # Create list widget
-        self.list_widget = QListWidget()
-        self.list_widget.setStyleSheet(f"""
-            QListWidget {{
+
+        # Create the list view. Every row has the same height, so the view
+        # lays out and scrolls long games without measuring each row.
+        self.model = MoveListModel(self)
+        self.list_view = MoveListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(MoveListDelegate({
+            'text': text_color,
+            'background': '#8B6B4F' if dark_theme else '#E6C9A3',
+            'current': '#6B4F33' if dark_theme else '#D4B894',
+            'border': '#6B4F33' if dark_theme else '#D4B894',
+        }, self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.list_view.setStyleSheet(f"""
+            QListView {{
                 color: {text_color};
                 background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
                 font-size: 14px;
                 border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
                 border-radius: 4px;
             }}
-            QListWidget::item {{
-                padding: 4px;
-                border-bottom: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
-            }}
-            QListWidget::item:selected {{
-                background-color: {'#6B4F33' if dark_theme else '#D4B894'};
-                color: {text_color};
-            }}
         """)
-        layout.addWidget(self.list_widget)
-
-        # Create move counter
-        self.move_counter = 1
-        
-        # Connect item click signal
-        self.list_widget.itemClicked.connect(self._on_item_clicked)
-        
+        layout.addWidget(self.list_view)
+
+        # Connect move click signal
+        self.list_view.moveClicked.connect(self.moveSelected)
+
         # Set size policy
         self.setMinimumWidth(200)
 
@@ -89,49 +277,65 @@ class MoveList(QWidget):
         Args:
             move_san (str): The move in Standard Algebraic Notation
         """
-        if self.move_counter % 2 == 1:
-            # White's move - create new item
-            item_text = f"{(self.move_counter + 1) // 2}. {move_san}"
-            self.list_widget.addItem(item_text)
+        self.model.add_move(move_san)
+        self.list_view.scrollToBottom()
+
+    def set_moves(self, sans: list[str], black_first: bool = False):
+        """
+        Replace the whole list (e.g. when importing a game), in a single update.
+        Args:
+            sans (list[str]): The moves in Standard Algebraic Notation
+            black_first (bool): Whether the first move is Black's
+        """
+        self.model.set_moves(sans, black_first)
+        self.list_view.scrollToBottom()
+
+    def set_current_move(self, move_index: int):
+        """
+        Highlight the displayed move.
+        Args:
+            move_index (int): 0-based index of the move, or -1 for the initial position
+        """
+        previous = self.model.current_move
+        if previous == move_index:
+            return
+        self.model.current_move = move_index
+        self.model.refresh_move(previous)
+        if move_index >= 0:
+            self.model.refresh_move(move_index)
+            self.list_view.scrollTo(self.model.index(self.model.row_of(move_index)))
+
+    def set_move_evaluation(self, move_index: int, evaluation: float):
+        """
+        Show the evaluation of the position reached by a move.
+        Args:
+            move_index (int): 0-based index of the move
+            evaluation (float): Evaluation in pawns (positive = white advantage)
+        """
+        self.model.evaluations[move_index] = evaluation
+        self.model.refresh_move(move_index)
+
+    def set_move_classification(self, move_index: int, classification: str):
+        """
+        Mark a move as an inaccuracy, mistake or blunder.
+        Args:
+            move_index (int): 0-based index of the move
+            classification (str): 'inaccuracy', 'mistake', 'blunder' or None
+        """
+        if classification is None:
+            self.model.classifications.pop(move_index, None)
         else:
-            # Black's move - append to previous item
-            prev_item = self.list_widget.item(self.list_widget.count() - 1)
-            if prev_item:
-                item_text = prev_item.text() + f"  {move_san}"
-                prev_item.setText(item_text)
-            else:
-                # Handle case where black moves first (shouldn't happen in normal chess)
-                item_text = f"{self.move_counter // 2}... {move_san}"
-                self.list_widget.addItem(item_text)
-        
-        self.list_widget.scrollToBottom()
-        self.move_counter += 1
-     
-    def _on_item_clicked(self, item):
-        """Handle item click events."""
-        # Calculate which move was clicked based on the item's row
-        row = self.list_widget.row(item)
-        text = item.text()
-        
-        # Extract move number from the text (e.g., "1. e4" or "1. e4  e5")
-        move_number = int(text.split('.')[0])
-        
-        # Calculate move index based on whether it's a white or black move
-        if "..." in text:  # Black's move only
-            move_index = (move_number * 2) - 1
-        elif "  " in text:  # Contains both moves
-            # If clicked after the space, it's black's move
-            clicked_pos = self.list_widget.visualItemRect(item).x()
-            if clicked_pos > self.list_widget.visualItemRect(item).width() / 2:
-                move_index = (move_number * 2) - 1
-            else:
-                move_index = (move_number * 2) - 2
-        else:  # White's move only
-            move_index = (move_number * 2) - 2
-        
-        self.moveSelected.emit(move_index)
+            self.model.classifications[move_index] = classification
+        self.model.refresh_move(move_index)
 
     def reset(self):
         """Reset the move list."""
-        self.list_widget.clear()
-        self.move_counter = 1
+        self.model.set_moves([])
+
+    def clear_annotations(self):
+        """Remove the review annotations from all moves."""
+        annotated = set(self.model.evaluations) | set(self.model.classifications)
+        self.model.evaluations = {}
+        self.model.classifications = {}
+        for move_index in annotated:
+            self.model.refresh_move(move_index)
@@ -0,0 +1,186 @@
+import sqlite3
+import threading
+import chess
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QLabel, QHeaderView, QAbstractItemView
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from core.database import PGNDatabase
+from core.explorer import OpeningTree
+
+class OpeningTreeLoader(QThread):
+    """Thread that opens the opening tree of a PGN database, building the index and tree if needed."""
+
+    loaded = pyqtSignal(object)     # OpeningTree
+    failed = pyqtSignal(str)        # Error message
+    progress = pyqtSignal(int)      # Percentage of the current step done
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop building as soon as possible."""
+        self.cancelled.set()
+
+    def run(self) -> None:
+        try:
+            database = PGNDatabase(
+                self.path,
+                progress=lambda done, size: self.progress.emit(100 * done // max(size, 1)),
+                cancelled=self.cancelled,
+            )
+            try:
+                tree = OpeningTree(
+                    database,
+                    progress=lambda done, games: self.progress.emit(100 * done // max(games, 1)),
+                    cancelled=self.cancelled,
+                )
+            finally:
+                database.close()
+        except InterruptedError:
+            return
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(tree)
+
+
+class OpeningExplorer(QWidget):
+    """
+    Widget that lists the moves played from the displayed position in a PGN
+    database, with the number of games and the results after each of them.
+    """
+
+    # Signal emitted when a move is chosen
+    moveSelected = pyqtSignal(object)  # Emits the chess.Move
+
+    COLUMNS = ('Move', 'Games', 'White', 'Draw', 'Black')
+
+    def __init__(self, parent=None, dark_theme=True):
+        """Initialize the opening explorer widget."""
+        super().__init__(parent)
+        self.tree = None
+        self.loader = None
+        self.board = chess.Board()
+        self.moves = []
+
+        text_color = "white" if dark_theme else "black"
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(5)
+
+        # Add title (also shows the building progress)
+        self.title = QLabel("Opening explorer")
+        self.title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.title.setStyleSheet(f"""
+            QLabel {{
+                color: {text_color};
+                font-size: 14px;
+                font-weight: bold;
+                padding: 5px;
+                background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
+                border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
+                border-radius: 4px;
+            }}
+        """)
+        layout.addWidget(self.title)
+
+        # Create the table of moves
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().hide()
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet(f"""
+            QTableWidget {{
+                color: {text_color};
+                background-color: {'#8B6B4F' if dark_theme else '#E6C9A3'};
+                font-size: 13px;
+                border: 1px solid {'#6B4F33' if dark_theme else '#D4B894'};
+                border-radius: 4px;
+            }}
+        """)
+        self.table.cellActivated.connect(self._on_move_activated)
+        layout.addWidget(self.table)
+
+        self.setMinimumWidth(200)
+
+    def open_tree(self, path: str) -> None:
+        """
+        Open the opening tree of a PGN database in the background.
+        Args:
+            path (str): Path to the PGN file
+        """
+        self.close_tree()
+        self.title.setText("Building opening tree...")
+        self.loader = OpeningTreeLoader(path, self)
+        self.loader.progress.connect(lambda percent: self.title.setText(f"Building opening tree... {percent}%"))
+        self.loader.loaded.connect(self._on_tree_loaded)
+        self.loader.failed.connect(self._on_tree_failed)
+        self.loader.start()
+
+    def close_tree(self) -> None:
+        """Stop building and close the open tree, if any."""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader.wait()
+            self.loader = None
+        if self.tree is not None:
+            self.tree.close()
+            self.tree = None
+        self.title.setText("Opening explorer")
+        self._refresh()
+
+    def show_position(self, board: chess.Board) -> None:
+        """
+        List the moves played from a position.
+
+        Args:
+            board (chess.Board): The position
+        """
+        self.board = board.copy(stack=False)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Fill the table with the moves played from the position."""
+        self.moves = self.tree.moves(self.board) if self.tree is not None else []
+        self.table.setRowCount(len(self.moves))
+        for row, explorer_move in enumerate(self.moves):
+            games = explorer_move.games
+            cells = (
+                self.board.san(explorer_move.move),
+                str(games),
+                f"{100 * explorer_move.white_wins / games:.0f}%",
+                f"{100 * explorer_move.draws / games:.0f}%",
+                f"{100 * explorer_move.black_wins / games:.0f}%",
+            )
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def _on_tree_loaded(self, tree: OpeningTree) -> None:
+        """Show the moves of the displayed position from the opened tree."""
+        if self.sender() is not self.loader:
+            tree.close()
+            return
+        self.loader = None
+        self.tree = tree
+        self.title.setText("Opening explorer")
+        self._refresh()
+
+    def _on_tree_failed(self, message: str) -> None:
+        """Report a tree that could not be built."""
+        if self.sender() is not self.loader:
+            return
+        print(f"Error building opening tree: {message}")
+        self.loader = None
+        self.title.setText("Opening explorer")
+
+    def _on_move_activated(self, row: int, column: int) -> None:
+        """Emit the activated move."""
+        if row < len(self.moves):
+            self.moveSelected.emit(self.moves[row].move)
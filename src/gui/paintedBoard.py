@@ -0,0 +1,160 @@
+"""
+Single-widget chess board implementation for StockPy.
+"""
+
+from PyQt6.QtGui import QPainter, QColor, QMouseEvent
+from PyQt6.QtCore import Qt, QPoint, QRect
+from PyQt6.QtWidgets import QApplication
+import chess
+from core.trace import tracer
+from .board import ChessBoard
+
+class PaintedChessBoard(ChessBoard):
+    """
+    Chess board that paints all squares, highlights, coordinates and pieces itself.
+
+    It behaves like ChessBoard, but instead of 64 square widgets it is a single
+    widget: changed squares are invalidated as dirty rectangles, and only the
+    squares intersecting the region being repainted are drawn. Drag and drop
+    is handled by hit-testing the mouse position against the squares.
+    """
+
+    # Square and highlight colors (same as ChessSquare)
+    LIGHT_COLOR = QColor("#F0D9B5")
+    DARK_COLOR = QColor("#B58863")
+    CHECK_COLOR = QColor(255, 0, 0, 100)
+    SUGGESTION_COLOR = QColor(0, 255, 0, 100)
+    LABEL_COLOR = QColor("#000000")
+
+    def _create_squares(self) -> None:
+        """Set up the board geometry and drag state (no child widgets)."""
+        self.squares = {}
+        self.origin = QPoint(0, 0)  # Top-left corner of the board
+        self.drag_from = None       # Square of the dragged piece
+        self.drag_start_position = None
+        self.drag_position = None   # Mouse position while dragging
+
+    def _square_rect(self, square: chess.Square) -> QRect:
+        """Get the rectangle of a square in widget coordinates."""
+        return QRect(
+            self.origin.x() + chess.square_file(square) * self.square_size,
+            self.origin.y() + (7 - chess.square_rank(square)) * self.square_size,
+            self.square_size,
+            self.square_size,
+        )
+
+    def _square_at(self, position: QPoint) -> chess.Square:
+        """Get the square under a point in widget coordinates, or None if outside the board."""
+        x = position.x() - self.origin.x()
+        y = position.y() - self.origin.y()
+        board_size = 8 * self.square_size
+        if not (0 <= x < board_size and 0 <= y < board_size):
+            return None
+        return chess.square(x // self.square_size, 7 - y // self.square_size)
+
+    def _drag_rect(self) -> QRect:
+        """Get the rectangle covered by the dragged piece."""
+        rect = QRect(0, 0, self.square_size, self.square_size)
+        rect.moveCenter(self.drag_position)
+        return rect
+
+    def _render_square(self, square: chess.Square, state: tuple, previous: tuple) -> None:
+        """Schedule a repaint of a changed square."""
+        self.update(self._square_rect(square))
+
+    def resizeEvent(self, event):
+        """Center the board in the widget and scale its squares."""
+        size = min(self.width(), self.height())
+        square_size = size // 8
+        self.origin = QPoint((self.width() - 8 * square_size) // 2, (self.height() - 8 * square_size) // 2)
+        self._set_square_size(square_size)
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        """Paint the squares intersecting the region to repaint, then the dragged piece."""
+        if self.square_size is None:
+            return
+        with tracer.span('board.paint'):
+            painter = QPainter(self)
+            dirty = event.rect()
+
+            for square in chess.SQUARES:
+                rect = self._square_rect(square)
+                if not rect.intersects(dirty):
+                    continue
+                symbol, suggested, in_check = self.rendered.get(square, (None, False, False))
+
+                # Base square color and highlights
+                is_dark = (chess.square_file(square) + chess.square_rank(square)) % 2 == 0
+                painter.fillRect(rect, self.DARK_COLOR if is_dark else self.LIGHT_COLOR)
+                if in_check:
+                    painter.fillRect(rect, self.CHECK_COLOR)
+                if suggested:
+                    painter.fillRect(rect, self.SUGGESTION_COLOR)
+
+                # Coordinates on the first rank and file
+                label = ''
+                if chess.square_rank(square) == 0:
+                    label += chess.FILE_NAMES[chess.square_file(square)]
+                if chess.square_file(square) == 0:
+                    label += chess.RANK_NAMES[chess.square_rank(square)]
+                if label:
+                    painter.setPen(self.LABEL_COLOR)
+                    painter.drawText(rect.left() + 5, rect.bottom() - 4, label)
+
+                # Piece (left out while it is being dragged)
+                if symbol and square != self.drag_from:
+                    self._draw_piece(painter, symbol, rect.center())
+
+            # Dragged piece, centered on the mouse
+            if self.drag_from is not None and self.drag_position is not None:
+                self._draw_piece(painter, self.rendered.get(self.drag_from, (None,))[0], self.drag_position)
+
+    def _draw_piece(self, painter: QPainter, symbol: str, center: QPoint) -> None:
+        """Draw the image of a piece centered on a point."""
+        pixmap = self._piece_pixmap(symbol) if symbol else None
+        if pixmap is not None:
+            target = QRect(QPoint(0, 0), pixmap.deviceIndependentSize().toSize())
+            target.moveCenter(center)
+            painter.drawPixmap(target.topLeft(), pixmap)
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        """Remember the piece under the mouse to start dragging it."""
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+        square = self._square_at(event.position().toPoint())
+        if square is not None and self.rendered.get(square, (None,))[0]:
+            self.drag_start_position = event.position().toPoint()
+            self.drag_from = square
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        """Move the dragged piece, repainting only the area it leaves and enters."""
+        if self.drag_from is None or not event.buttons() & Qt.MouseButton.LeftButton:
+            return
+        position = event.position().toPoint()
+        if self.drag_position is None:
+            # Check if the drag threshold has been met
+            if (position - self.drag_start_position).manhattanLength() < QApplication.startDragDistance():
+                return
+            self.update(self._square_rect(self.drag_from))
+        else:
+            self.update(self._drag_rect())
+        self.drag_position = position
+        self.update(self._drag_rect())
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        """Drop the dragged piece on the square under the mouse."""
+        if event.button() != Qt.MouseButton.LeftButton or self.drag_from is None:
+            return
+        from_square = self.drag_from
+        dragged = self.drag_position is not None
+        if dragged:
+            self.update(self._drag_rect())
+        self.update(self._square_rect(from_square))
+        self.drag_from = None
+        self.drag_start_position = None
+        self.drag_position = None
+
+        to_square = self._square_at(event.position().toPoint())
+        if dragged and to_square is not None and to_square != from_square:
+            self.try_move(from_square, to_square)
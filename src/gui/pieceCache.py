@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from PyQt6.QtGui import QPixmap, QPainter
+from PyQt6.QtCore import Qt, QRectF
+try:
+    from PyQt6.QtSvg import QSvgRenderer
+except ImportError:
+    QSvgRenderer = None
+
+class PieceCache:
+    """
+    Piece images rendered at the size they are displayed.
+
+    Source images are loaded on first use. Each piece is then rendered
+    lazily, once per (size, device pixel ratio), from its source image: a
+    bitmap (PNG) is scaled, a vector image (SVG) is rasterized at the exact
+    device resolution so it stays sharp on high-DPI screens. The rendered
+    pixmap is shared by every square showing that piece. Only the few most
+    recently used sizes are kept, so resizing the window does not accumulate
+    pixmaps.
+    """
+
+    def __init__(self, paths: dict[str, str], max_sizes: int = 4):
+        """
+        Initialize the cache.
+
+        Args:
+            paths (dict[str, str]): Path of the source image (.svg or .png) of each piece, by symbol
+            max_sizes (int): Number of (size, device pixel ratio) pairs to keep
+        """
+        self.paths = paths
+        self.sources = {}   # Loaded source images (QPixmap or QSvgRenderer), or None if invalid
+        self.max_sizes = max_sizes
+        self.sizes: OrderedDict[tuple, dict[str, QPixmap]] = OrderedDict()
+        self.scalings = 0   # Number of images rendered so far
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.paths
+
+    def source(self, symbol: str):
+        """
+        Get the source image of a piece, loading it on first use.
+
+        Returns:
+            QPixmap | QSvgRenderer: The source image, or None if it could not be loaded
+        """
+        if symbol not in self.sources:
+            path = self.paths.get(symbol)
+            source = None
+            if path is not None and path.endswith('.svg'):
+                source = QSvgRenderer(path)
+                if not source.isValid():
+                    source = None
+            elif path is not None:
+                source = QPixmap(path)
+                if source.isNull():
+                    source = None
+            if path is not None and source is None:
+                print(f"Error loading piece image: {path}")
+            self.sources[symbol] = source
+        return self.sources[symbol]
+
+    def pixmap(self, symbol: str, size: int, device_pixel_ratio: float = 1.0) -> QPixmap:
+        """
+        Get the image of a piece.
+
+        Args:
+            symbol (str): Piece symbol ('P', 'n', ...)
+            size (int): Size of the image in logical pixels
+            device_pixel_ratio (float): Device pixel ratio of the screen
+
+        Returns:
+            QPixmap: The image, or None if the piece has no source image
+        """
+        source = self.source(symbol)
+        if source is None:
+            return None
+
+        key = (size, device_pixel_ratio)
+        pixmaps = self.sizes.get(key)
+        if pixmaps is None:
+            pixmaps = self.sizes[key] = {}
+            while len(self.sizes) > self.max_sizes:
+                self.sizes.popitem(last=False)
+        else:
+            self.sizes.move_to_end(key)
+
+        pixmap = pixmaps.get(symbol)
+        if pixmap is None:
+            device_size = max(1, round(size * device_pixel_ratio))
+            if isinstance(source, QPixmap):
+                pixmap = source.scaled(
+                    device_size, device_size,
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
+            else:
+                pixmap = self._rasterize(source, device_size)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+            pixmaps[symbol] = pixmap
+            self.scalings += 1
+        return pixmap
+
+    @staticmethod
+    def _rasterize(renderer, device_size: int) -> QPixmap:
+        """Render a vector image into a square pixmap, keeping its aspect ratio."""
+        pixmap = QPixmap(device_size, device_size)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        view_box = renderer.viewBoxF()
+        target = QRectF(0, 0, device_size, device_size)
+        if not view_box.isEmpty():
+            scale = device_size / max(view_box.width(), view_box.height())
+            target.setSize(view_box.size() * scale)
+            target.moveCenter(QRectF(0, 0, device_size, device_size).center())
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        renderer.render(painter, target)
+        painter.end()
+        return pixmap
+
+    def clear(self) -> None:
+        """Forget all rendered images."""
+        self.sizes.clear()
@@ -68,15 +68,11 @@ class ChessSquare(QWidget):
         Set or remove a piece on this square.
         
         Args:
-            pixmap (QPixmap, optional): Piece image to display, or None to remove piece
+            pixmap (QPixmap, optional): Piece image to display, already scaled
+                to the square size, or None to remove piece
         """
         if pixmap and not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(
-                self.size() * 0.8,  # Make piece slightly smaller than square
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.piece_label.setPixmap(scaled_pixmap)
+            self.piece_label.setPixmap(pixmap)
         else:
             self.piece_label.clear()
             
@@ -126,9 +122,6 @@ class ChessSquare(QWidget):
         """Handle square resizing."""
         super().resizeEvent(event)
         self.piece_label.setGeometry(0, 0, self.width(), self.height())
-        if self.piece_label.pixmap() and not self.piece_label.pixmap().isNull():
-            current_pixmap = self.piece_label.pixmap().copy()
-            self.setPiece(current_pixmap)
 
     def setSuggested(self, suggested: bool):
         """Set whether this square is part of the suggested move."""
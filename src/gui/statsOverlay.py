@@ -0,0 +1,76 @@
+"""
+Statistics overlay for StockPy.
+"""
+
+from PyQt6.QtWidgets import QLabel, QWidget
+from PyQt6.QtCore import Qt, QTimer
+from core.trace import tracer
+
+# Refreshes of the overlay per second
+STATS_REFRESH_RATE = 4
+
+class StatsOverlay(QLabel):
+    """
+    Semi-transparent label drawn over the top left corner of a widget,
+    showing the engine speed and depth, the request latency, the frame time
+    and the cache hit rate, as recorded by the tracer.
+
+    Tracing is enabled while the overlay is shown (and disabled again when
+    it is hidden, unless it was already enabled, e.g. to export a trace).
+    """
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+        self.enabled_tracing = False
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("""
+            QLabel {
+                color: white;
+                background-color: rgba(0, 0, 0, 160);
+                font-family: monospace;
+                font-size: 12px;
+                padding: 4px;
+                border-radius: 4px;
+            }
+        """)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000 // STATS_REFRESH_RATE)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def showEvent(self, event) -> None:
+        if not tracer.enabled:
+            tracer.enable()
+            self.enabled_tracing = True
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        self.refresh_timer.stop()
+        if self.enabled_tracing:
+            tracer.disable()
+            self.enabled_tracing = False
+        super().hideEvent(event)
+
+    def refresh(self) -> None:
+        """Show the latest statistics."""
+        nps = tracer.gauges.get('engine.nps')
+        depth = tracer.gauges.get('engine.depth')
+        latency = tracer.mean_duration('engine.latency')
+        frame = sum(filter(None, (tracer.mean_duration('board.update_display'),
+                                  tracer.mean_duration('board.paint'))))
+        hits = tracer.counters.get('cache.hit', 0)
+        lookups = hits + tracer.counters.get('cache.miss', 0)
+
+        lines = [
+            f"Engine   {nps / 1e6:.2f} Mnps" if nps else "Engine   -",
+            f"Depth    {depth}" if depth is not None else "Depth    -",
+            f"Request  {latency:.1f} ms" if latency is not None else "Request  -",
+            f"Frame    {frame:.2f} ms" if frame else "Frame    -",
+            f"Cache    {100 * hits / lookups:.0f}% hits" if lookups else "Cache    -",
+        ]
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        self.move(8, 8)
+        self.raise_()
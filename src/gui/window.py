@@ -3,10 +3,18 @@ Main window implementation for StockPy.
 """
 
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
-from PyQt6.QtGui import QAction, QIcon
+from PyQt6.QtGui import QAction, QIcon, QKeySequence
+from PyQt6.QtCore import Qt
 from .board import ChessBoard
+from .paintedBoard import PaintedChessBoard
 from .moveList import MoveList
 from .evaluationBar import EvaluationBar
+from .evaluationGraph import EvaluationGraph
+from .gameBrowser import GameBrowser
+from .openingExplorer import OpeningExplorer
+from .statsOverlay import StatsOverlay
+from .analysisPanel import AnalysisPanel
+from core.stockfish import DEFAULT_STOCKFISH_PATH
 import os
 
 class MainWindow(QMainWindow):
@@ -17,8 +25,17 @@ class MainWindow(QMainWindow):
     the main application layout.
     """
     
-    def __init__(self):
-        """Initialize the main window and set up the UI."""
+    def __init__(self, stockfish_path: str = DEFAULT_STOCKFISH_PATH, painted_board: bool = False,
+                 book_path: str = None, tablebase_path: str = None):
+        """
+        Initialize the main window and set up the UI.
+
+        Args:
+            stockfish_path (str): Path to the UCI engine executable
+            painted_board (bool): Use the single-widget painted board instead of square widgets
+            book_path (str): Optional Polyglot opening book consulted before the engine
+            tablebase_path (str): Optional directory of Syzygy tablebases probed before searching
+        """
         super().__init__(None)
         
         # Set window properties
@@ -52,6 +69,24 @@ class MainWindow(QMainWindow):
         # Add move list to right panel
         self.move_list = MoveList()
         right_layout.addWidget(self.move_list)
+
+        # Add evaluation graph (filled by game reviews) to right panel
+        self.eval_graph = EvaluationGraph()
+        right_layout.addWidget(self.eval_graph)
+
+        # Add engine lines to right panel (connected once the board exists)
+        self.analysis_panel = AnalysisPanel()
+        right_layout.addWidget(self.analysis_panel)
+
+        # Add game browser (shown once a PGN database is opened) to right panel
+        self.game_browser = GameBrowser()
+        self.game_browser.hide()
+        right_layout.addWidget(self.game_browser)
+
+        # Add opening explorer (shown once a tree is opened) to right panel
+        self.opening_explorer = OpeningExplorer()
+        self.opening_explorer.hide()
+        right_layout.addWidget(self.opening_explorer)
         
         # Add evaluation bar to left panel
         self.eval_bar = EvaluationBar()
@@ -61,18 +96,39 @@ class MainWindow(QMainWindow):
         # Create resource getters
         resource_getters = {
             'eval_bar': self.get_evaluation_bar,
-            'move_list': self.get_move_list
+            'move_list': self.get_move_list,
+            'eval_graph': self.get_evaluation_graph
         }
         
         # Create and add chess board to left panel
-        self.board = ChessBoard(
-            stockfish_path=os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "stockfish", "stockfish-ubuntu-x86-64-avx2")),
+        board_class = PaintedChessBoard if painted_board else ChessBoard
+        self.board = board_class(
+            stockfish_path=stockfish_path,
             resource_getters=resource_getters
         )
         left_layout.addWidget(self.board)
+
+        # Add statistics overlay (hidden until enabled) over the board
+        self.stats_overlay = StatsOverlay(self.board)
         
         # Connect move list signals
         self.move_list.moveSelected.connect(self.board.jump_to_move)
+        self.eval_graph.plySelected.connect(self.board.go_to_ply)
+        self.game_browser.gameSelected.connect(self.board.load_game)
+        self.board.positionChanged.connect(self.opening_explorer.show_position)
+        self.opening_explorer.moveSelected.connect(self.board.play_move)
+        self.opening_explorer.show_position(self.board.board)
+        if self.board.engine is not None:
+            self.analysis_panel.lines_box.setValue(self.board.engine.multipv)
+        self.board.positionChanged.connect(self.analysis_panel.set_position)
+        self.board.analysisUpdated.connect(self.analysis_panel.set_analysis)
+        self.analysis_panel.linesChanged.connect(self.board.set_analysis_lines)
+        self.board.bookMovesChanged.connect(self.analysis_panel.set_book_moves)
+        self.analysis_panel.set_position(self.board.board)
+        if book_path is not None:
+            self.board.open_book(book_path)
+        if tablebase_path is not None:
+            self.board.open_tablebase(tablebase_path)
 
         ########################
         ### MENU BAR ACTIONS ###
@@ -83,6 +139,19 @@ class MainWindow(QMainWindow):
         self.import_action.triggered.connect(self.import_pgn)
         self.export_action = QAction("Export PGN", self)
         self.export_action.triggered.connect(self.export_pgn)
+        self.open_database_action = QAction("Open PGN database", self)
+        self.open_database_action.triggered.connect(self.open_database)
+        self.find_position_action = QAction("Find position in database", self)
+        self.find_position_action.setShortcut(QKeySequence.StandardKey.Find)
+        self.find_position_action.triggered.connect(self.find_position)
+        self.open_explorer_action = QAction("Open opening explorer", self)
+        self.open_explorer_action.triggered.connect(self.open_opening_explorer)
+        self.warm_store_action = QAction("Pre-analyse PGN", self)
+        self.warm_store_action.triggered.connect(self.warm_analysis_store)
+
+        # Review game
+        self.review_game_action = QAction("Review game", self)
+        self.review_game_action.triggered.connect(self.board.review_game)
 
         # Clear board
         self.reset_board_action = QAction("Reset", self)
@@ -94,16 +163,73 @@ class MainWindow(QMainWindow):
         self.toggle_evaluation_bar_action = QAction("Disable evaluation", self)
         self.toggle_evaluation_bar_action.triggered.connect(self.toggle_evaluation_bar)
 
+        # Toggle infinite analysis (otherwise searches are fixed-time)
+        self.toggle_infinite_analysis_action = QAction("Infinite analysis", self)
+        self.toggle_infinite_analysis_action.setCheckable(True)
+        self.toggle_infinite_analysis_action.setChecked(self.board.analysis_time_limit is None)
+        self.toggle_infinite_analysis_action.triggered.connect(self.toggle_infinite_analysis)
+
+        # Opening book consulted before the engine
+        self.open_book_action = QAction("Open opening book", self)
+        self.open_book_action.triggered.connect(self.open_book)
+        self.open_tablebase_action = QAction("Open Syzygy tablebases", self)
+        self.open_tablebase_action.triggered.connect(self.open_tablebase)
+
+        # Toggle the statistics overlay
+        self.toggle_stats_overlay_action = QAction("Show statistics", self)
+        self.toggle_stats_overlay_action.setCheckable(True)
+        self.toggle_stats_overlay_action.triggered.connect(self.stats_overlay.setVisible)
+
+        # Navigate through the game (left/right arrows step, up/down switch variation, Home/End jump)
+        self.back_action = QAction("Previous move", self)
+        self.back_action.setShortcut(QKeySequence(Qt.Key.Key_Left))
+        self.back_action.triggered.connect(self.board.go_back)
+        self.forward_action = QAction("Next move", self)
+        self.forward_action.setShortcut(QKeySequence(Qt.Key.Key_Right))
+        self.forward_action.triggered.connect(self.board.go_forward)
+        self.start_action = QAction("First position", self)
+        self.start_action.setShortcut(QKeySequence(Qt.Key.Key_Home))
+        self.start_action.triggered.connect(self.board.go_to_start)
+        self.end_action = QAction("Last position", self)
+        self.end_action.setShortcut(QKeySequence(Qt.Key.Key_End))
+        self.end_action.triggered.connect(self.board.go_to_end)
+        self.previous_variation_action = QAction("Previous variation", self)
+        self.previous_variation_action.setShortcut(QKeySequence(Qt.Key.Key_Up))
+        self.previous_variation_action.triggered.connect(self.board.previous_variation)
+        self.next_variation_action = QAction("Next variation", self)
+        self.next_variation_action.setShortcut(QKeySequence(Qt.Key.Key_Down))
+        self.next_variation_action.triggered.connect(self.board.next_variation)
+
         # Add actions to the menu
         self.board_menu = self.menuBar().addMenu("Board")
         self.board_menu.addAction(self.import_action)
         self.board_menu.addAction(self.export_action)
+        self.board_menu.addAction(self.open_database_action)
+        self.board_menu.addAction(self.find_position_action)
+        self.board_menu.addAction(self.open_explorer_action)
+        self.board_menu.addAction(self.warm_store_action)
         self.board_menu.addSeparator()
+        self.board_menu.addAction(self.review_game_action)
         self.board_menu.addAction(self.reset_board_action)
 
+        self.navigate_menu = self.menuBar().addMenu("Navigate")
+        self.navigate_menu.addAction(self.back_action)
+        self.navigate_menu.addAction(self.forward_action)
+        self.navigate_menu.addSeparator()
+        self.navigate_menu.addAction(self.start_action)
+        self.navigate_menu.addAction(self.end_action)
+        self.navigate_menu.addSeparator()
+        self.navigate_menu.addAction(self.previous_variation_action)
+        self.navigate_menu.addAction(self.next_variation_action)
+
         self.engine_menu = self.menuBar().addMenu("Engine")
         self.engine_menu.addAction(self.toggle_engine_suggestions_action)
         self.engine_menu.addAction(self.toggle_evaluation_bar_action)
+        self.engine_menu.addAction(self.toggle_infinite_analysis_action)
+        self.engine_menu.addAction(self.open_book_action)
+        self.engine_menu.addAction(self.open_tablebase_action)
+        self.engine_menu.addSeparator()
+        self.engine_menu.addAction(self.toggle_stats_overlay_action)
 
     ##########################
     ### MENU BAR CALLBACKS ###
@@ -121,9 +247,48 @@ class MainWindow(QMainWindow):
         if pgn_path:
             self.board.export_pgn(pgn_path)
 
+    def open_database(self):
+        """Open a file dialog to browse the games of a PGN database."""
+        pgn_path, _ = QFileDialog.getOpenFileName(self, "Open PGN database", "", "PGN Files (*.pgn)")
+        if pgn_path:
+            self.game_browser.show()
+            self.game_browser.open_database(pgn_path)
+
+    def find_position(self):
+        """List the games of the open database that reach the displayed position."""
+        if self.game_browser.database is None:
+            self.open_database()
+        self.game_browser.find_position(self.board.board)
+
+    def open_opening_explorer(self):
+        """Open a file dialog to choose the PGN database of the opening explorer."""
+        pgn_path, _ = QFileDialog.getOpenFileName(self, "Open opening explorer", "", "PGN Files (*.pgn)")
+        if pgn_path:
+            self.opening_explorer.show()
+            self.opening_explorer.open_tree(pgn_path)
+
+    def warm_analysis_store(self):
+        """Open a file dialog to choose a PGN file to analyse in the background."""
+        pgn_path, _ = QFileDialog.getOpenFileName(self, "Pre-analyse PGN", "", "PGN Files (*.pgn)")
+        if pgn_path:
+            self.board.warm_analysis_store(pgn_path)
+
+    def open_book(self):
+        """Open a file dialog to choose a Polyglot opening book."""
+        book_path, _ = QFileDialog.getOpenFileName(self, "Open opening book", "", "Polyglot Books (*.bin)")
+        if book_path:
+            self.board.open_book(book_path)
+
+    def open_tablebase(self):
+        """Open a directory dialog to choose the Syzygy tablebases."""
+        directory = QFileDialog.getExistingDirectory(self, "Open Syzygy tablebases")
+        if directory:
+            self.board.open_tablebase(directory)
+
     def reset_board(self):
         self.move_list.reset()
         self.eval_bar.reset()
+        self.eval_graph.reset()
         self.board.reset()
 
     def toggle_engine_suggestions(self):
@@ -142,11 +307,17 @@ class MainWindow(QMainWindow):
             "Disable evaluation" if is_enabled else "Enable evaluation"
         )
 
+    def toggle_infinite_analysis(self):
+        """Toggle infinite analysis and update the menu check mark."""
+        self.board.toggle_infinite_analysis()
+        self.toggle_infinite_analysis_action.setChecked(self.board.analysis_time_limit is None)
+
     def closeEvent(self, event):
         """Handle the window close event."""
-        if self.board and self.board.engine:
-            self.board.engine.quit()
-            self.board.engine = None
+        if self.board:
+            self.board.shutdown_engine()
+        self.game_browser.close_database()
+        self.opening_explorer.close_tree()
         super().closeEvent(event)
 
     ########################
@@ -160,3 +331,7 @@ class MainWindow(QMainWindow):
     def get_move_list(self) -> MoveList:
         """Get the move list."""
         return self.move_list
+
+    def get_evaluation_graph(self) -> EvaluationGraph:
+        """Get the evaluation graph."""
+        return self.eval_graph
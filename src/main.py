@@ -4,9 +4,73 @@ StockPy - A multi-platform Python3 frontend for Stockfish.
 This module serves as the entry point for the StockPy application.
 """
 
+import time
+START_TIME = time.perf_counter()
+
 import sys
+import argparse
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QTimer
 from gui.window import MainWindow
+from core.stockfish import DEFAULT_STOCKFISH_PATH, STOCKFISH_PATH_VARIABLE
+from core.trace import tracer
+
+class StartupMonitor(QObject):
+    """
+    Measure the startup of the application (--measure-startup).
+
+    Reports the time from launch until the board is first painted and until
+    the engine is ready to search, then closes the window.
+    """
+
+    def __init__(self, window: MainWindow):
+        super().__init__(window)
+        self.window = window
+        self.first_paint = None
+        self.engine_ready = None
+        self.engine_failed = False
+        self.reported = False
+
+        window.board.installEventFilter(self)
+        engine = window.board.engine
+        if engine is None:
+            self.engine_failed = True
+        else:
+            engine.engineReady.connect(self._on_engine_ready)
+            engine.engineFailed.connect(self._on_engine_failed)
+            # The engine may already be ready (it starts on its own thread)
+            if engine.ready_time is not None:
+                self._on_engine_ready()
+
+    def eventFilter(self, watched, event) -> bool:
+        """Record the first paint of the board."""
+        if event.type() == QEvent.Type.Paint and self.first_paint is None:
+            self.first_paint = time.perf_counter()
+            self._report()
+        return False
+
+    def _on_engine_ready(self) -> None:
+        """Record when the engine became ready."""
+        self.engine_ready = self.window.board.engine.ready_time
+        self._report()
+
+    def _on_engine_failed(self, message: str) -> None:
+        """Stop waiting for an engine that could not be started."""
+        self.engine_failed = True
+        self._report()
+
+    def _report(self) -> None:
+        """Print the measurements once both are known, and quit."""
+        if self.reported or self.first_paint is None or (self.engine_ready is None and not self.engine_failed):
+            return
+        self.reported = True
+        print(f"Time to first paint:   {(self.first_paint - START_TIME) * 1000:8.1f} ms")
+        if self.engine_ready is not None:
+            print(f"Time to engine ready:  {(self.engine_ready - START_TIME) * 1000:8.1f} ms")
+        else:
+            print("Time to engine ready:  engine unavailable")
+        self.window.board.removeEventFilter(self)
+        QTimer.singleShot(0, self.window.close)
 
 def main():
     """
@@ -15,18 +79,43 @@ def main():
     Creates the QApplication instance, sets up the main window,
     and starts the event loop.
     """
+    # Parse StockPy options, leaving the rest to Qt
+    parser = argparse.ArgumentParser(description="A multi-platform Python3 frontend for Stockfish.")
+    parser.add_argument('--engine', default=DEFAULT_STOCKFISH_PATH,
+                        help=f"path to the UCI engine executable (default: ${STOCKFISH_PATH_VARIABLE} or the bundled Stockfish)")
+    parser.add_argument('--book', metavar='PATH',
+                        help="Polyglot opening book (.bin) whose moves are suggested before the engine's")
+    parser.add_argument('--syzygy', metavar='DIR',
+                        help="directory of Syzygy tablebases, probed for exact endgame results before searching")
+    parser.add_argument('--painted-board', action='store_true',
+                        help="draw the board as a single painted widget instead of 64 square widgets")
+    parser.add_argument('--measure-startup', action='store_true',
+                        help="report the time to first paint and to engine ready, then exit")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="record engine, cache, rendering and PGN timings to a file on exit "
+                             "(a Chrome trace if PATH ends with .json, JSON lines otherwise)")
+    args, qt_args = parser.parse_known_args()
+    if args.trace:
+        tracer.enable(keep_events=True)
+
     # Initialize the Qt application
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("StockPy")
     app.setApplicationDisplayName("StockPy")
     app.setDesktopFileName("StockPy")
     
-    # Create and show the main window
-    window = MainWindow()
+    # Create and show the main window (the engine starts in the background)
+    window = MainWindow(stockfish_path=args.engine, painted_board=args.painted_board, book_path=args.book,
+                        tablebase_path=args.syzygy)
+    if args.measure_startup:
+        StartupMonitor(window)
     window.show()
     
     # Start the event loop
-    sys.exit(app.exec())
+    status = app.exec()
+    if args.trace:
+        tracer.export(args.trace)
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()
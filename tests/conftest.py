@@ -0,0 +1,98 @@
+"""
+Shared fixtures of the StockPy tests.
+
+The tests run without a display (QT_QPA_PLATFORM=offscreen) and without
+Stockfish: engines are played by the deterministic fake engine of
+fake_uci.py, and the analysis store and indexes are written to a temporary
+cache directory.
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import time
+
+# Must be set before Qt and StockPy are imported
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ['XDG_CACHE_HOME'] = tempfile.mkdtemp(prefix='stockpy-tests-cache-')
+os.environ['XDG_CONFIG_HOME'] = tempfile.mkdtemp(prefix='stockpy-tests-config-')
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'src'))
+
+import chess
+import chess.pgn
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+FAKE_UCI = os.path.join(TESTS_DIR, 'fake_uci.py')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """The QApplication of the test session."""
+    app = QApplication.instance() or QApplication(['stockpy-tests'])
+    yield app
+
+
+@pytest.fixture(scope='session')
+def fake_engine(tmp_path_factory):
+    """
+    Factory of fake engine executables.
+
+    Calling it with fake_uci.py options (e.g. think_time=0.05, info_rate=200,
+    score=35) returns the path of an executable running the fake engine with
+    those options.
+    """
+    directory = tmp_path_factory.mktemp('engines')
+
+    def make(**options) -> str:
+        arguments = ' '.join(f"--{name.replace('_', '-')} {value}" for name, value in sorted(options.items()))
+        path = directory / f"fake-uci-{len(list(directory.iterdir()))}"
+        path.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_UCI}" {arguments} "$@"\n')
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+        return str(path)
+
+    return make
+
+
+@pytest.fixture
+def wait_until(qapp):
+    """Process Qt events until a condition holds (fails after a timeout in seconds)."""
+    def wait(condition, timeout: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                pytest.fail("Timed out waiting for the GUI")
+            qapp.processEvents()
+            time.sleep(0.001)
+
+    return wait
+
+
+@pytest.fixture
+def window(qapp, fake_engine, wait_until):
+    """A shown main window whose engine (the fake one) is ready to search."""
+    from gui.window import MainWindow
+
+    window = MainWindow(stockfish_path=fake_engine(info_rate=200))
+    window.resize(1000, 800)
+    window.show()
+    wait_until(lambda: window.board.engine.ready_time is not None)
+    yield window
+    window.close()
+    qapp.processEvents()
+
+
+@pytest.fixture(scope='session')
+def long_game_pgn(tmp_path_factory) -> str:
+    """Path to a PGN file of a 400 plies game (knights going back and forth)."""
+    game = chess.pgn.Game()
+    node = game
+    for _ in range(100):
+        for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8'):
+            node = node.add_variation(chess.Move.from_uci(uci))
+    path = tmp_path_factory.mktemp('pgn') / 'long.pgn'
+    path.write_text(str(game) + '\n')
+    return str(path)
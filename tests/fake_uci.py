@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for Stockfish, speaking just enough UCI for StockPy.
+
+Searches report one info line per depth at a fixed rate, with a fixed score
+(from the side to move's point of view) and the legal moves in UCI order as
+principal variations, so every run produces the same output:
+
+    python3 tests/fake_uci.py --think-time 0.2 --info-rate 100 --score 35
+
+A search ends after the think time (or the movetime of the go command), at
+the requested depth, or on stop for infinite searches.
+"""
+
+import argparse
+import sys
+import threading
+import time
+import chess
+
+# Options reported to the GUI (StockPy only configures the ones an engine declares)
+OPTIONS = (
+    'option name Threads type spin default 1 min 1 max 1024',
+    'option name Hash type spin default 16 min 1 max 33554432',
+    'option name MultiPV type spin default 1 min 1 max 500',
+    'option name SyzygyPath type string default <empty>',
+)
+
+
+class FakeEngine:
+    """UCI loop of the fake engine."""
+
+    def __init__(self, think_time: float, info_rate: float, score: int, max_depth: int):
+        self.think_time = think_time
+        self.info_interval = 1.0 / info_rate
+        self.score = score
+        self.max_depth = max_depth
+        self.board = chess.Board()
+        self.multipv = 1
+        self.stop = threading.Event()
+        self.search_thread = None
+        self.output_lock = threading.Lock()
+
+    def send(self, line: str) -> None:
+        with self.output_lock:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+
+    def run(self) -> None:
+        for line in sys.stdin:
+            tokens = line.split()
+            if not tokens:
+                continue
+            command, arguments = tokens[0], tokens[1:]
+            if command == 'uci':
+                self.send('id name FakeUCI')
+                self.send('id author StockPy tests')
+                for option in OPTIONS:
+                    self.send(option)
+                self.send('uciok')
+            elif command == 'isready':
+                self.send('readyok')
+            elif command == 'setoption' and 'value' in arguments:
+                name = ' '.join(arguments[1:arguments.index('value')])
+                if name == 'MultiPV':
+                    self.multipv = int(arguments[-1])
+            elif command == 'ucinewgame':
+                self.board = chess.Board()
+            elif command == 'position':
+                self.position(arguments)
+            elif command == 'go':
+                self.finish_search()
+                self.stop.clear()
+                self.search_thread = threading.Thread(target=self.search, args=(arguments,))
+                self.search_thread.start()
+            elif command == 'stop':
+                self.finish_search()
+            elif command == 'quit':
+                self.finish_search()
+                return
+
+    def position(self, arguments: list[str]) -> None:
+        """Set up the position of a position command."""
+        moves = arguments.index('moves') if 'moves' in arguments else len(arguments)
+        if arguments[0] == 'startpos':
+            self.board = chess.Board()
+        else:
+            self.board = chess.Board(' '.join(arguments[1:moves]))
+        for uci in arguments[moves + 1:]:
+            self.board.push_uci(uci)
+
+    def finish_search(self) -> None:
+        """Stop the search in progress and wait for its bestmove."""
+        self.stop.set()
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def search(self, arguments: list[str]) -> None:
+        """Report one depth per info interval until the search ends, then the best move."""
+        infinite = 'infinite' in arguments
+        think_time = float(arguments[arguments.index('movetime') + 1]) / 1000 if 'movetime' in arguments else self.think_time
+        max_depth = int(arguments[arguments.index('depth') + 1]) if 'depth' in arguments else self.max_depth
+        moves = sorted(self.board.legal_moves, key=chess.Move.uci)
+        if not moves:
+            self.send('info depth 0 score ' + ('mate 0' if self.board.is_check() else 'cp 0'))
+            self.send('bestmove (none)')
+            return
+
+        deadline = time.monotonic() + think_time
+        depth = 0
+        while not self.stop.is_set():
+            if depth < max_depth:
+                depth += 1
+                for line in range(min(self.multipv, len(moves))):
+                    self.send(f'info depth {depth} seldepth {depth} multipv {line + 1} '
+                              f'score cp {self.score - 10 * line} nodes {depth * 1000} nps 1000000 '
+                              f'pv {moves[line].uci()}')
+            elif not infinite:
+                break
+            if not infinite and time.monotonic() >= deadline:
+                break
+            self.stop.wait(self.info_interval)
+        self.send(f'bestmove {moves[0].uci()}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic fake UCI engine for StockPy tests.")
+    parser.add_argument('--think-time', type=float, default=0.1,
+                        help="seconds per search without movetime (default: 0.1)")
+    parser.add_argument('--info-rate', type=float, default=100,
+                        help="info lines (depths) per second (default: 100)")
+    parser.add_argument('--score', type=int, default=20,
+                        help="score in centipawns, from the side to move (default: 20)")
+    parser.add_argument('--max-depth', type=int, default=30,
+                        help="deepest depth reported (default: 30)")
+    args = parser.parse_args()
+    FakeEngine(args.think_time, args.info_rate, args.score, args.max_depth).run()
+
+
+if __name__ == '__main__':
+    main()
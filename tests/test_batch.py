@@ -0,0 +1,113 @@
+"""
+Tests of the batch analysis of PGN files, with a pool of fake engines.
+"""
+
+import json
+import chess.pgn
+import pytest
+from core.batch import BatchAnalyser
+from core.pool import EngineLayout
+
+# Games of different lengths, so that the two engine processes finish their
+# positions out of order
+GAMES_PGN = """[Event "G0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 *
+
+[Event "G1"]
+
+1. d4 *
+
+[Event "G2"]
+
+1. c4 e5 2. Nc3 Nf6 3. g3 d5 *
+
+[Event "G3"]
+
+1. Nf3 d5 *
+"""
+
+EVENTS = ['G0', 'G1', 'G2', 'G3']
+PLIES = [10, 1, 6, 2]
+
+
+@pytest.fixture
+def analyser(fake_engine):
+    """A batch analyser with two fake engine processes."""
+    return BatchAnalyser(fake_engine(info_rate=1000), EngineLayout(engines=2), time_limit=0.01)
+
+
+@pytest.fixture
+def pgn_path(tmp_path) -> str:
+    path = tmp_path / 'input.pgn'
+    path.write_text(GAMES_PGN)
+    return str(path)
+
+
+def read_jsonl(path) -> list[dict]:
+    with open(path) as output_file:
+        return [json.loads(line) for line in output_file]
+
+
+def read_events(path) -> list[str]:
+    with open(path) as output_file:
+        games = iter(lambda: chess.pgn.read_game(output_file), None)
+        return [game.headers['Event'] for game in games]
+
+
+def test_jsonl_output_keeps_game_order(analyser, pgn_path, tmp_path):
+    """Games are written in the order of the input, each with every position analysed."""
+    output_path = tmp_path / 'games.jsonl'
+    analyser.run(pgn_path, str(output_path))
+
+    records = read_jsonl(output_path)
+    assert [record['game'] for record in records] == [0, 1, 2, 3]
+    assert [record['headers']['Event'] for record in records] == EVENTS
+    for record, plies in zip(records, PLIES):
+        assert [position['ply'] for position in record['positions']] == list(range(plies + 1))
+        assert all('best' in position for position in record['positions'])
+    assert analyser.games == 4 and analyser.positions == sum(PLIES) + len(PLIES)
+
+
+def test_jsonl_resume_appends_missing_games(analyser, fake_engine, pgn_path, tmp_path):
+    """A resumed run drops a partial record and only analyses the games not written yet."""
+    output_path = tmp_path / 'games.jsonl'
+    analyser.run(pgn_path, str(output_path))
+    lines = output_path.read_text().splitlines(keepends=True)
+
+    # Keep two games and half of the third, as if the run was interrupted
+    output_path.write_text(''.join(lines[:2]) + lines[2][:20])
+    resumed = BatchAnalyser(fake_engine(info_rate=1000), EngineLayout(engines=2), time_limit=0.01)
+    resumed.run(pgn_path, str(output_path), resume=True)
+
+    assert resumed.games == 2
+    assert resumed.positions == PLIES[2] + PLIES[3] + 2
+    assert output_path.read_text().splitlines(keepends=True)[:2] == lines[:2]
+    assert [record['game'] for record in read_jsonl(output_path)] == [0, 1, 2, 3]
+
+
+def test_pgn_output_keeps_game_order_and_resumes(analyser, fake_engine, pgn_path, tmp_path):
+    """Annotated games are written in order, and a resumed run appends the missing ones."""
+    output_path = tmp_path / 'games.pgn'
+    analyser.run(pgn_path, str(output_path))
+    assert read_events(output_path) == EVENTS
+    with open(output_path) as output_file:
+        first_game = chess.pgn.read_game(output_file)
+    assert all(node.eval() is not None for node in first_game.mainline())
+
+    # Keep the first game only
+    text = output_path.read_text()
+    output_path.write_text(text[:text.index('[Event "G1"]')])
+    resumed = BatchAnalyser(fake_engine(info_rate=1000), EngineLayout(engines=2), time_limit=0.01)
+    resumed.run(pgn_path, str(output_path), resume=True)
+
+    assert resumed.games == 3
+    assert read_events(output_path) == EVENTS
+    assert output_path.read_text().startswith(text[:text.index('[Event "G1"]')])
+
+
+def test_engine_that_cannot_start(tmp_path, pgn_path):
+    """A missing engine fails the run at once instead of leaving the pool waiting."""
+    analyser = BatchAnalyser(str(tmp_path / 'missing-engine'), EngineLayout(engines=1), time_limit=0.01)
+    with pytest.raises(FileNotFoundError):
+        analyser.run(pgn_path, str(tmp_path / 'games.jsonl'))
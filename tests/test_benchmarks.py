@@ -0,0 +1,117 @@
+"""
+Benchmarks of the hot paths of the GUI (run with pytest-benchmark):
+
+    python -m pytest tests --benchmark-sort=name
+
+Rendering is measured on a bare board for both renderers, navigation and
+import on the main window, and the move-to-suggestion latency end to end
+through the (fake) engine.
+"""
+
+import itertools
+import chess
+import chess.engine
+import chess.pgn
+import pytest
+from gui.board import ChessBoard
+from gui.paintedBoard import PaintedChessBoard
+from gui.analysisPanel import AnalysisPanel
+from core.stockfish import AnalysisLine, PositionAnalysis
+
+
+@pytest.fixture(params=[ChessBoard, PaintedChessBoard], ids=['widgets', 'painted'])
+def board(request, qapp):
+    """A shown board without engine, laid out at 800 pixels."""
+    board = request.param(stockfish_path=None, resource_getters={})
+    board.resize(800, 800)
+    board.show()
+    qapp.processEvents()
+    yield board
+    board.close()
+
+
+def test_update_display(benchmark, board):
+    """Redraw every square (e.g. after a new game is loaded)."""
+    def redraw():
+        board.invalidate_display()
+        board.update_display()
+
+    benchmark(redraw)
+    assert board.square_size is not None
+
+
+def test_resize(benchmark, board, qapp):
+    """Resize the board and repaint it (alternating sizes, so every round rescales the pieces)."""
+    sizes = itertools.cycle((800, 792))
+
+    def resize():
+        size = next(sizes)
+        board.resize(size, size)
+        qapp.processEvents()
+        board.repaint()
+
+    benchmark(resize)
+
+
+def test_analysis_panel_update(benchmark, qapp, long_game_pgn):
+    """Show five deepening lines, as a MultiPV search reports them (the PVs share their first moves)."""
+    panel = AnalysisPanel(lines=5)
+    panel.show()
+    with open(long_game_pgn) as pgn_file:
+        moves = list(chess.pgn.read_game(pgn_file).mainline_moves())
+    assert moves
+    board = chess.Board()
+    panel.set_position(board)
+    depths = itertools.cycle(range(1, 30))
+
+    def update():
+        depth = next(depths)
+        analysis = PositionAnalysis()
+        analysis.lines = [
+            AnalysisLine(chess.engine.Cp(20 - 10 * i), depth, moves[:depth + i]) for i in range(5)
+        ]
+        panel.set_analysis(analysis)
+        qapp.processEvents()
+
+    benchmark(update)
+    panel.close()
+
+
+def test_jump_to_move(benchmark, window, long_game_pgn):
+    """Jump between distant positions of a long game."""
+    board = window.board
+    board.import_pgn(long_game_pgn)
+    board.stop_review()
+    targets = itertools.cycle((9, 389))
+
+    benchmark(lambda: board.jump_to_move(next(targets)))
+    assert board.history.ply in (10, 390)
+
+
+def test_import_pgn(benchmark, window, long_game_pgn):
+    """Import a 400 plies game (the review it starts is stopped between rounds)."""
+    board = window.board
+    benchmark.pedantic(board.import_pgn, args=(long_game_pgn,), setup=board.stop_review, rounds=20)
+    assert len(board.history) == 400
+
+
+def test_move_to_suggestion_latency(benchmark, window, wait_until):
+    """Time from playing a move to showing the engine suggestion for the new position."""
+    board = window.board
+    board.play_move(chess.Move.from_uci('e2e4'))
+
+    # Each round plays another reply, so no round is served from the analysis cache
+    replies = sorted(board.board.legal_moves, key=chess.Move.uci)
+    pending = iter(replies)
+
+    def setup():
+        board.go_to_ply(1)
+        wait_until(lambda: board.analysis is not None)
+        return (next(pending),), {}
+
+    def play(move):
+        board.play_move(move)
+        wait_until(lambda: board.analysis is not None)
+
+    benchmark.pedantic(play, setup=setup, rounds=len(replies))
+    assert board.suggested_from is not None
@@ -0,0 +1,57 @@
+"""
+Tests of the in-memory analysis cache.
+"""
+
+import chess
+import chess.engine
+from core.cache import AnalysisCache
+from core.stockfish import PositionAnalysis
+
+
+def board_after(*sans: str) -> chess.Board:
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+def test_shallower_analysis_does_not_replace_deeper_one():
+    cache = AnalysisCache()
+    board = board_after('e4')
+    deep = PositionAnalysis(score=chess.engine.Cp(30), depth=20)
+    cache.put(board, deep)
+    cache.put(board, PositionAnalysis(score=chess.engine.Cp(-50), depth=8))
+    assert cache.get(board) is deep
+
+    deeper = PositionAnalysis(score=chess.engine.Cp(25), depth=20)
+    cache.put(board, deeper)
+    assert cache.get(board) is deeper
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    """At capacity, the entry neither stored nor looked up lately makes room."""
+    cache = AnalysisCache(max_entries=2)
+    first, second, third = board_after('e4'), board_after('d4'), board_after('c4')
+    cache.put(first, PositionAnalysis(depth=10))
+    cache.put(second, PositionAnalysis(depth=10))
+    assert cache.get(first) is not None
+    cache.put(third, PositionAnalysis(depth=10))
+
+    assert len(cache) == 2
+    assert cache.get(second) is None
+    assert cache.get(first) is not None and cache.get(third) is not None
+
+
+def test_hits_and_misses_are_counted():
+    cache = AnalysisCache()
+    board = board_after('e4')
+    assert cache.get(board) is None
+    cache.put(board, PositionAnalysis(depth=10))
+    cache.get(board)
+    cache.get(board)
+    cache.get(board_after('d4'))
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
@@ -0,0 +1,85 @@
+"""
+Tests of PGN databases and of the indexes built from them.
+"""
+
+import chess
+from core.database import PGNDatabase, scan_games
+from core.positions import PositionIndex
+from core.explorer import OpeningTree
+
+WRAPPED_COMMENT_PGN = b"""[Event "A"]
+[White "Alice"]
+
+1. e4 { a comment wrapped
+[%clk 0:03:00] } 1... e5 1-0
+
+[Event "B"]
+[White "Bob"]
+
+1. d4 d5 0-1
+"""
+
+ILLEGAL_MOVE_PGN = """[Event "A"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "B"]
+[Result "0-1"]
+
+1. e4 e5 2. Ke3 Nc6 0-1
+
+[Event "C"]
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+"""
+
+
+def open_database(tmp_path, text: str) -> PGNDatabase:
+    """Write a PGN file and open it as a database."""
+    pgn_path = tmp_path / 'games.pgn'
+    pgn_path.write_text(text)
+    return PGNDatabase(str(pgn_path), index_path=str(tmp_path / 'games.index'))
+
+
+def test_wrapped_comment_does_not_start_a_game():
+    """A comment line starting with a bracket belongs to its game."""
+    games = list(scan_games(WRAPPED_COMMENT_PGN))
+    assert [headers for _, headers in games] == [{'Event': 'A', 'White': 'Alice'}, {'Event': 'B', 'White': 'Bob'}]
+    assert [offset for offset, _ in games] == [0, WRAPPED_COMMENT_PGN.index(b'[Event "B"]')]
+
+
+def test_byte_order_mark_and_crlf():
+    """Games are found after a UTF-8 BOM and in files with CRLF line endings."""
+    data = b'\xef\xbb\xbf' + WRAPPED_COMMENT_PGN.replace(b'\n', b'\r\n')
+    games = list(scan_games(data))
+    assert [headers['Event'] for _, headers in games] == ['A', 'B']
+    assert games[1][0] == data.index(b'[Event "B"]')
+
+
+def test_position_index_skips_illegal_moves(tmp_path):
+    """A game with an illegal move keeps its positions before the move, and the other games are indexed."""
+    database = open_database(tmp_path, ILLEGAL_MOVE_PGN)
+    index = PositionIndex(database, index_path=str(tmp_path / 'positions'), processes=1)
+    try:
+        assert index.find(chess.Board('rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2')) == [(0, 2), (1, 2)]
+        assert index.find(chess.Board('rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2')) == [(0, 3)]
+        assert index.find(chess.Board('rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2')) == [(2, 2)]
+    finally:
+        index.close()
+        database.close()
+
+
+def test_opening_tree_skips_illegal_moves(tmp_path):
+    """A game with an illegal move counts for its moves before it, and the other games are aggregated."""
+    database = open_database(tmp_path, ILLEGAL_MOVE_PGN)
+    tree = OpeningTree(database, tree_path=str(tmp_path / 'tree'), processes=1)
+    try:
+        moves = {move.move.uci(): (move.white_wins, move.draws, move.black_wins) for move in tree.moves(chess.Board())}
+        assert moves == {'e2e4': (1, 0, 1), 'd2d4': (0, 1, 0)}
+        board = chess.Board('rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2')
+        assert [move.move.uci() for move in tree.moves(board)] == ['g1f3']
+    finally:
+        tree.close()
+        database.close()
@@ -0,0 +1,31 @@
+"""
+Tests of the fake engine itself, through python-chess as StockPy drives it.
+"""
+
+import chess
+import chess.engine
+
+
+def test_deterministic_analysis(fake_engine):
+    """The fake engine reports the configured score and the first legal move."""
+    engine = chess.engine.SimpleEngine.popen_uci(fake_engine(score=35, info_rate=1000))
+    try:
+        board = chess.Board()
+        info = engine.analyse(board, chess.engine.Limit(depth=5))
+        assert info['depth'] == 5
+        assert info['score'].relative == chess.engine.Cp(35)
+        assert info['pv'][0] == min(board.legal_moves, key=chess.Move.uci)
+    finally:
+        engine.quit()
+
+
+def test_multipv(fake_engine):
+    """Searches report one line per MultiPV, and end at the deepest depth."""
+    engine = chess.engine.SimpleEngine.popen_uci(fake_engine(info_rate=100, max_depth=3))
+    try:
+        infos = engine.analyse(chess.Board(), chess.engine.Limit(time=10), multipv=3)
+        assert [info['multipv'] for info in infos] == [1, 2, 3]
+        assert all(info['depth'] == 3 for info in infos)
+        assert [info['score'].relative.score() for info in infos] == [20, 10, 0]
+    finally:
+        engine.quit()
@@ -0,0 +1,99 @@
+"""
+Tests of the game history: variations, navigation and checkpoints.
+"""
+
+import chess
+from core.cache import AnalysisCache
+from core.game import GameHistory
+from core.stockfish import PositionAnalysis
+
+
+def play(history: GameHistory, *sans: str) -> None:
+    for san in sans:
+        history.push(history.board.parse_san(san))
+
+
+def test_new_move_in_the_middle_starts_a_variation():
+    """Going back and playing another move keeps the old moves as the mainline."""
+    history = GameHistory()
+    play(history, 'e4', 'e5', 'Nf3')
+    history.go_to(2)
+    play(history, 'Nc3')
+
+    assert [move.uci() for move in history.moves] == ['e2e4', 'e7e5', 'b1c3']
+    assert history.at_end and history.ply == 3
+    node = history.game.next().next()
+    assert [child.move.uci() for child in node.variations] == ['g1f3', 'b1c3']
+    assert history.game.end().move.uci() == 'g1f3'
+
+
+def test_playing_a_known_move_follows_its_variation():
+    """Playing a move that starts an existing variation follows it instead of adding another."""
+    history = GameHistory()
+    play(history, 'e4', 'e5', 'Nf3', 'Nc6')
+    history.go_to(2)
+    play(history, 'Nf3')
+
+    assert len(history.game.next().next().variations) == 1
+    assert len(history) == 4 and history.ply == 3
+
+
+def test_switching_variations_rebuilds_the_line():
+    """Switching to a sibling variation replaces the move and everything after it."""
+    history = GameHistory()
+    play(history, 'e4', 'e5', 'Nf3', 'Nc6', 'Bb5')
+    history.go_to(2)
+    play(history, 'Bc4', 'Bc5')
+    history.go_to(3)
+
+    assert history.switch_variation(-1)
+    assert [move.uci() for move in history.moves] == ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5']
+    assert history.ply == 3 and history.board.peek().uci() == 'g1f3'
+    history.go_to(len(history))
+    assert history.board.fen() == 'r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3'
+
+    history.go_to(3)
+    assert history.switch_variation(1)
+    assert [move.uci() for move in history.moves] == ['e2e4', 'e7e5', 'f1c4', 'f8c5']
+    assert not history.switch_variation(1)
+    history.go_to(0)
+    assert not history.switch_variation(-1)
+
+
+def test_go_to_across_checkpoints_matches_replaying():
+    """Jumping (from checkpoints, in both directions) gives the same boards as replaying the moves."""
+    history = GameHistory()
+    for _ in range(25):
+        play(history, 'Nf3', 'Nf6', 'Ng1', 'Ng8')
+    moves = list(history.moves)
+    assert len(moves) == 100 and len(history.checkpoints) > 1
+
+    def replayed(ply: int) -> chess.Board:
+        board = chess.Board()
+        for move in moves[:ply]:
+            board.push(move)
+        return board
+
+    for ply in (95, 3, 64, 31, 33, 100, 0, 70, 65):
+        history.go_to(ply)
+        expected = replayed(ply)
+        assert history.board == expected
+        assert history.board.move_stack == expected.move_stack
+        # Repetitions depend on the move stack, so it must survive the jump
+        assert history.board.is_repetition() == expected.is_repetition()
+
+
+def test_transposition_shares_cached_analysis():
+    """A position reached by two move orders has a single cache entry."""
+    cache = AnalysisCache()
+    history = GameHistory()
+    play(history, 'Nf3', 'Nf6', 'd4')
+    analysis = PositionAnalysis(score=chess.engine.Cp(25), depth=20)
+    cache.put(history.board, analysis)
+
+    # Reach the same position as a variation, through another move order
+    history.go_to(0)
+    play(history, 'd4', 'Nf6', 'Nf3')
+    assert [move.uci() for move in history.moves] == ['d2d4', 'g8f6', 'g1f3']
+    assert cache.get(history.board) is analysis
+    assert len(cache) == 1
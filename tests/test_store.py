@@ -0,0 +1,78 @@
+"""
+Tests of the persistent analysis store.
+"""
+
+import chess
+import chess.engine
+import pytest
+from core.store import AnalysisStore
+from core.stockfish import PositionAnalysis
+
+
+def analysis(depth: int, *pv: str) -> PositionAnalysis:
+    moves = [chess.Move.from_uci(uci) for uci in pv]
+    return PositionAnalysis(score=chess.engine.Cp(depth), best_move=moves[0], depth=depth, nodes=1000, pv=moves)
+
+
+def board_after(*sans: str) -> chess.Board:
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalysisStore(str(tmp_path / 'analysis.sqlite3'), max_entries=3, batch_interval=0.01)
+    yield store
+    store.close()
+
+
+def test_lookup_is_keyed_by_engine_identity(store, tmp_path):
+    """Analyses are found again, after a restart too, only for the engine that made them."""
+    board = board_after('e4')
+    store.put(board, 'engine-a', analysis(18, 'e7e5', 'g1f3'))
+    store.flush()
+
+    stored = store.get(board, 'engine-a')
+    assert stored.depth == 18 and stored.score == chess.engine.Cp(18)
+    assert stored.best_move == chess.Move.from_uci('e7e5') and len(stored.pv) == 2
+    assert store.get(board, 'engine-b') is None
+    assert store.get(board_after('d4'), 'engine-a') is None
+
+    reopened = AnalysisStore(str(tmp_path / 'analysis.sqlite3'))
+    assert len(reopened) == 1
+    assert reopened.get(board, 'engine-a').depth == 18
+    reopened.close()
+
+
+def test_only_deeper_analyses_replace_stored_ones(store):
+    board = board_after('e4')
+    store.put(board, 'engine', analysis(18, 'e7e5'))
+    store.put(board, 'engine', analysis(12, 'c7c5'))
+    store.flush()
+    assert store.get(board, 'engine').best_move == chess.Move.from_uci('e7e5')
+
+    store.put(board, 'engine', analysis(22, 'e7e6'))
+    store.flush()
+    assert store.get(board, 'engine').depth == 22
+    assert len(store) == 1
+
+
+def test_least_recently_used_analyses_are_evicted(store):
+    """Past the size limit, the analyses neither stored nor looked up lately are removed."""
+    boards = [board_after(san) for san in ('e4', 'd4', 'c4', 'Nf3')]
+    for board in boards[:3]:
+        store.put(board, 'engine', analysis(10, 'e7e5'))
+        store.flush()
+    assert len(store) == 3
+
+    # Looking up the oldest analysis makes the second one the least recently used
+    assert store.get(boards[0], 'engine') is not None
+    store.flush()
+    store.put(boards[3], 'engine', analysis(10, 'e7e5'))
+    store.flush()
+
+    assert len(store) == 3
+    assert store.get(boards[1], 'engine') is None
+    assert all(store.get(board, 'engine') is not None for board in (boards[0], boards[2], boards[3]))